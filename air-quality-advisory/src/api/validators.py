@@ -1,24 +1,55 @@
 from flask import request
-from marshmallow import Schema, fields, ValidationError
+from marshmallow import Schema, fields, validate, ValidationError
 
 class AQIValidator(Schema):
-    aqi = fields.Int(required=True, validate=lambda n: n >= 0)
+    aqi = fields.Int(required=True, validate=validate.Range(min=0))
     location = fields.Str(required=True)
 
+class AdvisoryValidator(Schema):
+    advisory_level = fields.Str(required=True)
+    recommendations = fields.List(fields.Str(), required=True)
+
+# Schemas are built once at import and shared: building one per request
+# re-binds every field, which costs more than validating the payload. Loading
+# with a shared instance is thread-safe.
+AQI_SCHEMA = AQIValidator()
+AQI_BATCH_SCHEMA = AQIValidator(many=True)
+ADVISORY_SCHEMA = AdvisoryValidator()
+ADVISORY_BATCH_SCHEMA = AdvisoryValidator(many=True)
+
 def validate_aqi_data(data):
     try:
-        AQIValidator().load(data)
+        AQI_SCHEMA.load(data)
     except ValidationError as err:
         return {"errors": err.messages}, 400
     return None
 
-class AdvisoryValidator(Schema):
-    advisory_level = fields.Str(required=True)
-    recommendations = fields.List(fields.Str(), required=True)
-
 def validate_advisory_data(data):
     try:
-        AdvisoryValidator().load(data)
+        ADVISORY_SCHEMA.load(data)
     except ValidationError as err:
         return {"errors": err.messages}, 400
-    return None
\ No newline at end of file
+    return None
+
+def validate_batch(records, schema):
+    """Validate a list of records with one ``many=True`` load.
+
+    Returns ``(valid, errors)``: ``valid`` lists ``(index, data)`` pairs in input
+    order and ``errors`` maps the index of each rejected record to its per-field
+    messages, e.g. ``{3: {"aqi": ["Not a valid integer."]}}``. Errors that are
+    not about one field (such as a record that isn't an object) are under
+    ``"_schema"``; if ``records`` itself is not a list, ``errors`` is just
+    ``{"_schema": [...]}``.
+    """
+    try:
+        loaded, errors = schema.load(records), {}
+    except ValidationError as err:
+        loaded, errors = err.valid_data, err.messages
+    valid = [(index, data) for index, data in enumerate(loaded) if index not in errors]
+    return valid, errors
+
+def validate_aqi_batch(records):
+    return validate_batch(records, AQI_BATCH_SCHEMA)
+
+def validate_advisory_batch(records):
+    return validate_batch(records, ADVISORY_BATCH_SCHEMA)
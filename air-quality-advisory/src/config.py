@@ -9,6 +9,9 @@ DATABASE_URL = "sqlite:///air_quality.db"
 
 # Logging configuration
 LOG_LEVEL = "DEBUG"
+ADVISORY_LOG_PATH = "advisory_log.txt"
+ADVISORY_LOG_QUEUE_SIZE = 10000
+ADVISORY_LOG_MAX_BYTES = 10 * 1024 * 1024
 
 # Other settings
 DEBUG_MODE = True
@@ -1,5 +1,26 @@
 # src/services/__init__.py
 
-# This file initializes the services package. It may contain package-level documentation or import statements for the service modules.
-from .aqi_service import *
-from .advisory_service import *
\ No newline at end of file
+# This file initializes the services package. Service classes are re-exported
+# lazily (PEP 562) so importing one service does not pull in all the others.
+import importlib
+
+_EXPORTS = {
+    "AQIService": "aqi_service",
+    "AdvisoryService": "advisory_service",
+    "get_advisory_log_writer": "advisory_service",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
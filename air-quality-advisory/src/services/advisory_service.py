@@ -1,7 +1,29 @@
+import atexit
+import threading
 from datetime import datetime
 
+from src.config import ADVISORY_LOG_MAX_BYTES, ADVISORY_LOG_PATH, ADVISORY_LOG_QUEUE_SIZE
+from src.utils.log_writer import BufferedLogWriter
+
+_log_writer = None
+_log_writer_lock = threading.Lock()
+
+def get_advisory_log_writer():
+    """Return the process-wide advisory log writer, starting it on first use."""
+    global _log_writer
+    with _log_writer_lock:
+        if _log_writer is None:
+            _log_writer = BufferedLogWriter(
+                ADVISORY_LOG_PATH,
+                max_queue=ADVISORY_LOG_QUEUE_SIZE,
+                max_bytes=ADVISORY_LOG_MAX_BYTES,
+            ).start()
+            atexit.register(_log_writer.stop)
+    return _log_writer
+
 class AdvisoryService:
-    def __init__(self):
+    def __init__(self, log_writer=None):
+        self.log_writer = log_writer
         self.advisories = {
             "Good": "Air quality is considered satisfactory, and air pollution poses little or no risk.",
             "Moderate": "Air quality is acceptable; however, for some pollutants there may be a concern for a very small number of people who are unusually sensitive to air pollution.",
@@ -28,6 +50,7 @@ class AdvisoryService:
     def log_advisory(self, aqi):
         advisory = self.get_advisory(aqi)
         timestamp = datetime.now().isoformat()
-        with open("advisory_log.txt", "a") as log_file:
-            log_file.write(f"{timestamp} - AQI: {aqi}, Advisory: {advisory}\n")
+        # Non-blocking enqueue; the background writer batches and rotates the file.
+        writer = self.log_writer or get_advisory_log_writer()
+        writer.write(f"{timestamp} - AQI: {aqi}, Advisory: {advisory}")
         return advisory
\ No newline at end of file
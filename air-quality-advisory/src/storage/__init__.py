@@ -0,0 +1 @@
+# This file initializes the storage package, which persists readings and computed AQI.
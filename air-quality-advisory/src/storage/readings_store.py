@@ -0,0 +1,147 @@
+# SQLite-backed store for pollutant readings and computed AQI
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+from src.config import DATABASE_URL
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS readings (
+    location TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    pollutant TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (location, ts, pollutant)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS aqi_readings (
+    location TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    aqi REAL NOT NULL,
+    PRIMARY KEY (location, ts)
+) WITHOUT ROWID;
+"""
+
+# WAL lets readers run alongside the single writer; NORMAL sync is durable
+# across application crashes, which is enough for re-ingestable sensor data.
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA busy_timeout=5000",
+)
+
+INGEST_CHUNK_SIZE = 50000
+
+
+def database_path(database_url):
+    """Turn ``sqlite:///path`` (or a bare path) into a filename for sqlite3."""
+    prefix = "sqlite:///"
+    return database_url[len(prefix):] if database_url.startswith(prefix) else database_url
+
+
+def to_epoch(timestamp):
+    """Seconds since the epoch for a datetime (naive means UTC) or a number."""
+    if isinstance(timestamp, datetime):
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return int(timestamp.timestamp())
+    return int(timestamp)
+
+
+class ReadingsStore:
+    """Readings keyed by (location, timestamp, pollutant) plus computed AQI.
+
+    Both tables are clustered on their primary key, which starts with
+    (location, ts), so "last 24h for Delhi" is a single index range scan.
+    Each thread (and each forked worker) gets its own pooled connection.
+    """
+
+    def __init__(self, database_url=DATABASE_URL):
+        self.path = database_path(database_url)
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        with self.connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def connection(self):
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            for pragma in PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self):
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    def _ingest(self, sql, rows, convert):
+        conn = self.connection()
+        total = 0
+        chunk = []
+        for row in rows:
+            chunk.append(convert(row))
+            if len(chunk) >= INGEST_CHUNK_SIZE:
+                with conn:
+                    conn.executemany(sql, chunk)
+                total += len(chunk)
+                chunk = []
+        if chunk:
+            with conn:
+                conn.executemany(sql, chunk)
+            total += len(chunk)
+        return total
+
+    def ingest_readings(self, rows):
+        """Insert or replace ``(location, timestamp, pollutant, value)`` rows.
+
+        Rows are written with executemany in one transaction per
+        INGEST_CHUNK_SIZE rows; returns the number of rows written.
+        """
+        return self._ingest(
+            "INSERT OR REPLACE INTO readings (location, ts, pollutant, value) VALUES (?, ?, ?, ?)",
+            rows,
+            lambda row: (row[0], to_epoch(row[1]), row[2], float(row[3])),
+        )
+
+    def ingest_aqi(self, rows):
+        """Insert or replace ``(location, timestamp, aqi)`` rows; returns the count written."""
+        return self._ingest(
+            "INSERT OR REPLACE INTO aqi_readings (location, ts, aqi) VALUES (?, ?, ?)",
+            rows,
+            lambda row: (row[0], to_epoch(row[1]), float(row[2])),
+        )
+
+    def readings(self, location, start, end, pollutant=None):
+        """``(ts, pollutant, value)`` rows for ``location`` with start <= ts < end."""
+        sql = "SELECT ts, pollutant, value FROM readings WHERE location = ? AND ts >= ? AND ts < ?"
+        params = [location, to_epoch(start), to_epoch(end)]
+        if pollutant is not None:
+            sql += " AND pollutant = ?"
+            params.append(pollutant)
+        return self.connection().execute(sql + " ORDER BY ts, pollutant", params).fetchall()
+
+    def aqi_history(self, location, start, end):
+        """``(ts, aqi)`` rows for ``location`` with start <= ts < end."""
+        return self.connection().execute(
+            "SELECT ts, aqi FROM aqi_readings WHERE location = ? AND ts >= ? AND ts < ? ORDER BY ts",
+            (location, to_epoch(start), to_epoch(end)),
+        ).fetchall()
+
+    def last_24h(self, location, now=None):
+        """Readings for ``location`` with now - 24h < ts <= now."""
+        end = to_epoch(now) if now is not None else int(time.time())
+        return self.readings(location, end - 24 * 3600 + 1, end + 1)
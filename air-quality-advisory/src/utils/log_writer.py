@@ -0,0 +1,141 @@
+# Background, batched writer for append-only log files
+
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import date
+
+logger = logging.getLogger(__name__)
+
+
+class BufferedLogWriter:
+    """Owns a log file and writes queued lines to it from a background thread.
+
+    Callers only do a non-blocking enqueue; when the queue is full the line is
+    dropped and counted in ``dropped``. The writer flushes once ``batch_size``
+    lines are pending or ``flush_interval`` seconds have passed, and rotates the
+    file when it would exceed ``max_bytes`` or the day changes. Rotated files
+    are named ``<path>.<YYYY-MM-DD>.<n>`` and only the newest ``backup_count``
+    are kept.
+
+    A batch that can't be written (disk full, permissions) is logged, counted
+    in ``dropped`` and kept in ``last_error``; the thread carries on with the
+    next batch, so the queue keeps draining instead of growing.
+    """
+
+    def __init__(self, path, max_queue=10000, batch_size=500, flush_interval=1.0,
+                 max_bytes=10 * 1024 * 1024, rotate_daily=True, backup_count=7):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.rotate_daily = rotate_daily
+        self.backup_count = backup_count
+        self.dropped = 0
+        self.written = 0
+        self.last_error = None
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stopping = threading.Event()
+        self._thread = None
+        self._file = None
+        self._opened_on = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        """Flush everything still queued, close the file and stop the thread."""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            # A thread still draining after ``timeout`` stays tracked so a later stop() can wait again.
+            if not self._thread.is_alive():
+                self._thread = None
+
+    def write(self, line):
+        """Enqueue ``line`` (newline added) without blocking; return False if dropped."""
+        try:
+            self._queue.put_nowait(line + "\n")
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def _run(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        try:
+            while not (self._stopping.is_set() and self._queue.empty()):
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    pass
+                if len(batch) >= self.batch_size or time.monotonic() >= deadline or self._stopping.is_set():
+                    if batch:
+                        self._write_batch(batch)
+                        batch = []
+                    deadline = time.monotonic() + self.flush_interval
+            if batch:
+                self._write_batch(batch)
+        finally:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _write_batch(self, lines):
+        try:
+            self._flush(lines)
+        except Exception as exc:
+            logger.exception("Dropping %d log lines: could not write %s", len(lines), self.path)
+            self.dropped += len(lines)
+            self.last_error = exc
+            if self._file is not None:
+                # Reopen on the next batch; the handle may be in a bad state.
+                try:
+                    self._file.close()
+                except OSError:
+                    pass
+                self._file = None
+
+    def _flush(self, lines):
+        data = "".join(lines)
+        self._maybe_rotate(len(data.encode("utf-8")))
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+            self._opened_on = date.today()
+        self._file.write(data)
+        self._file.flush()
+        self.written += len(lines)
+
+    def _maybe_rotate(self, pending_bytes):
+        if not os.path.exists(self.path):
+            return
+        today = date.today()
+        opened_on = self._opened_on or date.fromtimestamp(os.path.getmtime(self.path))
+        size = os.path.getsize(self.path)
+        if not ((self.rotate_daily and opened_on != today) or (size and size + pending_bytes > self.max_bytes)):
+            return
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        n = 1
+        while os.path.exists(f"{self.path}.{opened_on.isoformat()}.{n}"):
+            n += 1
+        os.replace(self.path, f"{self.path}.{opened_on.isoformat()}.{n}")
+        self._prune_backups()
+
+    def _prune_backups(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        prefix = os.path.basename(self.path) + "."
+        backups = sorted(
+            (os.path.join(directory, name) for name in os.listdir(directory) if name.startswith(prefix)),
+            key=os.path.getmtime,
+        )
+        for stale in backups[:max(0, len(backups) - self.backup_count)]:
+            os.remove(stale)
@@ -0,0 +1,77 @@
+import os
+import threading
+import time
+from datetime import date
+
+from src.utils.log_writer import BufferedLogWriter
+
+
+def test_writer_batches_lines_in_order(tmp_path):
+    path = str(tmp_path / "advisory_log.txt")
+    writer = BufferedLogWriter(path, batch_size=100, flush_interval=0.05).start()
+    for i in range(1000):
+        assert writer.write(f"line {i}")
+    writer.stop()
+    with open(path) as log_file:
+        assert log_file.read().splitlines() == [f"line {i}" for i in range(1000)]
+    assert writer.written == 1000 and writer.dropped == 0
+
+
+def test_writer_drops_lines_when_queue_is_full(tmp_path):
+    writer = BufferedLogWriter(str(tmp_path / "advisory_log.txt"), max_queue=10)
+    results = [writer.write("x") for _ in range(15)]
+    assert results.count(False) == 5 and writer.dropped == 5
+    writer.start().stop()
+    assert writer.written == 10
+
+
+def test_writer_rotates_by_size(tmp_path):
+    path = str(tmp_path / "advisory_log.txt")
+    writer = BufferedLogWriter(path, batch_size=10, flush_interval=0.01, max_bytes=200, backup_count=3).start()
+    for i in range(200):
+        writer.write(f"line {i:04d}")
+    writer.stop()
+    backups = sorted(name for name in os.listdir(tmp_path) if name != "advisory_log.txt")
+    assert 0 < len(backups) <= 3
+    assert all(name.startswith(f"advisory_log.txt.{date.today().isoformat()}.") for name in backups)
+    assert os.path.getsize(path) <= 200
+
+
+def test_writer_survives_failed_writes(tmp_path, monkeypatch):
+    path = str(tmp_path / "advisory_log.txt")
+    writer = BufferedLogWriter(path, batch_size=1, flush_interval=0.01)
+    real_flush = writer._flush
+    failures = [OSError("disk full")]
+
+    def flaky_flush(lines):
+        if failures:
+            raise failures.pop()
+        real_flush(lines)
+
+    monkeypatch.setattr(writer, "_flush", flaky_flush)
+    writer.write("lost")
+    writer.start()
+    for _ in range(200):
+        if writer.last_error is not None:
+            break
+        time.sleep(0.01)
+    writer.write("kept")
+    writer.stop()
+    assert isinstance(writer.last_error, OSError)
+    assert writer.dropped == 1 and writer.written == 1
+    with open(path) as log_file:
+        assert log_file.read() == "kept\n"
+
+
+def test_stop_keeps_a_thread_that_is_still_running(tmp_path, monkeypatch):
+    writer = BufferedLogWriter(str(tmp_path / "advisory_log.txt"), flush_interval=0.01)
+    release = threading.Event()
+    monkeypatch.setattr(writer, "_flush", lambda lines: release.wait())
+    writer.start()
+    writer.write("slow")
+    time.sleep(0.05)
+    writer.stop(timeout=0.01)
+    assert writer._thread is not None and writer._thread.is_alive()
+    release.set()
+    writer.stop()
+    assert writer._thread is None
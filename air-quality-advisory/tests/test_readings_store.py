@@ -0,0 +1,41 @@
+from datetime import datetime
+
+from src.storage.readings_store import ReadingsStore, database_path, to_epoch
+
+
+def _store(tmp_path):
+    return ReadingsStore(f"sqlite:///{tmp_path / 'air_quality.db'}")
+
+
+def test_database_path_and_epoch():
+    assert database_path("sqlite:///air_quality.db") == "air_quality.db"
+    assert to_epoch(datetime(1970, 1, 2)) == 86400
+
+
+def test_bulk_ingest_and_time_range_query(tmp_path):
+    store = _store(tmp_path)
+    start = 1_700_000_000
+    rows = (
+        (city, start + hour * 3600, pollutant, float(hour))
+        for city in ("Delhi", "Mumbai")
+        for hour in range(72)
+        for pollutant in ("PM10", "NO2")
+    )
+    assert store.ingest_readings(rows) == 288
+    now = start + 71 * 3600
+    recent = store.last_24h("Delhi", now=now)
+    assert len(recent) == 48
+    assert recent[0] == (now - 23 * 3600, "NO2", 48.0)
+    assert store.readings("Mumbai", start, start + 7200, pollutant="PM10") == [(start, "PM10", 0.0), (start + 3600, "PM10", 1.0)]
+    assert store.connection().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    store.close()
+
+
+def test_reingest_replaces_and_aqi_history(tmp_path):
+    store = _store(tmp_path)
+    store.ingest_readings([("Delhi", 100, "PM10", 1.0)])
+    store.ingest_readings([("Delhi", 100, "PM10", 2.0)])
+    assert store.readings("Delhi", 0, 200) == [(100, "PM10", 2.0)]
+    store.ingest_aqi([("Delhi", 100, 180.5), ("Delhi", 200, 190.0)])
+    assert store.aqi_history("Delhi", 0, 150) == [(100, 180.5)]
+    store.close()
@@ -0,0 +1,37 @@
+from src.api.validators import (
+    validate_advisory_batch,
+    validate_advisory_data,
+    validate_aqi_batch,
+    validate_aqi_data,
+)
+
+
+def test_single_record_validation():
+    assert validate_aqi_data({"aqi": 42, "location": "Delhi"}) is None
+    body, status = validate_aqi_data({"aqi": -1, "location": "Delhi"})
+    assert status == 400 and list(body["errors"]) == ["aqi"]
+    assert validate_advisory_data({"advisory_level": "Good", "recommendations": ["Enjoy"]}) is None
+    assert validate_advisory_data({"advisory_level": "Good"})[1] == 400
+
+
+def test_batch_returns_valid_records_and_per_field_errors():
+    records = [
+        {"aqi": 42, "location": "Delhi"},
+        {"aqi": "high", "location": "Pune"},
+        "not a record",
+        {"aqi": 7},
+        {"aqi": "8", "location": "Patna"},
+    ]
+    valid, errors = validate_aqi_batch(records)
+    assert valid == [(0, {"aqi": 42, "location": "Delhi"}), (4, {"aqi": 8, "location": "Patna"})]
+    assert errors == {
+        1: {"aqi": ["Not a valid integer."]},
+        2: {"_schema": ["Invalid input type."]},
+        3: {"location": ["Missing data for required field."]},
+    }
+
+
+def test_batch_rejects_non_list_input():
+    assert validate_advisory_batch({"advisory_level": "Good"}) == ([], {"_schema": ["Invalid input type."]})
+    valid, errors = validate_advisory_batch([{"advisory_level": "Good", "recommendations": ["Enjoy"]}])
+    assert valid == [(0, {"advisory_level": "Good", "recommendations": ["Enjoy"]})] and errors == {}
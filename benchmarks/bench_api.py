@@ -0,0 +1,49 @@
+"""Flask /predict-aqi and /advisory through the test client.
+
+One record goes through the single-record routes; 1k and 1M records go through
+the batch routes, the 1M case as NDJSON in MAX_BATCH_RECORDS-sized requests.
+"""
+import json
+
+import numpy as np
+import pytest
+
+from conftest import SCALES, run_benchmark
+
+flask = pytest.importorskip('flask')
+pytest.importorskip('pytest_benchmark')
+
+from src.api.routes import api_bp  # noqa: E402
+from src.api.validators import MAX_BATCH_RECORDS  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def client():
+    app = flask.Flask(__name__)
+    app.register_blueprint(api_bp)
+    return app.test_client()
+
+
+def _post_all(client, path, records):
+    if len(records) == 1:
+        response = client.post(path, json=records[0])
+        assert response.status_code == 200
+        return
+    for start in range(0, len(records), MAX_BATCH_RECORDS):
+        body = '\n'.join(json.dumps(record) for record in records[start:start + MAX_BATCH_RECORDS])
+        response = client.post(f'{path}/batch', data=body, content_type='application/x-ndjson')
+        assert response.status_code == 200
+
+
+@pytest.mark.parametrize('records', SCALES)
+def test_predict_aqi_route(benchmark, client, records):
+    readings = np.random.default_rng(0).uniform(0, 400, size=(records, 6)).round(2).tolist()
+    payloads = [{'parameters': row} for row in readings]
+    run_benchmark(benchmark, records, _post_all, client, '/predict-aqi', payloads)
+
+
+@pytest.mark.parametrize('records', SCALES)
+def test_advisory_route(benchmark, client, records):
+    values = np.random.default_rng(1).uniform(0, 500, size=records).round(1).tolist()
+    payloads = [{'aqi': aqi, 'group': 'Children'} for aqi in values]
+    run_benchmark(benchmark, records, _post_all, client, '/advisory', payloads)
@@ -0,0 +1,91 @@
+"""Scoring and advisory hot paths at 1, 1k and 1M records.
+
+Scalar functions are timed in a Python loop at 1 and 1k records; every scale
+also times the vectorized equivalent that bulk callers use.
+"""
+import numpy as np
+import pytest
+
+from conftest import SCALES, run_benchmark
+from src.models.advisory_model import get_custom_advisories, get_custom_advisory
+from src.models.aqi_model import AQIModel
+from src.services.advisory_service import generate_health_advisory
+from src.utils.constants import SENSITIVE_GROUPS, get_aqi_level, get_aqi_levels, predict_aqi, predict_aqi_batch
+
+pytest.importorskip('pytest_benchmark')
+
+SCALAR_SCALES = [1, 1_000]
+COEFFICIENTS = {'pm10': 0.5, 'pm2_5': 0.7, 'no2': 0.3, 'o3': 0.2}
+
+
+def _readings(records):
+    return np.random.default_rng(0).uniform(0, 400, size=(records, 6))
+
+
+def _aqi_values(records):
+    return np.random.default_rng(1).uniform(0, 500, size=records)
+
+
+def _groups(records):
+    choices = [None] + list(SENSITIVE_GROUPS)
+    return [choices[i % len(choices)] for i in range(records)]
+
+
+@pytest.mark.parametrize('records', SCALAR_SCALES)
+def test_predict_aqi(benchmark, records):
+    rows = _readings(records).tolist()
+    run_benchmark(benchmark, records, lambda: [predict_aqi(row) for row in rows])
+
+
+@pytest.mark.parametrize('records', SCALES)
+def test_predict_aqi_batch(benchmark, records):
+    run_benchmark(benchmark, records, predict_aqi_batch, _readings(records))
+
+
+@pytest.mark.parametrize('records', SCALAR_SCALES)
+def test_get_aqi_level(benchmark, records):
+    values = _aqi_values(records).tolist()
+    run_benchmark(benchmark, records, lambda: [get_aqi_level(value) for value in values])
+
+
+@pytest.mark.parametrize('records', SCALES)
+def test_get_aqi_levels(benchmark, records):
+    run_benchmark(benchmark, records, get_aqi_levels, _aqi_values(records))
+
+
+@pytest.mark.parametrize('records', SCALAR_SCALES)
+def test_get_custom_advisory(benchmark, records):
+    pairs = list(zip(_aqi_values(records).tolist(), _groups(records)))
+    run_benchmark(benchmark, records, lambda: [get_custom_advisory(aqi, group) for aqi, group in pairs])
+
+
+@pytest.mark.parametrize('records', SCALES)
+def test_get_custom_advisories(benchmark, records):
+    run_benchmark(benchmark, records, get_custom_advisories, _aqi_values(records), _groups(records))
+
+
+@pytest.mark.parametrize('records', SCALAR_SCALES)
+def test_generate_health_advisory(benchmark, records):
+    pairs = list(zip(_aqi_values(records).tolist(), _groups(records)))
+    run_benchmark(benchmark, records, lambda: [generate_health_advisory(aqi, group) for aqi, group in pairs])
+
+
+@pytest.mark.parametrize('records', SCALAR_SCALES)
+def test_aqi_model_predict_aqi(benchmark, records):
+    model = AQIModel(COEFFICIENTS)
+    rows = [dict(zip(COEFFICIENTS, row)) for row in _readings(records)[:, :4].tolist()]
+    run_benchmark(benchmark, records, lambda: [model.predict_aqi(row) for row in rows])
+
+
+@pytest.mark.parametrize('records', SCALES)
+def test_compiled_aqi_model_predict_many(benchmark, records):
+    model = AQIModel(COEFFICIENTS).compile()
+    run_benchmark(benchmark, records, model.predict_many, _readings(records)[:, :4])
+
+
+@pytest.mark.parametrize('records', SCALES)
+def test_find_spec(benchmark, records):
+    app = pytest.importorskip('src.app')
+    labels = ['NO₂', 'NO2', 'pm2_5', 'PM₁₀', 'co', 'Ozone'] * (records // 6 + 1)
+    labels = labels[:records]
+    run_benchmark(benchmark, records, lambda: [app.find_spec(label) for label in labels])
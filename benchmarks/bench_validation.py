@@ -0,0 +1,88 @@
+"""Request validation: root validators and the nested marshmallow schemas.
+
+``test_marshmallow_schema_per_call`` keeps the old build-a-Schema-per-request
+pattern as the reference point for the shared and batch schema paths.
+"""
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+from conftest import run_benchmark
+from src.api.validators import validate_advisory_request, validate_batch, validate_group, validate_prediction_request
+from src.utils.constants import SENSITIVE_GROUPS
+
+pytest.importorskip('pytest_benchmark')
+
+# Batches are capped at MAX_BATCH_RECORDS (50k), so that is the top scale here.
+VALIDATION_SCALES = [1, 1_000, 50_000]
+PER_CALL_SCALES = [1, 1_000]
+
+# The nested service's validators share the ``src`` package name with the root
+# tree, so load the module straight from its file.
+_NESTED_VALIDATORS = Path(__file__).resolve().parents[1] / 'air-quality-advisory' / 'src' / 'api' / 'validators.py'
+_spec = importlib.util.spec_from_file_location('nested_validators', _NESTED_VALIDATORS)
+nested = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(nested)
+
+
+def _advisory_records(records):
+    groups = [None] + list(SENSITIVE_GROUPS) + ['Unknown group']
+    return [{'aqi': (i * 7) % 600, 'group': groups[i % len(groups)]} for i in range(records)]
+
+
+def _prediction_records(records):
+    return [{'parameters': [i % 400, 20, 0.5, 30, 60, 10]} for i in range(records)]
+
+
+def _aqi_payloads(records):
+    return [{'aqi': (i * 7) % 600 - 50, 'location': f'Station {i % 40}'} for i in range(records)]
+
+
+@pytest.mark.parametrize('records', PER_CALL_SCALES)
+def test_validate_group(benchmark, records):
+    groups = [record['group'] for record in _advisory_records(records)]
+
+    def run():
+        for group in groups:
+            try:
+                validate_group(group)
+            except ValueError:
+                pass
+
+    run_benchmark(benchmark, records, run)
+
+
+@pytest.mark.parametrize('records', VALIDATION_SCALES)
+def test_validate_advisory_batch(benchmark, records):
+    run_benchmark(benchmark, records, validate_batch, _advisory_records(records), validate_advisory_request)
+
+
+@pytest.mark.parametrize('records', VALIDATION_SCALES)
+def test_validate_prediction_batch(benchmark, records):
+    run_benchmark(benchmark, records, validate_batch, _prediction_records(records), validate_prediction_request)
+
+
+@pytest.mark.parametrize('records', PER_CALL_SCALES)
+def test_marshmallow_schema_per_call(benchmark, records):
+    payloads = _aqi_payloads(records)
+
+    def run():
+        for payload in payloads:
+            try:
+                nested.AQIValidator().load(payload)
+            except nested.ValidationError:
+                pass
+
+    run_benchmark(benchmark, records, run)
+
+
+@pytest.mark.parametrize('records', PER_CALL_SCALES)
+def test_marshmallow_shared_schema(benchmark, records):
+    payloads = _aqi_payloads(records)
+    run_benchmark(benchmark, records, lambda: [nested.validate_aqi_data(payload) for payload in payloads])
+
+
+@pytest.mark.parametrize('records', VALIDATION_SCALES)
+def test_marshmallow_batch(benchmark, records):
+    run_benchmark(benchmark, records, nested.validate_aqi_batch, _aqi_payloads(records))
@@ -0,0 +1,66 @@
+"""Shared setup for the performance suite.
+
+Results are compared against the baseline committed under ``.benchmarks/``
+for the current machine id (e.g. ``Linux-CPython-3.11-64bit``), and a run fails
+when a benchmark's fastest round regresses by more than ``BENCH_MAX_REGRESSION``.
+Record a new baseline after an intentional change with::
+
+    python -m pytest benchmarks --bench-large --benchmark-save=baseline
+
+then delete the previous ``0001_baseline.json`` and rename the new file to it.
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Make ``src`` importable. The ini file's ``pythonpath`` option needs pytest >= 7,
+# and requirements.txt pins 6.2.
+PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+BASELINE_DIR = Path(__file__).resolve().parent / '.benchmarks'
+BASELINE_ID = '0001'
+# The fastest round is the least noisy statistic for microsecond-scale cases;
+# 100% means a case fails once it is twice as slow as the baseline.
+BENCH_MAX_REGRESSION = os.getenv('BENCH_MAX_REGRESSION', 'min:100%')
+
+# 1, 1k and 1M records; the 1M cases only run with --bench-large.
+SCALES = [1, 1_000, pytest.param(1_000_000, marks=pytest.mark.large)]
+
+
+def pytest_addoption(parser):
+    parser.addoption('--bench-large', action='store_true', help='also run the 1M-record benchmarks')
+
+
+def pytest_configure(config):
+    # Runs before pytest-benchmark sets up its session (its hook is trylast).
+    if not hasattr(config.option, 'benchmark_storage'):
+        return
+    from pytest_benchmark.utils import get_machine_id, parse_compare_fail
+
+    if config.option.benchmark_storage == 'file://./.benchmarks':
+        config.option.benchmark_storage = f'file://{BASELINE_DIR}'
+        baselines = list((BASELINE_DIR / get_machine_id()).glob(f'{BASELINE_ID}_*.json'))
+        if baselines and not config.option.benchmark_compare:
+            config.option.benchmark_compare = BASELINE_ID
+            if not config.option.benchmark_compare_fail:
+                config.option.benchmark_compare_fail = [parse_compare_fail(BENCH_MAX_REGRESSION)]
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption('--bench-large'):
+        return
+    skip_large = pytest.mark.skip(reason='1M-record case; pass --bench-large')
+    for item in items:
+        if 'large' in item.keywords:
+            item.add_marker(skip_large)
+
+
+def run_benchmark(benchmark, records, func, *args):
+    """Benchmark ``func(*args)``, keeping the 1M-record cases to a few rounds."""
+    if records >= 1_000_000:
+        return benchmark.pedantic(func, args=args, rounds=3, iterations=1)
+    return benchmark(func, *args)
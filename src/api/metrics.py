@@ -0,0 +1,245 @@
+"""Request metrics for the Flask API, exposed in Prometheus text format.
+
+``init_metrics(app)`` installs request hooks and a ``/metrics`` route. Request,
+error and in-flight counts are always exact. Latency and size histograms and
+the internal ``span()`` timings are recorded only for a random
+``sample_rate`` fraction of requests. Histogram counts therefore cover the
+sampled requests only; ``metrics_sample_rate`` is exported so they can be
+scaled back up.
+"""
+import random
+import threading
+from bisect import bisect_left
+from contextlib import nullcontext
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Dict, Tuple
+
+from flask import Response, request
+from werkzeug.wsgi import ClosingIterator
+
+METRICS_MIMETYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Requests that match no route share one label so stray paths can't blow up cardinality.
+UNMATCHED_ROUTE = '<unmatched>'
+
+_NO_SPAN = nullcontext()
+# (registry, start time) while a sampled request is being handled, else None.
+_ACTIVE: ContextVar = ContextVar('metrics_active', default=None)
+
+
+class Histogram:
+    """Cumulative-bucket histogram; observations are thread-safe."""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count', '_lock')
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        position = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[position] += 1
+            self.sum += value
+            self.count += 1
+
+    def cumulative(self):
+        """``(upper bound, count)`` pairs including ``+Inf``, as Prometheus expects."""
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        running = 0
+        bounds = []
+        for bound, bucket in zip(self.buckets + (float('inf'),), counts):
+            running += bucket
+            bounds.append((bound, running))
+        return bounds, total, count
+
+
+class _Span:
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(perf_counter() - self.start)
+        return False
+
+
+class MetricsRegistry:
+    """All metrics collected for one Flask app."""
+
+    def __init__(self, sample_rate: float = 1.0):
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate must be between 0 and 1.")
+        self.sample_rate = sample_rate
+        self.in_flight = 0
+        self.requests: Dict[Tuple[str, str, str], int] = {}
+        self.errors: Dict[Tuple[str, str, str], int] = {}
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.request_size: Dict[Tuple[str, str], Histogram] = {}
+        self.response_size: Dict[Tuple[str, str], Histogram] = {}
+        self.spans: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def _histogram(self, family: dict, key, buckets=LATENCY_BUCKETS) -> Histogram:
+        histogram = family.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = family.setdefault(key, Histogram(buckets))
+        return histogram
+
+    def span(self, name: str) -> _Span:
+        return _Span(self._histogram(self.spans, name))
+
+    def request_started(self) -> bool:
+        """Count a request in flight and decide whether to sample it."""
+        with self._lock:
+            self.in_flight += 1
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def request_finished(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def record_response(self, method: str, route: str, status: int) -> None:
+        key = (method, route, str(status))
+        with self._lock:
+            self.requests[key] = self.requests.get(key, 0) + 1
+            if status >= 400:
+                self.errors[key] = self.errors.get(key, 0) + 1
+
+    def observe_request(self, method: str, route: str, seconds: float, request_bytes, response_bytes) -> None:
+        key = (method, route)
+        self._histogram(self.latency, key).observe(seconds)
+        self._histogram(self.request_size, key, SIZE_BUCKETS).observe(request_bytes or 0)
+        if response_bytes is not None:
+            self._histogram(self.response_size, key, SIZE_BUCKETS).observe(response_bytes)
+
+    def render(self) -> str:
+        """Every metric in Prometheus text exposition format."""
+        lines = []
+        _counter(lines, 'http_requests_total', 'Requests handled, by status.',
+                 ('method', 'route', 'status'), self.requests)
+        _counter(lines, 'http_request_errors_total', 'Requests answered with a 4xx or 5xx status.',
+                 ('method', 'route', 'status'), self.errors)
+        lines += ['# HELP http_requests_in_flight Requests currently being handled.',
+                  '# TYPE http_requests_in_flight gauge',
+                  f'http_requests_in_flight {self.in_flight}']
+        _histograms(lines, 'http_request_duration_seconds', 'Time to build the response (sampled).',
+                    ('method', 'route'), self.latency)
+        _histograms(lines, 'http_request_size_bytes', 'Request body size (sampled).',
+                    ('method', 'route'), self.request_size)
+        _histograms(lines, 'http_response_size_bytes', 'Response body size, streamed bodies excluded (sampled).',
+                    ('method', 'route'), self.response_size)
+        _histograms(lines, 'app_span_duration_seconds', 'Time spent in internal spans (sampled).',
+                    ('span',), {(name,): histogram for name, histogram in self.spans.items()})
+        lines += ['# HELP metrics_sample_rate Fraction of requests recorded in the histograms.',
+                  '# TYPE metrics_sample_rate gauge',
+                  f'metrics_sample_rate {_number(self.sample_rate)}']
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra='') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _counter(lines, name, help_text, label_names, values) -> None:
+    lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+    for key, count in sorted(dict(values).items()):
+        lines.append(f'{name}{_labels(label_names, key)} {count}')
+
+
+def _histograms(lines, name, help_text, label_names, family) -> None:
+    lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+    for key, histogram in sorted(dict(family).items()):
+        bounds, total, count = histogram.cumulative()
+        for bound, running in bounds:
+            le = f'le="{_number(bound)}"'
+            lines.append(f'{name}_bucket{_labels(label_names, key, le)} {running}')
+        lines.append(f'{name}_sum{_labels(label_names, key)} {_number(total)}')
+        lines.append(f'{name}_count{_labels(label_names, key)} {count}')
+
+
+def span(name: str):
+    """Time a block as internal span ``name`` when the current request is sampled.
+
+    Outside a request, or for requests that were not sampled, this is a no-op.
+    """
+    active = _ACTIVE.get()
+    return active[0].span(name) if active is not None else _NO_SPAN
+
+
+def init_metrics(app, sample_rate: float = None) -> MetricsRegistry:
+    """Instrument ``app`` and add a ``/metrics`` route.
+
+    ``sample_rate`` defaults to the ``METRICS_SAMPLE_RATE`` config value (1.0
+    when unset). At a few thousand requests per second, 0.1 or lower keeps the
+    instrumentation cost negligible.
+    """
+    if sample_rate is None:
+        sample_rate = float(app.config.get('METRICS_SAMPLE_RATE', 1.0))
+    registry = MetricsRegistry(sample_rate)
+    app.extensions['metrics'] = registry
+    wsgi_app = app.wsgi_app
+
+    def finish():
+        registry.request_finished()
+        _ACTIVE.set(None)
+
+    # Sampling and in-flight tracking sit at the WSGI layer, outside Flask's
+    # request proxies, so unsampled requests cost little more than a lock. The
+    # request counts as finished once its body (streamed or not) is closed.
+    def instrumented_wsgi_app(environ, start_response):
+        _ACTIVE.set((registry, perf_counter()) if registry.request_started() else None)
+        try:
+            body = wsgi_app(environ, start_response)
+        except BaseException:
+            finish()
+            raise
+        return ClosingIterator(body, finish)
+
+    app.wsgi_app = instrumented_wsgi_app
+
+    @app.after_request
+    def _record_response(response):
+        req = request._get_current_object()
+        route = req.url_rule.rule if req.url_rule is not None else UNMATCHED_ROUTE
+        registry.record_response(req.method, route, response.status_code)
+        active = _ACTIVE.get()
+        if active is not None:
+            # Streamed bodies are still being generated here, so their latency is
+            # time to first byte and their size is unknown.
+            size = None if response.is_streamed else response.content_length
+            registry.observe_request(req.method, route, perf_counter() - active[1], req.content_length, size)
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+        return Response(registry.render(), mimetype=METRICS_MIMETYPE)
+
+    return registry
@@ -0,0 +1,125 @@
+"""Cache of serialized responses for the single-record API routes.
+
+Entries are keyed by a sha256 of the route and the *validated* request, so key
+order, whitespace and ``40`` vs ``40.0`` in the body don't produce separate
+entries. Each entry holds the encoded JSON body, so a hit skips both the
+computation and ``jsonify``. Every response carries an ETag of its body, and
+a request whose ``If-None-Match`` matches gets a bodyless 304.
+
+The default backend is an in-process TTL/LRU; set ``RESPONSE_CACHE_URL`` to a
+Redis URL to share entries between worker processes. The backend is created on
+the first request, and falls back to the in-process cache (with a logged
+warning) when redis isn't installed.
+"""
+import hashlib
+import json
+import logging
+import threading
+from typing import Callable, Optional
+
+from flask import Response, jsonify, request
+
+from src.config import Config
+from src.utils.cache import TTLCache, get_cache_stats
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(route: str, validated) -> str:
+    """Canonical sha256 key for ``validated`` request data sent to ``route``."""
+    canonical = json.dumps([route, validated], sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class RedisCacheBackend:
+    """Shared backend over a redis-py client; entries expire through Redis TTLs."""
+
+    def __init__(self, client, prefix: str = 'aqi:response:'):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str) -> 'RedisCacheBackend':
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("RESPONSE_CACHE_URL requires redis (pip install redis)") from None
+        return cls(redis.Redis.from_url(url))
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self.client.set(self.prefix + key, value, px=max(1, int(ttl * 1000)))
+
+
+def default_backend():
+    if Config.RESPONSE_CACHE_URL:
+        try:
+            return RedisCacheBackend.from_url(Config.RESPONSE_CACHE_URL)
+        except RuntimeError as exc:
+            logger.warning("%s; caching responses in process instead", exc)
+    return TTLCache(Config.RESPONSE_CACHE_MAX_ENTRIES)
+
+
+class ResponseCache:
+    """Serves JSON responses from ``backend``, computing and storing them on a miss.
+
+    ``backend`` is anything with ``get(key)`` and ``set(key, value, ttl)`` over
+    bytes. Backend errors are logged and treated as misses so an unavailable
+    shared cache never fails a request. A ``ttl`` of 0 disables caching but
+    keeps ETags.
+    """
+
+    def __init__(self, backend=None, ttl: Optional[float] = None):
+        self._backend = backend
+        self.ttl = Config.RESPONSE_CACHE_TTL if ttl is None else ttl
+        self.stats = get_cache_stats('api.response')
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        # Created on first use, so configuring the cache can't break importing the routes.
+        if self._backend is None:
+            with self._lock:
+                if self._backend is None:
+                    self._backend = default_backend()
+        return self._backend
+
+    def _load(self, key: str) -> Optional[bytes]:
+        try:
+            return self.backend.get(key)
+        except Exception:
+            logger.warning("Response cache read failed", exc_info=True)
+            return None
+
+    def _store(self, key: str, entry: bytes) -> None:
+        try:
+            self.backend.set(key, entry, self.ttl)
+        except Exception:
+            logger.warning("Response cache write failed", exc_info=True)
+
+    def respond(self, route: str, validated, compute: Callable[[], object]) -> Response:
+        """Response for ``validated`` data on ``route``; ``compute()`` builds the payload on a miss."""
+        key = cache_key(route, validated)
+        entry = self._load(key) if self.ttl > 0 else None
+        if entry is None:
+            self.stats.miss()
+            body = jsonify(compute()).get_data()
+            # Stored as "<etag>\n<body>" so a hit needs no re-hashing.
+            entry = hashlib.sha256(body).hexdigest()[:32].encode('ascii') + b'\n' + body
+            if self.ttl > 0:
+                self._store(key, entry)
+        else:
+            self.stats.hit()
+        etag, body = entry.split(b'\n', 1)
+        etag = etag.decode('ascii')
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(body, mimetype='application/json')
+        response.set_etag(etag)
+        return response
+
+
+response_cache = ResponseCache()
@@ -1,27 +1,145 @@
-from flask import Blueprint, request, jsonify
-from src.models.aqi_model import predict_aqi
-from src.models.advisory_model import generate_advisory
-from src.api.validators import validate_aqi_request
+import json
+
+import numpy as np
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from src.utils.constants import PREDICTOR_COLUMNS, predict_aqi, predict_aqi_batch
+from src.models.advisory_model import get_custom_advisory, get_custom_advisories
+from src.api.metrics import span
+from src.api.response_cache import response_cache
+from src.api.validators import (
+    MAX_BATCH_RECORDS,
+    validate_advisory_request,
+    validate_batch,
+    validate_prediction_request,
+)
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+# Records validated and scored together per vectorized call.
+BATCH_CHUNK_SIZE = 1024
 
 api_bp = Blueprint('api', __name__)
 
+def _iter_ndjson(stream):
+    for count, line in enumerate(line for line in stream if line.strip()):
+        if count >= MAX_BATCH_RECORDS:
+            raise ValueError(f"Batch exceeds {MAX_BATCH_RECORDS} records.")
+        try:
+            yield json.loads(line), None
+        except ValueError as exc:
+            yield None, f"Invalid JSON: {exc}"
+
+def _iter_batch_records():
+    """Return an iterator of ``(record, error)`` pairs for a batch request body.
+
+    NDJSON bodies are read lazily, line by line, from the request stream; a
+    malformed line yields ``(None, message)`` so results stay aligned with the
+    input. JSON-array bodies are parsed up front and size-checked immediately.
+    """
+    if request.mimetype == NDJSON_MIMETYPE:
+        return _iter_ndjson(request.stream)
+    records = request.get_json(silent=True)
+    if not isinstance(records, list):
+        raise ValueError("Request body must be a JSON array or NDJSON.")
+    if len(records) > MAX_BATCH_RECORDS:
+        raise ValueError(f"Batch exceeds {MAX_BATCH_RECORDS} records.")
+    return ((record, None) for record in records)
+
+def _score_chunk(chunk, validator, score):
+    errors = {index: {"error": error, "field": None} for index, (_, error) in enumerate(chunk) if error is not None}
+    with span('validation'):
+        valid, errors = validate_batch([record for record, _ in chunk], validator, errors)
+    results = [None] * len(chunk)
+    for (index, _), result in zip(valid, score([value for _, value in valid])):
+        results[index] = result
+    for index, details in errors.items():
+        results[index] = details
+    return results
+
+def _iter_results(items, validator, score):
+    """Validate and score ``items`` BATCH_CHUNK_SIZE at a time, yielding results in order."""
+    items = iter(items)
+    chunk = []
+    while True:
+        # Only reading a record is guarded; errors from scoring propagate as-is.
+        try:
+            item = next(items)
+        except StopIteration:
+            break
+        except ValueError:
+            # Flush what was read before an oversized NDJSON body stopped the batch.
+            yield from _score_chunk(chunk, validator, score)
+            raise
+        chunk.append(item)
+        if len(chunk) == BATCH_CHUNK_SIZE:
+            yield from _score_chunk(chunk, validator, score)
+            chunk = []
+    if chunk:
+        yield from _score_chunk(chunk, validator, score)
+
+def _score_predictions(rows):
+    with span('prediction'):
+        matrix = np.array(rows, dtype=np.float64).reshape(-1, len(PREDICTOR_COLUMNS))
+        return [{"predicted_aqi": aqi} for aqi in predict_aqi_batch(matrix).tolist()]
+
+def _score_advisories(pairs):
+    with span('advisory'):
+        return get_custom_advisories([aqi for aqi, _ in pairs], [group for _, group in pairs])
+
+def _ndjson_lines(results):
+    try:
+        for result in results:
+            yield json.dumps(result) + "\n"
+    except ValueError as exc:
+        # Only reachable for NDJSON input that overruns MAX_BATCH_RECORDS.
+        yield json.dumps({"error": str(exc), "max_records": MAX_BATCH_RECORDS}) + "\n"
+
+def _batch_response(validator, score):
+    """Run a batch request, streaming NDJSON when the client asks for it."""
+    try:
+        results = _iter_results(_iter_batch_records(), validator, score)
+        if request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE]) == NDJSON_MIMETYPE:
+            return Response(stream_with_context(_ndjson_lines(results)), mimetype=NDJSON_MIMETYPE)
+        results = list(results)
+    except ValueError as exc:
+        return jsonify({"error": str(exc), "max_records": MAX_BATCH_RECORDS}), 400
+    errors = sum(1 for result in results if "error" in result)
+    return jsonify({"results": results, "count": len(results), "errors": errors}), 200
+
 @api_bp.route('/predict-aqi', methods=['POST'])
 def predict_aqi_route():
-    data = request.get_json()
-    if not validate_aqi_request(data):
+    data = request.get_json(silent=True)
+    try:
+        with span('validation'):
+            parameters = validate_prediction_request(data)
+    except ValueError:
         return jsonify({"error": "Invalid input data"}), 400
-    
-    parameters = data.get('parameters')
-    aqi = predict_aqi(parameters)
-    return jsonify({"predicted_aqi": aqi}), 200
+
+    def compute():
+        with span('prediction'):
+            return {"predicted_aqi": predict_aqi(parameters)}
+
+    return response_cache.respond('predict-aqi', [float(value) for value in parameters], compute)
 
 @api_bp.route('/advisory', methods=['POST'])
 def advisory_route():
-    data = request.get_json()
-    if not validate_aqi_request(data):
+    data = request.get_json(silent=True)
+    try:
+        with span('validation'):
+            aqi, group = validate_advisory_request(data)
+    except ValueError:
         return jsonify({"error": "Invalid input data"}), 400
-    
-    aqi = data.get('aqi')
-    group = data.get('group')
-    advisory = generate_advisory(aqi, group)
-    return jsonify(advisory), 200
\ No newline at end of file
+
+    def compute():
+        with span('advisory'):
+            return get_custom_advisory(aqi, group)
+
+    return response_cache.respond('advisory', [float(aqi), group], compute)
+
+@api_bp.route('/predict-aqi/batch', methods=['POST'])
+def predict_aqi_batch_route():
+    return _batch_response(validate_prediction_request, _score_predictions)
+
+@api_bp.route('/advisory/batch', methods=['POST'])
+def advisory_batch_route():
+    return _batch_response(validate_advisory_request, _score_advisories)
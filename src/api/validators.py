@@ -1,22 +1,97 @@
+from src.utils.constants import PREDICTOR_COLUMNS, PREDICTOR_IDS, SENSITIVE_GROUPS, resolve_pollutant
+
+# Upper bound on records accepted by the batch endpoints in one request.
+MAX_BATCH_RECORDS = 50000
+
+VALID_GROUPS = frozenset(SENSITIVE_GROUPS)
+_GROUP_ERROR = f"Group must be one of the following: {', '.join(SENSITIVE_GROUPS)}"
+
+class FieldError(ValueError):
+    """A validation error attributed to one field of the request."""
+
+    def __init__(self, field, message):
+        super().__init__(message)
+        self.field = field
+
+def error_details(exc):
+    """``{"error": message, "field": name}`` for a validation error; ``field`` is None for whole-record errors."""
+    return {"error": str(exc), "field": getattr(exc, 'field', None)}
+
 def validate_aqi(aqi):
-    if not isinstance(aqi, (int, float)):
-        raise ValueError("AQI must be a number.")
-    if aqi < 0 or aqi > 500:
-        raise ValueError("AQI must be between 0 and 500.")
+    if isinstance(aqi, bool) or not isinstance(aqi, (int, float)):
+        raise FieldError('aqi', "AQI must be a number.")
+    if not 0 <= aqi <= 500:
+        raise FieldError('aqi', "AQI must be between 0 and 500.")
 
 def validate_group(group):
-    valid_groups = [
-        "Children",
-        "Elderly",
-        "People with respiratory or heart diseases",
-        "Pregnant women"
-    ]
-    if group and group not in valid_groups:
-        raise ValueError(f"Group must be one of the following: {', '.join(valid_groups)}")
+    if group and (not isinstance(group, str) or group not in VALID_GROUPS):
+        raise FieldError('group', _GROUP_ERROR)
 
 def validate_request_data(data):
+    if not isinstance(data, dict):
+        raise ValueError("Request data must be a JSON object.")
     if 'aqi' not in data:
-        raise ValueError("Missing 'aqi' in request data.")
+        raise FieldError('aqi', "Missing 'aqi' in request data.")
     validate_aqi(data['aqi'])
     if 'group' in data:
-        validate_group(data['group'])
\ No newline at end of file
+        validate_group(data['group'])
+
+def validate_parameters(parameters):
+    """Validate pollutant readings and return them as a row in PREDICTOR_COLUMNS order.
+
+    Accepts a list of up to six numbers in that order or a mapping keyed by
+    any accepted pollutant spelling ('NO2', 'NO₂', 'pm10', ...); missing
+    pollutants count as 0.
+    """
+    if isinstance(parameters, dict):
+        by_id = {resolve_pollutant(key): value for key, value in parameters.items()}
+        unknown = [key for key in parameters if resolve_pollutant(key) not in PREDICTOR_IDS]
+        if unknown:
+            raise FieldError('parameters', f"Unknown parameters: {', '.join(map(str, unknown))}")
+        row = [by_id.get(pollutant_id, 0.0) for pollutant_id in PREDICTOR_IDS]
+    elif isinstance(parameters, list):
+        if len(parameters) > len(PREDICTOR_COLUMNS):
+            raise FieldError('parameters', f"Expected at most {len(PREDICTOR_COLUMNS)} parameters.")
+        row = parameters + [0.0] * (len(PREDICTOR_COLUMNS) - len(parameters))
+    else:
+        raise FieldError('parameters', "Parameters must be a list or an object keyed by pollutant.")
+    for value in row:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise FieldError('parameters', "Parameter values must be numbers.")
+        if not 0 <= value < float('inf'):
+            raise FieldError('parameters', "Parameter values must be finite and non-negative.")
+    return row
+
+def validate_prediction_request(data):
+    """Validate a /predict-aqi payload and return its parameter row."""
+    if not isinstance(data, dict):
+        raise ValueError("Request data must be a JSON object.")
+    if 'parameters' not in data:
+        raise FieldError('parameters', "Missing 'parameters' in request data.")
+    return validate_parameters(data['parameters'])
+
+def validate_advisory_request(data):
+    """Validate an /advisory payload and return its (aqi, group) pair."""
+    validate_request_data(data)
+    return data['aqi'], data.get('group')
+
+def validate_batch(records, validator, errors=None):
+    """Run ``validator`` over every record of a batch.
+
+    Returns ``(valid, errors)``: ``valid`` is a list of ``(index, result)`` pairs
+    in input order and ``errors`` maps the index of each rejected record to its
+    :func:`error_details`. Indices already present in ``errors`` are skipped.
+    """
+    errors = {} if errors is None else errors
+    if len(records) > MAX_BATCH_RECORDS:
+        raise ValueError(f"Batch exceeds {MAX_BATCH_RECORDS} records.")
+    valid = []
+    append = valid.append
+    for index, record in enumerate(records):
+        if index in errors:
+            continue
+        try:
+            append((index, validator(record)))
+        except ValueError as exc:
+            errors[index] = error_details(exc)
+    return valid, errors
@@ -1,4 +1,5 @@
 """Streamlit application entrypoint for Air Quality Advisory."""
+import functools
 import sys
 from pathlib import Path
 
@@ -8,12 +9,15 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
 import streamlit as st
-import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
-from typing import Tuple, Dict, Any
+from datetime import datetime
+from typing import TYPE_CHECKING, Tuple, Dict, Any, Optional
+
+# plotly and pandas are imported inside the functions that draw charts or build
+# the analysis table, so a cold start only pays for them when they are used.
+if TYPE_CHECKING:
+    import pandas as pd
+    import plotly.graph_objects as go
 
 from src.utils.constants import (
     AQILevel,
@@ -23,8 +27,19 @@ from src.utils.constants import (
     SENSITIVE_GROUPS,
     get_aqi_level,
     predict_aqi,
-    generate_daily_trend
+    generate_daily_trend,
+    get_pollutant_spec,
+    resolve_pollutant
 )
+from src.config import Config
+from src.models.forecaster import Forecaster
+from src.models.registry import ModelRegistry
+from src.services.alert_engine import ALERT_COLORS, ALERT_STATUSES, alert_level, alert_message
+from src.storage.archive import STEP_SECONDS, ReadingsArchive
+from src.storage.rollups import DAY_SECONDS, AQIRollups
+from src.utils.cache import all_cache_stats, get_cache_stats
+from src.utils.cities import CITY_REGISTRY
+from src.utils.trends import generate_trends
 
 st.set_page_config(
     page_title="Air Quality Health Advisory",
@@ -32,15 +47,12 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-def create_city_comparison(base_aqi: float) -> go.Figure:
-    cities = []
-    aqi_values = []
-    for city, factors in INDIAN_CITIES.items():
-        city_aqi = base_aqi * factors.get('base_mult', 1.0)
-        cities.append(city)
-        aqi_values.append(city_aqi)
+def create_city_comparison(base_aqi: float) -> "go.Figure":
+    import plotly.express as px
+    table = CITY_REGISTRY.compute_aqi(base_aqi)
+    aqi_values = table.aqi.tolist()
     fig = px.bar(
-        x=cities,
+        x=table.names.tolist(),
         y=aqi_values,
         title="AQI Comparison Across Cities",
         labels={"x": "City", "y": "AQI Value"},
@@ -52,18 +64,66 @@ def create_city_comparison(base_aqi: float) -> go.Figure:
     fig.add_hline(y=150, line_dash="dash", line_color="orange", annotation_text="Unhealthy")
     return fig
 
-def normalize_name(name: str) -> str:
-    # Lowercase and remove non-alphanumeric characters to compare keys robustly
-    return "".join([c for c in name.lower() if c.isalnum()])
+def create_recorded_comparison(archive: ReadingsArchive, pollutant: str, hours: int = 24) -> "go.Figure":
+    import plotly.express as px
+    names, means = archive.summarize(pollutant, start=archive.end - hours * STEP_SECONDS)
+    recorded = ~np.isnan(means)
+    names = [name for name, keep in zip(names, recorded.tolist()) if keep]
+    values = means[recorded].round(1).tolist()
+    unit = find_spec(pollutant).get('unit', '')
+    return px.bar(
+        x=names,
+        y=values,
+        title=f"Recorded {pollutant} ({hours}-hour mean)",
+        labels={"x": "City", "y": f"Level ({unit})"},
+        color=values,
+        color_continuous_scale="RdYlGn_r"
+    )
+
+def create_rollup_comparison(rollups: AQIRollups, days: int = 30) -> "go.Figure":
+    import plotly.express as px
+    summary = rollups.summarize(start=rollups.end - days * DAY_SECONDS)
+    recorded = summary.count > 0
+    names = [name for name, keep in zip(summary.cities, recorded.tolist()) if keep]
+    means = summary.mean[recorded].round(1).tolist()
+    return px.bar(
+        x=names,
+        y=means,
+        title=f"Recorded AQI ({days}-day mean)",
+        labels={"x": "City", "y": "AQI Value"},
+        color=means,
+        color_continuous_scale="RdYlGn_r",
+        hover_data={"Peak AQI": summary.maximum[recorded].round(1).tolist()}
+    )
+
+def create_rollup_trend(rollups: AQIRollups, city: str, days: int = 30) -> "go.Figure":
+    import plotly.graph_objects as go
+    daily = rollups.series(city, 'day', start=rollups.end - days * DAY_SECONDS)
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=daily.starts, y=daily.maximum, mode='lines', line_width=0, showlegend=False))
+    fig.add_trace(go.Scatter(x=daily.starts, y=daily.minimum, mode='lines', line_width=0, fill='tonexty', name='Daily range'))
+    fig.add_trace(go.Scatter(x=daily.starts, y=daily.mean, mode='lines+markers', name='Daily mean'))
+    fig.update_layout(title=f"{city} AQI, last {days} days", yaxis_title="AQI Value")
+    return fig
+
+def model_forecast(forecaster: Optional[Forecaster], city: str, pollutant: str, hours: int = 24):
+    """Next ``hours`` forecast for ``city`` as ``(timestamps, values)``, or None when the series isn't trained."""
+    key = (city, resolve_pollutant(pollutant))
+    if forecaster is None or key not in forecaster.ready():
+        return None
+    return forecaster.forecast([key], hours=hours).series(*key)
+
+def recent_history(archive: Optional[ReadingsArchive], city: str, pollutant: str, hours: int = 24):
+    """Last ``hours`` of archived readings for ``city`` as ``(timestamps, values)``, or None."""
+    if archive is None or not archive.has(city, pollutant):
+        return None
+    return archive.series(city, pollutant, start=archive.end - hours * STEP_SECONDS)
 
 def find_spec(pollutant_label: str) -> Dict[str, Any]:
-    # Try exact lookup then normalized matching against POLLUTANT_SPECS keys
-    if pollutant_label in POLLUTANT_SPECS:
-        return POLLUTANT_SPECS[pollutant_label]
-    norm = normalize_name(pollutant_label)
-    for key, spec in POLLUTANT_SPECS.items():
-        if normalize_name(key) == norm:
-            return spec
+    # Any accepted spelling ('NO₂', 'NO2', 'pm2_5', ...) resolves with one dict hit
+    spec = get_pollutant_spec(pollutant_label)
+    if spec is not None:
+        return spec
     # fallback minimal spec
     return {
         'unit': '',
@@ -77,39 +137,27 @@ def find_spec(pollutant_label: str) -> Dict[str, Any]:
     }
 
 def check_pollutant_levels(pollutant: str, value: float, specs: dict) -> Tuple[str, str, str]:
-    if value >= specs.get('severe_threshold', float('inf')):
-        return (
-            "SEVERE ALERT",
-            f"⚠️ {pollutant} level is {value:.1f} {specs.get('unit','')} - SEVERE!\n{specs.get('health_effects','')}\nRecommended Action: Immediate reduction needed!",
-            "red"
-        )
-    elif value >= specs.get('warning_threshold', float('inf')):
-        return (
-            "WARNING",
-            f"⚡ {pollutant} level is {value:.1f} {specs.get('unit','')} - HIGH!\n{specs.get('health_effects','')}\nRecommended Action: Consider reduction measures",
-            "orange"
-        )
-    return ("NORMAL", f"✅ {pollutant} level is within acceptable range", "green")
-
-def create_trend_chart(pollutant: str, current_value: float, specs: dict) -> go.Figure:
-    hours = 24
-    now = datetime.now()
-    x = [now + timedelta(hours=i) for i in range(hours)]
-    base = float(current_value)
-    y = []
-    current_hour = now.hour
-    for hour in range(hours):
-        h = (current_hour + hour) % 24
-        if 6 <= h <= 9:
-            factor = 1.2
-        elif 17 <= h <= 20:
-            factor = 1.3
-        else:
-            factor = 0.9
-        value = base * factor * (1 + np.random.normal(0, 0.08))
-        y.append(max(0.0, value))
+    level = alert_level(value, specs)
+    return ALERT_STATUSES[level], alert_message(pollutant, value, level, specs), ALERT_COLORS[level]
+
+def create_trend_chart(pollutant: str, current_value: float, specs: dict, seed: Optional[int] = None,
+                       history: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+                       forecast: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> "go.Figure":
+    import plotly.graph_objects as go
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=x, y=y, mode='lines+markers', name=f'{pollutant} Trend'))
+    if history is not None:
+        times, values = history
+        fig.add_trace(go.Scatter(x=times, y=values, mode='lines', name=f'{pollutant} Recorded'))
+    if forecast is not None:
+        times, values = forecast
+        fig.add_trace(go.Scatter(x=times, y=values, mode='lines+markers', name=f'{pollutant} Forecast'))
+    else:
+        # No trained model for this series: fall back to the synthetic daily profile.
+        hours = 24
+        now = datetime.now()
+        x = np.datetime64(now.replace(microsecond=0)) + np.arange(hours) * np.timedelta64(1, 'h')
+        y = generate_trends(current_value, hours, start_hour=now.hour, profile='rush_hour', noise=0.08, seed=seed)
+        fig.add_trace(go.Scatter(x=x, y=y, mode='lines+markers', name=f'{pollutant} Trend'))
     if specs.get('warning_threshold', None) is not None:
         fig.add_hline(y=specs['warning_threshold'], line_dash="dash", line_color="orange", annotation_text="Warning Threshold")
     if specs.get('severe_threshold', None) is not None and np.isfinite(specs['severe_threshold']):
@@ -117,11 +165,130 @@ def create_trend_chart(pollutant: str, current_value: float, specs: dict) -> go.
     fig.update_layout(title=f"{pollutant} 24-Hour Trend Prediction", xaxis_title="Time", yaxis_title=f"Level ({specs.get('unit','')})", hovermode='x unified')
     return fig
 
+# Bounds shared by the Streamlit caches below.
+CACHE_TTL_SECONDS = 600
+CACHE_MAX_ENTRIES = 512
+
+def st_cached(name: str, resource: bool = False):
+    """Wrap a function in st.cache_data (or st.cache_resource) and count hits/misses.
+
+    Streamlit keys the cache on the argument values; the wrapped body only runs
+    on a miss, which is what the CacheStats registered under ``name`` records.
+    """
+    stats = get_cache_stats(name)
+    cache = st.cache_resource if resource else st.cache_data
+
+    def decorate(func):
+        @functools.wraps(func)
+        def compute(*args, **kwargs):
+            stats.miss()
+            return func(*args, **kwargs)
+
+        cached_func = cache(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)(compute)
+
+        @functools.wraps(func)
+        def lookup(*args, **kwargs):
+            misses = stats.misses
+            result = cached_func(*args, **kwargs)
+            if stats.misses == misses:
+                stats.hit()
+            return result
+
+        lookup.clear = cached_func.clear
+        return lookup
+
+    return decorate
+
+@st_cached("prediction")
+def cached_predict_aqi(input_vector: Tuple[float, ...]) -> float:
+    return float(predict_aqi(list(input_vector)))
+
+@st_cached("city_comparison")
+def cached_city_comparison(base_aqi: float) -> "go.Figure":
+    return create_city_comparison(base_aqi)
+
+@st_cached("archive", resource=True)
+def load_archive(path: str) -> Optional[ReadingsArchive]:
+    # Reopened when the cache entry expires, which picks up newly appended hours.
+    return ReadingsArchive.open(path)
+
+@st_cached("forecaster", resource=True)
+def load_forecaster() -> Forecaster:
+    # One per process; current_forecaster trains it on new archive hours with partial_fit.
+    return Forecaster()
+
+@st_cached("model_registry", resource=True)
+def load_registry(path: str) -> ModelRegistry:
+    # One registry per process; it follows CURRENT itself, so new versions need no cache clear.
+    return ModelRegistry(path)
+
+def current_forecaster(archive: Optional[ReadingsArchive]) -> Optional[Forecaster]:
+    """The published forecaster if the registry has one, else one trained from the archive."""
+    forecaster = load_registry(Config.MODEL_REGISTRY_PATH).get('forecaster', None)
+    if forecaster is None and archive is not None and archive.length:
+        forecaster = load_forecaster()
+        forecaster.update_from_archive(archive)
+    return forecaster
+
+@st_cached("trend_chart")
+def cached_trend_chart(pollutant: str, current_value: float, city: str, archive_end: Optional[int]) -> "go.Figure":
+    # archive_end is part of the cache key so charts refresh when hours are appended.
+    archive = load_archive(Config.ARCHIVE_PATH)
+    history = recent_history(archive, city, pollutant)
+    forecast = model_forecast(current_forecaster(archive), city, pollutant)
+    return create_trend_chart(pollutant, current_value, find_spec(pollutant), history=history, forecast=forecast)
+
+@st_cached("recorded_comparison")
+def cached_recorded_comparison(pollutant: str, archive_end: int) -> "go.Figure":
+    # archive_end is part of the cache key so charts refresh when hours are appended.
+    return create_recorded_comparison(load_archive(Config.ARCHIVE_PATH), pollutant)
+
+ROLLUP_DAYS = 30
+
+@st_cached("rollups", resource=True)
+def load_rollups() -> AQIRollups:
+    # One per process, kept current by synced_rollups.
+    return AQIRollups()
+
+def synced_rollups(archive: ReadingsArchive) -> AQIRollups:
+    """The process rollups, after folding in only the archive hours appended since the last sync."""
+    rollups = load_rollups()
+    rollups.update_from_archive(archive, start=archive.end - ROLLUP_DAYS * DAY_SECONDS)
+    return rollups
+
+@st_cached("rollup_comparison")
+def cached_rollup_comparison(archive_end: int) -> "go.Figure":
+    # archive_end is part of the cache key so charts refresh when hours are appended.
+    return create_rollup_comparison(synced_rollups(load_archive(Config.ARCHIVE_PATH)), days=ROLLUP_DAYS)
+
+@st_cached("rollup_trend")
+def cached_rollup_trend(city: str, archive_end: int) -> "go.Figure":
+    return create_rollup_trend(synced_rollups(load_archive(Config.ARCHIVE_PATH)), city, days=ROLLUP_DAYS)
+
+@st_cached("pollutant_analysis")
+def cached_pollutant_analysis(poll_names: Tuple[str, ...], values: Tuple[float, ...]) -> Tuple["pd.DataFrame", "go.Figure"]:
+    import pandas as pd
+    import plotly.express as px
+    pollutant_df = pd.DataFrame({
+        'Pollutant': list(poll_names),
+        'Value': list(values),
+        'Unit': [find_spec(n).get('unit','') for n in poll_names]
+    })
+    fig = px.bar(pollutant_df, x='Pollutant', y='Value', title='Current Pollutant Levels', color='Value', color_continuous_scale='RdYlGn_r', text='Value')
+    fig.update_traces(texttemplate='%{text:.1f}', textposition='outside')
+    return pollutant_df, fig
+
+def show_cache_stats():
+    st.sidebar.markdown("### Cache Statistics")
+    for name, stats in all_cache_stats().items():
+        st.sidebar.markdown(f"- **{name}**: {stats['hit_rate']:.0%} hit rate ({stats['hits']} hits / {stats['misses']} misses)")
+
 def main():
     st.title("🌫️ Advanced Air Quality Prediction & Health Advisory")
     st.markdown("Real-time air quality monitoring and health impact assessment system")
     st.sidebar.title("⚙️ Configuration")
     selected_city = st.sidebar.selectbox("Select City", list(INDIAN_CITIES.keys()), help="Choose a city to adjust predictions based on local patterns")
+    show_stats = st.sidebar.checkbox("Show cache statistics", value=False)
     st.subheader("📊 Pollutant Measurements")
     tab1, tab2 = st.tabs(["Primary Pollutants", "Secondary Pollutants"])
     input_values = {}
@@ -151,7 +318,9 @@ def main():
                     with st.expander(f"📈 {disp} Trend Analysis"):
                         cA, cB = st.columns([2,1])
                         with cA:
-                            trend_fig = create_trend_chart(disp, value, specs)
+                            archive = load_archive(Config.ARCHIVE_PATH)
+                            archive_end = archive.end if archive is not None else None
+                            trend_fig = cached_trend_chart(disp, value, selected_city, archive_end)
                             st.plotly_chart(trend_fig, use_container_width=True)
                         with cB:
                             safe_thresh = specs.get('warning_threshold', 1.0)
@@ -191,7 +360,11 @@ def main():
     with st.expander("ℹ️ View Healthy Ranges and Health Effects"):
         for pollutant_key, specs in POLLUTANT_SPECS.items():
             st.markdown(f"### {pollutant_key}\n- **Description**: {specs.get('description','')}\n- **Normal Range**: < {specs.get('warning_threshold',0)} {specs.get('unit','')}\n- **Warning Level**: {specs.get('warning_threshold',0)} - {specs.get('severe_threshold',0)} {specs.get('unit','')}\n- **Severe Level**: > {specs.get('severe_threshold',0)} {specs.get('unit','')}\n- **Health Effects**: {specs.get('health_effects','')}\n---")
+    # Widgets inside the results (e.g. the recorded-pollutant selector) rerun the
+    # script with the button released, so remember that a prediction was asked for.
     if st.button("Predict AQI"):
+        st.session_state["show_prediction"] = True
+    if st.session_state.get("show_prediction"):
         # Build input vector - use normalized lookup
         input_vector = [
             input_values.get('NO₂', input_values.get('NO2', 0.0)),
@@ -201,7 +374,7 @@ def main():
             input_values.get('PM₁₀', input_values.get('PM10', 0.0)),
             input_values.get('NH₃', input_values.get('NH3', 0.0))
         ]
-        base_aqi = float(predict_aqi(input_vector))
+        base_aqi = cached_predict_aqi(tuple(input_vector))
         city_factor = INDIAN_CITIES.get(selected_city, {}).get('base_mult', 1.0)
         final_aqi = base_aqi * city_factor
         aqi_level = get_aqi_level(final_aqi)
@@ -220,23 +393,28 @@ def main():
                     st.markdown(f"- {rec}")
         with tabB:
             st.markdown("### 🏙️ City-wise AQI Comparison")
-            city_fig = create_city_comparison(base_aqi)
+            city_fig = cached_city_comparison(base_aqi)
             st.info(f"City Factor: {city_factor:.2f}x  •  Base AQI: {base_aqi:.1f}  •  Final AQI: {final_aqi:.1f}  •  Context: {selected_city}")
             st.plotly_chart(city_fig, use_container_width=True)
+            archive = load_archive(Config.ARCHIVE_PATH)
+            if archive is not None and archive.length:
+                recorded = st.selectbox("Recorded pollutant", list(POLLUTANT_SPECS), index=list(POLLUTANT_SPECS).index('PM₂.₅'))
+                st.plotly_chart(cached_recorded_comparison(recorded, archive.end), use_container_width=True)
+                rollups = synced_rollups(archive)
+                if rollups.cities():
+                    st.plotly_chart(cached_rollup_comparison(archive.end), use_container_width=True)
+                    if selected_city in rollups.cities():
+                        st.plotly_chart(cached_rollup_trend(selected_city, archive.end), use_container_width=True)
         with tabC:
             st.markdown("### 🔍 Pollutant Analysis")
             poll_names = ['NO₂', 'SO₂', 'CO', 'O₃', 'PM₁₀', 'NH₃']
-            pollutant_df = pd.DataFrame({
-                'Pollutant': poll_names,
-                'Value': [input_values.get(n, 0.0) for n in poll_names],
-                'Unit': [find_spec(n).get('unit','') for n in poll_names]
-            })
-            fig = px.bar(pollutant_df, x='Pollutant', y='Value', title='Current Pollutant Levels', color='Value', color_continuous_scale='RdYlGn_r', text='Value')
-            fig.update_traces(texttemplate='%{text:.1f}', textposition='outside')
+            pollutant_df, fig = cached_pollutant_analysis(tuple(poll_names), tuple(input_values.get(n, 0.0) for n in poll_names))
             st.plotly_chart(fig, use_container_width=True)
             st.markdown("### Pollutant Information")
             for _, row in pollutant_df.iterrows():
                 st.markdown(f"**{row['Pollutant']}**: {row['Value']:.1f} {row['Unit']}")
+    if show_stats:
+        show_cache_stats()
 if __name__ == "__main__":
     main()
 # ...existing code...streamlit run src\app.py
\ No newline at end of file
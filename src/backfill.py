@@ -0,0 +1,160 @@
+"""Re-score archived readings with the current AQI coefficients.
+
+Reads a CSV or Parquet archive in fixed-size chunks, scores each chunk with the
+vectorized predictor in a process pool, and appends the AQI and category to a
+CSV output in input order. Progress is checkpointed after every chunk so an
+interrupted run picks up where it stopped with ``--resume``.
+
+    python -m src.backfill readings.csv scored.csv --chunk-size 500000 --resume
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, Optional
+
+import pandas as pd
+
+from src.models.aqi_model import CompiledAQIModel, canonical_parameter
+from src.utils.constants import get_aqi_categories, predict_aqi_batch
+
+DEFAULT_CHUNK_SIZE = 250_000
+
+
+def iter_chunks(path: str, chunk_size: int, skip_rows: int = 0) -> Iterator[pd.DataFrame]:
+    """Yield DataFrames of at most ``chunk_size`` rows, skipping the first ``skip_rows``."""
+    if path.endswith('.parquet'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Reading Parquet archives requires pyarrow (pip install pyarrow)") from None
+        seen = 0
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            offset = max(0, skip_rows - seen)
+            seen += batch.num_rows
+            if offset < batch.num_rows:
+                yield batch.to_pandas().iloc[offset:]
+    else:
+        # A callable, not a range: pandas turns a list-like skiprows into a set of every skipped row.
+        skip = (lambda row: 0 < row <= skip_rows) if skip_rows else None
+        yield from pd.read_csv(path, chunksize=chunk_size, skiprows=skip)
+
+
+def score_chunk(frame: pd.DataFrame, coefficients: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+    """Append ``aqi`` and ``category`` columns to one chunk (runs in a worker process)."""
+    if coefficients:
+        model = CompiledAQIModel(coefficients)
+        columns_by_id = {canonical_parameter(column): column for column in frame.columns}
+        try:
+            columns = [columns_by_id[canonical_parameter(param)] for param in model.columns]
+        except KeyError as exc:
+            raise ValueError(f"Missing model column {exc.args[0]!r}") from None
+        aqi = model.predict_many(frame[columns].to_numpy(dtype='float64'))
+    else:
+        aqi = predict_aqi_batch(frame)
+    return frame.assign(aqi=aqi, category=get_aqi_categories(aqi))
+
+
+class Checkpoint:
+    """Progress of one backfill run, stored next to the output as JSON."""
+
+    def __init__(self, output: str):
+        self.path = output + '.progress.json'
+        self.state = {'chunks': 0, 'rows': 0, 'bytes': 0}
+
+    def load(self, source: str, chunk_size: int) -> bool:
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path) as handle:
+            state = json.load(handle)
+        if state.get('source') != source or state.get('chunk_size') != chunk_size:
+            raise SystemExit(f"{self.path} belongs to a different run; remove it or drop --resume")
+        self.state = state
+        return True
+
+    def save(self, source: str, chunk_size: int) -> None:
+        self.state.update(source=source, chunk_size=chunk_size)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as handle:
+            json.dump(self.state, handle)
+        os.replace(tmp, self.path)
+
+    def clear(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def run_backfill(source: str, output: str, chunk_size: int = DEFAULT_CHUNK_SIZE, workers: Optional[int] = None,
+                 resume: bool = False, coefficients: Optional[Dict[str, float]] = None, log=sys.stderr) -> int:
+    """Score ``source`` into ``output``; returns the number of rows written this run."""
+    checkpoint = Checkpoint(output)
+    resumed = resume and checkpoint.load(source, chunk_size)
+    if resumed and not os.path.exists(output):
+        # The checkpoint outlived its output: nothing to resume, so start over.
+        checkpoint.state = {'chunks': 0, 'rows': 0, 'bytes': 0}
+        resumed = False
+    if resumed:
+        # Drop anything written after the last checkpoint (a partially written chunk).
+        with open(output, 'r+b') as handle:
+            handle.truncate(checkpoint.state['bytes'])
+    else:
+        checkpoint.clear()
+        open(output, 'w').close()
+
+    workers = workers or os.cpu_count() or 1
+    started = time.monotonic()
+    written = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool, open(output, 'a', newline='') as out:
+        pending = deque()
+
+        def drain_one():
+            nonlocal written
+            scored = pending.popleft().result()
+            scored.to_csv(out, header=checkpoint.state['bytes'] == 0, index=False)
+            out.flush()
+            checkpoint.state['chunks'] += 1
+            checkpoint.state['rows'] += len(scored)
+            checkpoint.state['bytes'] = out.tell()
+            checkpoint.save(source, chunk_size)
+            written += len(scored)
+            elapsed = time.monotonic() - started
+            print(f"chunk {checkpoint.state['chunks']}: {checkpoint.state['rows']} rows total, "
+                  f"{written / elapsed if elapsed else 0:,.0f} rows/s", file=log)
+
+        # At most two chunks per worker are in flight, so memory stays bounded
+        # by the chunk size no matter how large the archive is.
+        for chunk in iter_chunks(source, chunk_size, skip_rows=checkpoint.state['rows']):
+            if len(pending) >= 2 * workers:
+                drain_one()
+            pending.append(pool.submit(score_chunk, chunk, coefficients))
+        while pending:
+            drain_one()
+
+    elapsed = time.monotonic() - started
+    print(f"done: {written} rows in {elapsed:.1f}s ({written / elapsed if elapsed else 0:,.0f} rows/s)", file=log)
+    checkpoint.clear()
+    return written
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('source', help='CSV or .parquet archive with NO2/SO2/CO/O3/PM10/NH3 columns')
+    parser.add_argument('output', help='CSV file to write (input columns plus aqi and category)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('--resume', action='store_true', help='continue an interrupted run')
+    parser.add_argument('--coefficients', help='JSON file of AQIModel coefficients to score with instead of predict_aqi')
+    args = parser.parse_args(argv)
+    coefficients = None
+    if args.coefficients:
+        with open(args.coefficients) as handle:
+            coefficients = json.load(handle)
+    run_backfill(args.source, args.output, args.chunk_size, args.workers, args.resume, coefficients)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -8,6 +8,15 @@ class Config:
     TESTING = os.getenv('TESTING', 'False') == 'True'
     SECRET_KEY = os.getenv('SECRET_KEY', 'your_secret_key')
     API_KEY = os.getenv('API_KEY', 'your_api_key')
+    API_URL = os.getenv('API_URL', 'https://api.example.com')
+    API_TIMEOUT = float(os.getenv('API_TIMEOUT', '5'))
+    INGEST_CONCURRENCY = int(os.getenv('INGEST_CONCURRENCY', '50'))
+    METRICS_SAMPLE_RATE = float(os.getenv('METRICS_SAMPLE_RATE', '1.0'))
+    RESPONSE_CACHE_TTL = float(os.getenv('RESPONSE_CACHE_TTL', '60'))
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '4096'))
+    RESPONSE_CACHE_URL = os.getenv('RESPONSE_CACHE_URL')
+    ARCHIVE_PATH = os.getenv('ARCHIVE_PATH', 'data/archive')
+    MODEL_REGISTRY_PATH = os.getenv('MODEL_REGISTRY_PATH', 'data/models')
     AQI_THRESHOLD = {
         "good": 50,
         "moderate": 100,
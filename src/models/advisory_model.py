@@ -1,17 +1,79 @@
-from src.utils.constants import SENSITIVE_GROUPS, AQI_ADVISORY_TABLE
+import numpy as np
+
+from src.utils.cache import get_cache_stats
+from src.utils.constants import SENSITIVE_GROUPS, AQI_ADVISORY_TABLE, aqi_category_index, classify_aqi
+
+OUT_OF_RANGE = ("Unknown", "AQI value out of range. Please check the input.")
+
+# Indexed by category index: table rows, then the above-range slot and the
+# trailing slot that doubles as the invalid (-1) entry.
+_CATEGORY_ADVICE = tuple((category, advice) for _, _, category, advice in AQI_ADVISORY_TABLE) + (OUT_OF_RANGE, OUT_OF_RANGE)
+_CATEGORY_ARRAY = np.array([category for category, _ in _CATEGORY_ADVICE], dtype=object)
+_ADVICE_ARRAY = np.array([advice for _, advice in _CATEGORY_ADVICE], dtype=object)
 
 def get_aqi_category_and_advice(aqi: float):
-    for lower, upper, category, advice in AQI_ADVISORY_TABLE:
-        if lower <= aqi <= upper:
-            return category, advice
-    return "Unknown", "AQI value out of range. Please check the input."
+    return _CATEGORY_ADVICE[aqi_category_index(aqi)]
 
-def get_custom_advisory(aqi: float, group: str = None):
-    category, advice = get_aqi_category_and_advice(aqi)
-    if group and group in SENSITIVE_GROUPS and aqi >= 101:
+def get_aqi_categories_and_advice(aqi_values):
+    """Bulk form of get_aqi_category_and_advice: (categories, advice) object arrays."""
+    indices = classify_aqi(aqi_values)
+    return _CATEGORY_ARRAY[indices], _ADVICE_ARRAY[indices]
+
+class Advisory(dict):
+    """Read-only advisory result shared between callers; serializes like a dict."""
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Advisory results are shared and read-only; copy with dict() first.")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    # The default dict-subclass pickling refills items through __setitem__; rebuild
+    # through the constructor instead. The values are strings, so copies can share them.
+    def __reduce__(self):
+        return (Advisory, (dict(self),))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+def _build_advisory(index: int, group: str) -> Advisory:
+    category, advice = _CATEGORY_ADVICE[index]
+    lower = AQI_ADVISORY_TABLE[index][0] if 0 <= index < len(AQI_ADVISORY_TABLE) else None
+    if group in SENSITIVE_GROUPS and lower is not None and lower >= 101:
         advice += f" {group} should consider limiting outdoor exertion, wearing masks, and staying indoors if possible."
-    return {
-        "aqi_category": category,
-        "advice": advice,
-        "group": group or "General"
-    }
\ No newline at end of file
+    return Advisory(aqi_category=category, advice=advice, group=group)
+
+# Every possible (category, group) advisory, built once. _ADVISORY_ROWS holds the
+# same objects indexed by category index for the hot path.
+_ADVISORY_GROUPS = ("General",) + tuple(SENSITIVE_GROUPS)
+_ADVISORY_ROWS = tuple(
+    {group: _build_advisory(index, group) for group in _ADVISORY_GROUPS}
+    for index in range(len(_CATEGORY_ADVICE))
+)
+ADVISORY_TABLE = {
+    (advisory["aqi_category"], group): advisory
+    for row in _ADVISORY_ROWS
+    for group, advisory in row.items()
+}
+ADVISORY_CACHE_STATS = get_cache_stats("advisory")
+
+def _lookup_advisory(index: int, group: str) -> Advisory:
+    advisory = _ADVISORY_ROWS[index].get(group or "General")
+    if advisory is None:
+        # Groups outside SENSITIVE_GROUPS never get the suffix; build on demand.
+        ADVISORY_CACHE_STATS.miss()
+        return _build_advisory(index, group)
+    ADVISORY_CACHE_STATS.hit()
+    return advisory
+
+def get_custom_advisory(aqi: float, group: str = None):
+    return _lookup_advisory(aqi_category_index(aqi), group)
+
+def get_custom_advisories(aqi_values, groups):
+    """Bulk form of get_custom_advisory for parallel sequences of AQI values and groups."""
+    indices = classify_aqi(aqi_values).tolist()
+    return [_lookup_advisory(index, group) for index, group in zip(indices, groups)]
@@ -1,8 +1,16 @@
 import numpy as np
 
+from src.utils.constants import resolve_pollutant
+
+def canonical_parameter(name):
+    """Canonical pollutant id for ``name``, or ``name`` itself for non-pollutant keys."""
+    return resolve_pollutant(name) or name
+
 class AQIModel:
     def __init__(self, coefficients):
         self.coefficients = coefficients
+        # Coefficient key for each canonical id, so parameters may use any spelling.
+        self._keys_by_id = {canonical_parameter(param): param for param in coefficients}
 
     def predict_aqi(self, parameters):
         """
@@ -10,7 +18,9 @@ class AQIModel:
         Parameters should be a dictionary with keys matching the coefficients.
         """
         if not all(param in parameters for param in self.coefficients.keys()):
-            raise ValueError("Missing parameters for AQI prediction.")
+            parameters = {self._keys_by_id.get(canonical_parameter(param), param): value for param, value in parameters.items()}
+            if not all(param in parameters for param in self.coefficients.keys()):
+                raise ValueError("Missing parameters for AQI prediction.")
 
         aqi = sum(self.coefficients[param] * parameters[param] for param in self.coefficients)
         return self._scale_aqi(aqi)
@@ -21,6 +31,67 @@ class AQIModel:
         """
         return max(0, min(aqi, 500))
 
+    def compile(self):
+        """Return a CompiledAQIModel with these coefficients frozen."""
+        return CompiledAQIModel(self.coefficients)
+
+class CompiledAQIModel:
+    """AQIModel frozen into a fixed column order and a NumPy weight vector.
+
+    Built once per coefficient set; ``predict_many`` scores a whole batch with
+    one matrix-vector product. ``__slots__`` keeps per-model overhead small when
+    there is one model per city or region.
+    """
+    __slots__ = ('columns', 'weights', '_positions')
+
+    def __init__(self, coefficients):
+        self.columns = tuple(coefficients)
+        self.weights = np.array([coefficients[param] for param in self.columns], dtype=np.float64)
+        self.weights.flags.writeable = False
+        self._positions = {canonical_parameter(param): position for position, param in enumerate(self.columns)}
+
+    @classmethod
+    def from_weights(cls, columns, weights):
+        """Wrap an existing read-only weight vector (e.g. a memory map) without copying it."""
+        model = cls.__new__(cls)
+        model.columns = tuple(columns)
+        model.weights = weights
+        model._positions = {canonical_parameter(param): position for position, param in enumerate(model.columns)}
+        return model
+
+    def _row(self, parameters):
+        row = [None] * len(self.columns)
+        for param, value in parameters.items():
+            position = self._positions.get(canonical_parameter(param))
+            if position is not None:
+                row[position] = value
+        if None in row:
+            raise ValueError("Missing parameters for AQI prediction.")
+        return row
+
+    def predict_aqi(self, parameters):
+        """Predict a single AQI from a parameter dictionary (any accepted key spelling)."""
+        aqi = sum(weight * value for weight, value in zip(self.weights.tolist(), self._row(parameters)))
+        return max(0, min(aqi, 500))
+
+    def predict_many(self, data):
+        """Predict AQI for an (N, len(columns)) array in ``columns`` order, a DataFrame or a list of parameter dicts."""
+        if hasattr(data, 'columns') and hasattr(data, 'to_numpy'):
+            # A DataFrame: pick the model's columns under any accepted spelling.
+            columns_by_id = {canonical_parameter(column): column for column in data.columns}
+            missing = [param for param in self.columns if canonical_parameter(param) not in columns_by_id]
+            if missing:
+                raise ValueError(f"Missing parameters for AQI prediction: {', '.join(missing)}")
+            data = data[[columns_by_id[canonical_parameter(param)] for param in self.columns]].to_numpy(dtype=np.float64)
+        elif not isinstance(data, np.ndarray) and len(data) and isinstance(data[0], dict):
+            data = [self._row(parameters) for parameters in data]
+        matrix = np.asarray(data, dtype=np.float64)
+        if matrix.ndim == 1 and matrix.size == 0:
+            matrix = matrix.reshape(0, len(self.columns))
+        if matrix.ndim != 2 or matrix.shape[1] != len(self.columns):
+            raise ValueError(f"Expected an (N, {len(self.columns)}) array in {self.columns} order, got shape {matrix.shape}")
+        return np.clip(matrix @ self.weights, 0, 500)
+
 # Example usage
 if __name__ == "__main__":
     coefficients = {
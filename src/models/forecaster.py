@@ -0,0 +1,321 @@
+"""Online per-city, per-pollutant forecasts with scikit-learn's ``partial_fit``.
+
+Every (city, pollutant) series gets its own ``SGDRegressor`` over lagged
+readings and the hour of day. New readings train the model incrementally
+with ``partial_fit``, so there are no full retrains, and they shift the series'
+row of a shared history matrix.
+
+Readings are scaled by the pollutant's warning threshold before fitting, so
+all models see features of roughly unit size whatever the pollutant's unit.
+
+:meth:`Forecaster.forecast` serves next-hours forecasts for many series in one
+call. The fitted models are linear, so their coefficients are stacked into one
+weight matrix and the recursive forecast is a few array operations per hour
+for all series at once, with no per-model ``predict`` calls. The stacked
+weights and the forward-filled, scaled history (the lag features of the first
+forecast hour) are cached and rebuilt only for series updated since the last
+forecast.
+
+scikit-learn is imported when the first model is created, so importing this
+module stays cheap for the API and the dashboard.
+"""
+import threading
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.storage.archive import STEP_SECONDS, ReadingsArchive, to_hour, to_seconds
+from src.utils.constants import PREDICTOR_IDS, POLLUTANT_SPECS_BY_ID, resolve_pollutant
+
+DEFAULT_LAGS = (1, 2, 3, 24)
+DEFAULT_HORIZON = 24
+DEFAULT_MIN_SAMPLES = 24
+HOURS_PER_DAY = 24
+_NO_HOUR = np.iinfo(np.int64).min
+
+SeriesKey = Tuple[str, str]
+
+# Per-series state arrays, saved and restored by the model registry.
+STATE_ARRAYS = ('samples', 'last_hour', 'scales', 'history', '_weights', '_intercepts', '_features')
+
+
+def _pollutant_id(pollutant: str) -> str:
+    pollutant_id = resolve_pollutant(pollutant)
+    if pollutant_id not in POLLUTANT_SPECS_BY_ID:
+        raise KeyError(f"Unknown pollutant {pollutant!r}")
+    return pollutant_id
+
+
+def _scale(pollutant_id: str) -> float:
+    return float(POLLUTANT_SPECS_BY_ID[pollutant_id].get('warning_threshold') or 1.0)
+
+
+def _hour_features(hours: np.ndarray) -> np.ndarray:
+    """``(sin, cos)`` of the hour of day for epoch-second ``hours``, shape (N, 2)."""
+    angle = (hours // STEP_SECONDS % HOURS_PER_DAY) * (2 * np.pi / HOURS_PER_DAY)
+    return np.column_stack((np.sin(angle), np.cos(angle)))
+
+
+def _forward_fill(rows: np.ndarray) -> np.ndarray:
+    """Replace each NaN with the last earlier value in its row (leading NaNs become 0)."""
+    valid = ~np.isnan(rows)
+    positions = np.where(valid, np.arange(rows.shape[1]), 0)
+    np.maximum.accumulate(positions, axis=1, out=positions)
+    filled = np.take_along_axis(rows, positions, axis=1)
+    return np.where(np.isnan(filled), 0.0, filled)
+
+
+class Forecast(NamedTuple):
+    keys: List[SeriesKey]
+    start: np.ndarray
+    values: np.ndarray
+
+    def series(self, city: str, pollutant: str) -> Tuple[np.ndarray, np.ndarray]:
+        """``(timestamps, values)`` of one forecast row."""
+        row = self.keys.index((city, _pollutant_id(pollutant)))
+        hours = self.start[row] + np.arange(self.values.shape[1]) * np.timedelta64(STEP_SECONDS, 's')
+        return hours, self.values[row]
+
+
+class Forecaster:
+    """One online regressor per (city, pollutant), trained on hourly readings.
+
+    ``lags`` are the hours back whose readings are features; a series can be
+    forecast once ``min_samples`` rows with complete lags have been fitted.
+    ``sgd_params`` override the ``SGDRegressor`` defaults below.
+    """
+
+    def __init__(self, lags: Sequence[int] = DEFAULT_LAGS, min_samples: int = DEFAULT_MIN_SAMPLES, **sgd_params):
+        self.lags = np.array(sorted(lags), dtype=np.int64)
+        self.window = int(self.lags[-1])
+        self.min_samples = min_samples
+        self.sgd_params = {'alpha': 1e-5, 'eta0': 0.02, 'average': True, 'random_state': 0, **sgd_params}
+        self.keys: List[SeriesKey] = []
+        self.models: list = []
+        self.samples = np.zeros(0, dtype=np.int64)
+        self.last_hour = np.zeros(0, dtype=np.int64)
+        self.scales = np.zeros(0)
+        # Last ``window`` hours of each series, oldest first; NaN where missing.
+        self.history = np.zeros((0, self.window))
+        self._index: Dict[SeriesKey, int] = {}
+        self._weights = np.zeros((0, len(self.lags) + 2))
+        self._intercepts = np.zeros(0)
+        self._features = np.zeros((0, self.window))
+        self._stale = set()
+        self._model_loader: Optional[Callable[[str], Dict[SeriesKey, object]]] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def restore(cls, meta: dict, arrays: Dict[str, np.ndarray],
+                model_loader: Callable[[str], Dict[SeriesKey, object]]) -> 'Forecaster':
+        """Rebuild a forecaster from :meth:`state` output without loading any estimator.
+
+        ``arrays`` may be read-only memory maps; they are copied on the first
+        update. ``model_loader(city)`` returns that city's fitted estimators by
+        key and is called the first time one of its series is updated.
+        """
+        forecaster = cls(meta['lags'], meta['min_samples'], **meta['sgd_params'])
+        forecaster.keys = [tuple(key) for key in meta['keys']]
+        forecaster._index = {key: row for row, key in enumerate(forecaster.keys)}
+        forecaster.models = [None] * len(forecaster.keys)
+        for name in STATE_ARRAYS:
+            setattr(forecaster, name, arrays[name])
+        forecaster._model_loader = model_loader
+        return forecaster
+
+    def state(self) -> Tuple[dict, Dict[str, np.ndarray]]:
+        """``(meta, arrays)`` describing every series, for :meth:`restore`."""
+        with self._lock:
+            self._refresh()
+            meta = {'lags': self.lags.tolist(), 'min_samples': self.min_samples, 'sgd_params': self.sgd_params,
+                    'keys': [list(key) for key in self.keys]}
+            return meta, {name: getattr(self, name) for name in STATE_ARRAYS}
+
+    def estimators(self, city: str) -> Dict[SeriesKey, object]:
+        """Fitted estimators of ``city``'s series, loading them if needed."""
+        with self._lock:
+            return {key: self._model(row) for row, key in enumerate(self.keys) if key[0] == city}
+
+    @classmethod
+    def from_archive(cls, archive: ReadingsArchive, start=None, end=None,
+                     pollutants: Iterable[str] = PREDICTOR_IDS, **kwargs) -> 'Forecaster':
+        """A forecaster trained on every archived (city, pollutant) column in ``[start, end)``."""
+        forecaster = cls(**kwargs)
+        first = archive.timestamps(start, end)[:1].astype(np.int64)
+        if not first.size:
+            return forecaster
+        for city in archive.cities():
+            for pollutant in pollutants:
+                if archive.has(city, pollutant):
+                    forecaster.update(city, pollutant, int(first[0]), archive.column(city, pollutant, start, end))
+        return forecaster
+
+    def update_from_archive(self, archive: ReadingsArchive, pollutants: Iterable[str] = PREDICTOR_IDS) -> int:
+        """Train each archived series on the hours past its latest hour; returns the rows fitted.
+
+        Series seen for the first time are trained on the whole archive. Calling
+        this after every append fits only the new hours.
+        """
+        fitted = 0
+        for city in archive.cities():
+            for pollutant in pollutants:
+                if not archive.has(city, pollutant):
+                    continue
+                row = self._index.get((city, _pollutant_id(pollutant)))
+                start = None if row is None else int(self.last_hour[row]) + STEP_SECONDS
+                rows = archive.rows(start)
+                if rows.stop > rows.start:
+                    first = archive.start + rows.start * STEP_SECONDS
+                    fitted += self.update(city, pollutant, first, archive.column(city, pollutant, start))
+        return fitted
+
+    def _new_model(self):
+        from sklearn.linear_model import SGDRegressor
+        return SGDRegressor(**self.sgd_params)
+
+    def _model(self, row: int):
+        if self.models[row] is None:
+            for key, model in self._model_loader(self.keys[row][0]).items():
+                self.models[self._index[key]] = model
+        return self.models[row]
+
+    def _ensure_writable(self) -> None:
+        # Restored state may be memory-mapped read-only; copy it before the first change.
+        if not self.history.flags.writeable:
+            for name in STATE_ARRAYS:
+                setattr(self, name, np.array(getattr(self, name)))
+
+    def _series(self, key: SeriesKey) -> int:
+        row = self._index.get(key)
+        if row is not None:
+            return row
+        row = self._index[key] = len(self.keys)
+        self.keys.append(key)
+        self.models.append(self._new_model())
+        self.samples = np.append(self.samples, 0)
+        self.last_hour = np.append(self.last_hour, _NO_HOUR)
+        self.scales = np.append(self.scales, _scale(key[1]))
+        self.history = np.vstack((self.history, np.full((1, self.window), np.nan)))
+        self._weights = np.vstack((self._weights, np.zeros((1, self._weights.shape[1]))))
+        self._intercepts = np.append(self._intercepts, 0.0)
+        self._features = np.vstack((self._features, np.zeros((1, self.window))))
+        return row
+
+    def update(self, city: str, pollutant: str, start, values: Iterable[float]) -> int:
+        """Train on hourly ``values`` beginning at hour ``start``; returns the rows fitted.
+
+        Hours at or before the series' latest hour are ignored (the models only
+        move forward); hours skipped since then count as missing, and so do NaN
+        values.
+        """
+        values = np.asarray(values, dtype=np.float64).reshape(-1)
+        first = to_hour(start)
+        with self._lock:
+            self._ensure_writable()
+            row = self._series((city, _pollutant_id(pollutant)))
+            last = int(self.last_hour[row])
+            if last == _NO_HOUR:
+                last = first - STEP_SECONDS
+            skip = max(0, (last - first) // STEP_SECONDS + 1)
+            values = values[skip:]
+            if not values.size:
+                return 0
+            begin = first + skip * STEP_SECONDS
+            # Hours more than ``window`` back can't be a lag of the new values.
+            gap = min((begin - last) // STEP_SECONDS - 1, self.window)
+            scale = self.scales[row]
+            sequence = np.concatenate((self.history[row], np.full(gap, np.nan), values / scale))
+            positions = np.arange(self.window + gap, sequence.size)
+            lagged = sequence[positions[:, None] - self.lags]
+            hours = begin + (positions - self.window - gap) * STEP_SECONDS
+            features = np.hstack((lagged, _hour_features(hours)))
+            targets = sequence[positions]
+            complete = ~(np.isnan(lagged).any(axis=1) | np.isnan(targets))
+            fitted = int(complete.sum())
+            if fitted:
+                self._model(row).partial_fit(features[complete], targets[complete])
+                self.samples[row] += fitted
+            self.history[row] = sequence[-self.window:]
+            self.last_hour[row] = int(hours[-1])
+            self._stale.add(row)
+            return fitted
+
+    def record_batch(self, batch) -> None:
+        """Ingestion sink: train on the predictor readings of a ``ScoredBatch``.
+
+        Readings without an upstream timestamp are taken as the current hour, and
+        NaN (unreported) values are missing. Each city's readings are averaged
+        per hour and fitted with one :meth:`update` per series and run of hours
+        (a new run starts after a gap longer than the largest lag).
+        """
+        now = to_seconds(np.datetime64('now', 's'))
+        hours = np.array([to_hour(now if stamp is None else stamp) for stamp in batch.timestamps], dtype=np.int64)
+        readings = np.asarray(batch.readings, dtype=np.float64).reshape(hours.size, len(PREDICTOR_IDS))
+        cities = np.array(batch.cities, dtype=object)
+        for city in dict.fromkeys(batch.cities):
+            mine = cities == city
+            city_hours, slots = np.unique(hours[mine], return_inverse=True)
+            values = readings[mine]
+            reported = ~np.isnan(values)
+            totals = np.zeros((city_hours.size, len(PREDICTOR_IDS)))
+            counts = np.zeros((city_hours.size, len(PREDICTOR_IDS)))
+            np.add.at(totals, slots, np.where(reported, values, 0.0))
+            np.add.at(counts, slots, reported)
+            with np.errstate(invalid='ignore'):
+                means = totals / counts
+            breaks = np.flatnonzero(np.diff(city_hours) > self.window * STEP_SECONDS) + 1
+            for run in np.split(np.arange(city_hours.size), breaks):
+                offsets = (city_hours[run] - city_hours[run[0]]) // STEP_SECONDS
+                series = np.full((int(offsets[-1]) + 1, len(PREDICTOR_IDS)), np.nan)
+                series[offsets] = means[run]
+                for col, pollutant_id in enumerate(PREDICTOR_IDS):
+                    if counts[run, col].any():
+                        self.update(city, pollutant_id, int(city_hours[run[0]]), series[:, col])
+
+    def ready(self) -> List[SeriesKey]:
+        """Series with enough fitted rows to forecast."""
+        return [key for key, samples in zip(self.keys, self.samples.tolist()) if samples >= self.min_samples]
+
+    def _refresh(self) -> None:
+        for row in self._stale:
+            model = self.models[row]
+            if model is not None and hasattr(model, 'coef_'):
+                self._weights[row] = model.coef_
+                self._intercepts[row] = model.intercept_[0]
+        if self._stale:
+            rows = np.fromiter(self._stale, dtype=np.int64)
+            self._features[rows] = _forward_fill(self.history[rows])
+            self._stale.clear()
+
+    def forecast(self, keys: Optional[Iterable[Tuple[str, str]]] = None, hours: int = DEFAULT_HORIZON) -> Forecast:
+        """Forecast the ``hours`` after each series' latest hour, for all ``keys`` in one pass.
+
+        ``keys`` are ``(city, pollutant)`` pairs (any pollutant spelling) and
+        default to every :meth:`ready` series. Series that aren't ready get NaN rows.
+        """
+        with self._lock:
+            self._refresh()
+            if keys is None:
+                selected = self.ready()
+            else:
+                selected = [(city, _pollutant_id(pollutant)) for city, pollutant in keys]
+            positions = [position for position, key in enumerate(selected) if key in self._index]
+            rows = np.array([self._index[selected[position]] for position in positions], dtype=np.int64)
+            weights, intercepts = self._weights[rows], self._intercepts[rows]
+            buffer = np.hstack((self._features[rows], np.zeros((rows.size, hours))))
+            first_hour = self.last_hour[rows] + STEP_SECONDS
+            lag_weights = weights[:, :len(self.lags)]
+            for step in range(hours):
+                position = self.window + step
+                clock = _hour_features(first_hour + step * STEP_SECONDS)
+                predicted = ((buffer[:, position - self.lags] * lag_weights).sum(axis=1)
+                             + (clock * weights[:, len(self.lags):]).sum(axis=1) + intercepts)
+                buffer[:, position] = np.maximum(predicted, 0.0)
+            forecast = buffer[:, self.window:] * self.scales[rows][:, None]
+            forecast[self.samples[rows] < self.min_samples] = np.nan
+            # Unknown series get NaN values and a NaT start.
+            values = np.full((len(selected), hours), np.nan)
+            start = np.full(len(selected), np.datetime64('NaT'), dtype='datetime64[s]')
+            values[positions] = forecast
+            start[positions] = first_hour.astype('datetime64[s]')
+            return Forecast(selected, start, values)
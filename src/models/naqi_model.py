@@ -0,0 +1,172 @@
+"""Streaming Indian National AQI (CPCB NAQI) engine.
+
+Each pollutant's sub-index is interpolated from its breakpoint table using the
+rolling average over its CPCB window (24 h for PM10, PM2.5, NO2, SO2, NH3 and
+Pb; 8 h for CO and O3). The AQI is the largest sub-index. Rolling sums live in
+per-station ring buffers, so every new hourly reading costs O(1) per pollutant
+regardless of how much history has been seen.
+"""
+from bisect import bisect_right
+from datetime import datetime
+from typing import Dict, NamedTuple, Optional
+
+import numpy as np
+
+from src.utils.constants import resolve_pollutant
+
+# AQI value at each breakpoint; the concentrations below map onto these.
+NAQI_INDEX_BREAKPOINTS = (0.0, 50.0, 100.0, 200.0, 300.0, 400.0, 500.0)
+NAQI_CATEGORIES = ('Good', 'Satisfactory', 'Moderate', 'Poor', 'Very Poor', 'Severe')
+
+# pollutant id -> (averaging window in hours, concentration breakpoints).
+# Units follow POLLUTANT_SPECS (µg/m³, CO in mg/m³). CPCB leaves the Severe band
+# open-ended; its upper concentration here extends the band below it and
+# sub-indices are capped at 500.
+NAQI_BREAKPOINTS: Dict[str, tuple] = {
+    'pm10': (24, (0, 50, 100, 250, 350, 430, 510)),
+    'pm2_5': (24, (0, 30, 60, 90, 120, 250, 380)),
+    'no2': (24, (0, 40, 80, 180, 280, 400, 520)),
+    'so2': (24, (0, 40, 80, 380, 800, 1600, 2400)),
+    'nh3': (24, (0, 200, 400, 800, 1200, 1800, 2400)),
+    'pb': (24, (0, 0.5, 1.0, 2.0, 3.0, 3.5, 4.0)),
+    'co': (8, (0, 1.0, 2.0, 10, 17, 34, 51)),
+    'o3': (8, (0, 50, 100, 168, 208, 748, 1288)),
+}
+NAQI_POLLUTANTS = tuple(NAQI_BREAKPOINTS)
+PARTICULATES = ('pm10', 'pm2_5')
+
+# CPCB publishes an AQI only with enough data: 16 of 24 hours (6 of 8) per
+# average, at least three sub-indices, and one of them a particulate.
+MIN_COVERAGE = 2 / 3
+MIN_SUB_INDICES = 3
+
+_RING_HOURS = max(window for window, _ in NAQI_BREAKPOINTS.values())
+# Re-derive running sums from the buffer this often to shed float drift.
+_RESYNC_HOURS = 24 * 7
+
+
+def naqi_category(aqi: float) -> str:
+    """NAQI category name for an AQI value (0-500)."""
+    index = bisect_right(NAQI_INDEX_BREAKPOINTS, aqi, 1, len(NAQI_INDEX_BREAKPOINTS) - 1) - 1
+    if aqi > 0 and aqi == NAQI_INDEX_BREAKPOINTS[index]:
+        # Band upper bounds are inclusive: 50 is Good, 100 Satisfactory, ...
+        index -= 1
+    return NAQI_CATEGORIES[index]
+
+
+class NAQIResult(NamedTuple):
+    hour: int
+    aqi: Optional[float]
+    category: Optional[str]
+    dominant: Optional[str]
+    sub_indices: Dict[str, float]
+
+
+class _StationWindow:
+    __slots__ = ('buffer', 'sums', 'counts', 'last_hour')
+
+    def __init__(self, n_pollutants: int):
+        self.buffer = np.full((n_pollutants, _RING_HOURS), np.nan)
+        self.sums = np.zeros(n_pollutants)
+        self.counts = np.zeros(n_pollutants, dtype=np.int64)
+        self.last_hour = None
+
+
+class NAQIEngine:
+    """Incremental NAQI over hourly readings from many stations.
+
+    Feed one reading set per station per hour through :meth:`update`; it
+    returns the AQI for that hour from the rolling averages. Missing hours are
+    treated as gaps and readings must arrive in time order per station.
+    """
+
+    def __init__(self, pollutants=NAQI_POLLUTANTS):
+        self.pollutants = tuple(pollutants)
+        self._positions = {pollutant: position for position, pollutant in enumerate(self.pollutants)}
+        self._rows = np.arange(len(self.pollutants))
+        self.windows = np.array([NAQI_BREAKPOINTS[p][0] for p in self.pollutants])
+        self.min_counts = np.ceil(self.windows * MIN_COVERAGE).astype(np.int64)
+        self._tables = [
+            (np.asarray(NAQI_BREAKPOINTS[p][1], dtype=np.float64), np.asarray(NAQI_INDEX_BREAKPOINTS))
+            for p in self.pollutants
+        ]
+        self._particulates = [self._positions[p] for p in PARTICULATES if p in self._positions]
+        self._stations: Dict[str, _StationWindow] = {}
+
+    @staticmethod
+    def _to_hour(timestamp) -> int:
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.timestamp()
+        return int(timestamp // 3600)
+
+    def _vector(self, readings) -> np.ndarray:
+        values = np.full(len(self.pollutants), np.nan)
+        for name, value in readings.items():
+            position = self._positions.get(resolve_pollutant(name))
+            if position is not None and value is not None:
+                values[position] = value
+        return values
+
+    def _push(self, window: _StationWindow, hour: int, values: np.ndarray) -> None:
+        outgoing = window.buffer[self._rows, (hour - self.windows) % _RING_HOURS]
+        present = ~np.isnan(outgoing)
+        window.sums -= np.where(present, outgoing, 0.0)
+        window.counts -= present
+        window.buffer[:, hour % _RING_HOURS] = values
+        present = ~np.isnan(values)
+        window.sums += np.where(present, values, 0.0)
+        window.counts += present
+        window.last_hour = hour
+        if hour % _RESYNC_HOURS == 0:
+            self._resync(window, hour)
+
+    def _resync(self, window: _StationWindow, hour: int) -> None:
+        for row, span in enumerate(self.windows):
+            recent = window.buffer[row, (hour - np.arange(span)) % _RING_HOURS]
+            window.sums[row] = np.nansum(recent)
+            window.counts[row] = np.count_nonzero(~np.isnan(recent))
+
+    def update(self, station: str, timestamp, readings) -> NAQIResult:
+        """Add one hour of ``readings`` (pollutant name -> concentration) for ``station``.
+
+        ``timestamp`` is a datetime or epoch seconds; it is floored to the hour.
+        Returns the NAQI for that hour; ``aqi`` is None until enough data has
+        accumulated to meet the CPCB coverage rules.
+        """
+        hour = self._to_hour(timestamp)
+        window = self._stations.get(station)
+        if window is None:
+            window = self._stations[station] = _StationWindow(len(self.pollutants))
+        elif window.last_hour is not None and hour <= window.last_hour:
+            raise ValueError(f"Readings for {station!r} must arrive in time order")
+        gap = _RING_HOURS if window.last_hour is None else min(hour - window.last_hour - 1, _RING_HOURS)
+        if gap >= _RING_HOURS:
+            window.buffer.fill(np.nan)
+            window.sums.fill(0.0)
+            window.counts.fill(0)
+        else:
+            empty = np.full(len(self.pollutants), np.nan)
+            for missing in range(hour - gap, hour):
+                self._push(window, missing, empty)
+        self._push(window, hour, self._vector(readings))
+        return self._result(window, hour)
+
+    def sub_indices(self, station: str) -> Dict[str, float]:
+        """Current sub-index per pollutant with enough coverage for ``station``."""
+        window = self._stations.get(station)
+        if window is None:
+            return {}
+        return self._result(window, window.last_hour).sub_indices
+
+    def _result(self, window: _StationWindow, hour: int) -> NAQIResult:
+        covered = window.counts >= self.min_counts
+        averages = window.sums / np.maximum(window.counts, 1)
+        sub_indices = {}
+        for position in np.flatnonzero(covered).tolist():
+            concentrations, index_values = self._tables[position]
+            sub_indices[self.pollutants[position]] = float(np.interp(max(averages[position], 0.0), concentrations, index_values))
+        if len(sub_indices) < MIN_SUB_INDICES or not any(covered[p] for p in self._particulates):
+            return NAQIResult(hour, None, None, None, sub_indices)
+        dominant = max(sub_indices, key=sub_indices.get)
+        aqi = round(sub_indices[dominant])
+        return NAQIResult(hour, aqi, naqi_category(aqi), dominant, sub_indices)
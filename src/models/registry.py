@@ -0,0 +1,232 @@
+"""Versioned registry of fitted models, loaded lazily from memory-mapped files.
+
+Layout under the registry root::
+
+    CURRENT                          name of the active version
+    versions/<version>/manifest.json kind, files and metadata of each named model
+    versions/<version>/<n>/...       one directory per model
+
+Array data (AQI coefficients, the forecaster's stacked weights and history)
+is saved as ``.npy`` and opened with ``mmap_mode='r'``. Every worker that
+loads a model maps the same read-only pages, so forked Flask workers and
+Streamlit sessions share one copy through the page cache instead of each
+unpickling its own. Other fitted estimators are saved with joblib, whose
+``mmap_mode`` maps their large arrays the same way.
+
+Models are loaded by name on first :meth:`ModelRegistry.get`, so a process
+that only serves Delhi never reads ``aqi/Pune``. A forecaster's
+scikit-learn estimators are saved per city and loaded only when that city's
+series are updated; forecasting needs only the mapped arrays.
+
+:meth:`ModelRegistry.publish` writes a new version under a temporary name,
+renames it into place and then atomically replaces ``CURRENT``. Readers check
+``CURRENT`` on every ``get`` (one ``stat``), so running processes move to the
+new models on their next lookup without a restart. Old versions stay on disk
+for rollback with :meth:`ModelRegistry.activate`. The registry supports one
+publisher at a time and any number of readers.
+"""
+import json
+import os
+import shutil
+import threading
+from typing import Dict, List, Mapping, NamedTuple, Optional
+
+import numpy as np
+
+from src.models.aqi_model import AQIModel, CompiledAQIModel
+from src.models.forecaster import STATE_ARRAYS, Forecaster
+
+CURRENT_FILE = 'CURRENT'
+MANIFEST_FILE = 'manifest.json'
+VERSIONS_DIR = 'versions'
+FORMAT_VERSION = 1
+
+_MISSING = object()
+
+
+def _joblib():
+    try:
+        import joblib
+    except ImportError:
+        raise ImportError("Saving fitted estimators requires joblib (pip install scikit-learn)") from None
+    return joblib
+
+
+def _replace_file(path: str, text: str) -> None:
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as handle:
+        handle.write(text)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp, path)
+
+
+def _save_linear(model, directory: str) -> dict:
+    compiled = model.compile() if isinstance(model, AQIModel) else model
+    np.save(os.path.join(directory, 'weights.npy'), np.asarray(compiled.weights, dtype=np.float64))
+    return {'columns': list(compiled.columns)}
+
+
+def _load_linear(directory: str, entry: dict) -> CompiledAQIModel:
+    weights = np.load(os.path.join(directory, 'weights.npy'), mmap_mode='r')
+    return CompiledAQIModel.from_weights(entry['columns'], weights)
+
+
+def _save_forecaster(forecaster: Forecaster, directory: str) -> dict:
+    meta, arrays = forecaster.state()
+    for name, array in arrays.items():
+        np.save(os.path.join(directory, f'{name}.npy'), np.asarray(array))
+    cities = sorted({city for city, _ in forecaster.keys})
+    estimators = {}
+    for position, city in enumerate(cities):
+        filename = f'estimators-{position}.joblib'
+        models = forecaster.estimators(city)
+        _joblib().dump([[list(key), model] for key, model in models.items()], os.path.join(directory, filename))
+        estimators[city] = filename
+    return {'meta': meta, 'estimators': estimators}
+
+
+def _load_forecaster(directory: str, entry: dict) -> Forecaster:
+    arrays = {name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r') for name in STATE_ARRAYS}
+
+    def load_city(city: str):
+        saved = _joblib().load(os.path.join(directory, entry['estimators'][city]))
+        return {tuple(key): model for key, model in saved}
+
+    return Forecaster.restore(entry['meta'], arrays, load_city)
+
+
+def _save_estimator(model, directory: str) -> dict:
+    _joblib().dump(model, os.path.join(directory, 'model.joblib'))
+    return {}
+
+
+def _load_estimator(directory: str, entry: dict):
+    return _joblib().load(os.path.join(directory, 'model.joblib'), mmap_mode='r')
+
+
+# kind -> (save, load); save returns the manifest fields the loader needs.
+_SERIALIZERS = {
+    'linear': (_save_linear, _load_linear),
+    'forecaster': (_save_forecaster, _load_forecaster),
+    'estimator': (_save_estimator, _load_estimator),
+}
+
+
+def _kind(model) -> str:
+    if isinstance(model, (AQIModel, CompiledAQIModel)):
+        return 'linear'
+    if isinstance(model, Forecaster):
+        return 'forecaster'
+    return 'estimator'
+
+
+class _Active(NamedTuple):
+    # Swapped as a whole, so a reader never pairs one version's manifest with another's models.
+    version: Optional[str]
+    manifest: dict
+    loaded: Dict[str, object]
+
+
+_NO_VERSION = _Active(None, {'models': {}}, {})
+
+
+class ModelRegistry:
+    """Named models of the active version under ``root``, each loaded on first use."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self._pointer = None
+        self._active = _NO_VERSION
+        self._lock = threading.Lock()
+
+    def versions(self) -> List[str]:
+        directory = os.path.join(self.root, VERSIONS_DIR)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name for name in os.listdir(directory) if not name.startswith('.'))
+
+    def _current(self) -> _Active:
+        # The active version's state, re-read whenever ``CURRENT`` has been replaced.
+        try:
+            stat = os.stat(os.path.join(self.root, CURRENT_FILE))
+        except FileNotFoundError:
+            return _NO_VERSION
+        pointer = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if pointer != self._pointer:
+            with self._lock:
+                if pointer != self._pointer:
+                    with open(os.path.join(self.root, CURRENT_FILE), encoding='utf-8') as handle:
+                        version = handle.read().strip()
+                    if version != self._active.version:
+                        with open(os.path.join(self.root, VERSIONS_DIR, version, MANIFEST_FILE), encoding='utf-8') as handle:
+                            manifest = json.load(handle)
+                        if manifest.get('format') != FORMAT_VERSION:
+                            raise ValueError(f"Unsupported registry format {manifest.get('format')!r} in version {version}")
+                        self._active = _Active(version, manifest, {})
+                    self._pointer = pointer
+        return self._active
+
+    def current_version(self) -> Optional[str]:
+        """The active version, re-read whenever ``CURRENT`` has been replaced."""
+        return self._current().version
+
+    def names(self) -> List[str]:
+        return sorted(self._current().manifest['models'])
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._current().manifest['models']
+
+    def get(self, name: str, default=_MISSING):
+        """The model ``name`` of the active version; ``default`` (or KeyError) if it has none."""
+        active = self._current()
+        model = active.loaded.get(name)
+        if model is not None:
+            return model
+        entry = active.manifest['models'].get(name)
+        if entry is None:
+            if default is _MISSING:
+                raise KeyError(f"No model {name!r} in registry version {active.version!r}")
+            return default
+        with self._lock:
+            model = active.loaded.get(name)
+            if model is None:
+                directory = os.path.join(self.root, VERSIONS_DIR, active.version, entry['path'])
+                model = active.loaded[name] = _SERIALIZERS[entry['kind']][1](directory, entry)
+        return model
+
+    def publish(self, models: Mapping[str, object], activate: bool = True) -> str:
+        """Save ``models`` by name as a new version and, by default, make it active.
+
+        Names may contain any characters (``'aqi/Delhi'``); each model gets its
+        own numbered directory. Returns the new version's name.
+        """
+        versions = os.path.join(self.root, VERSIONS_DIR)
+        os.makedirs(versions, exist_ok=True)
+        for name in os.listdir(versions):
+            if name.startswith('.') and name.endswith('.tmp'):
+                # Left by a publish that crashed; there is only ever one publisher.
+                shutil.rmtree(os.path.join(versions, name))
+        existing = [int(name[1:]) for name in self.versions() if name[1:].isdigit()]
+        version = f"v{max(existing, default=0) + 1:04d}"
+        staging = os.path.join(versions, f'.{version}.tmp')
+        os.makedirs(staging)
+        entries = {}
+        for position, (name, model) in enumerate(models.items()):
+            kind = _kind(model)
+            directory = os.path.join(staging, str(position))
+            os.makedirs(directory)
+            entry = _SERIALIZERS[kind][0](model, directory)
+            entries[name] = {'kind': kind, 'path': str(position), **entry}
+        manifest = {'format': FORMAT_VERSION, 'version': version, 'models': entries}
+        _replace_file(os.path.join(staging, MANIFEST_FILE), json.dumps(manifest, sort_keys=True))
+        os.rename(staging, os.path.join(versions, version))
+        if activate:
+            self.activate(version)
+        return version
+
+    def activate(self, version: str) -> None:
+        """Atomically point ``CURRENT`` at an existing ``version`` (also used to roll back)."""
+        if not os.path.exists(os.path.join(self.root, VERSIONS_DIR, version, MANIFEST_FILE)):
+            raise KeyError(f"No registry version {version!r}")
+        _replace_file(os.path.join(self.root, CURRENT_FILE), version + '\n')
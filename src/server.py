@@ -0,0 +1,30 @@
+"""Flask app serving the API routes, with request metrics at ``/metrics``.
+
+Settings are loaded from :class:`src.config.Config`, so ``METRICS_SAMPLE_RATE``
+and the response cache variables apply to the running server.
+
+    python -m src.server
+"""
+from flask import Flask
+
+from src.api.metrics import init_metrics
+from src.api.routes import api_bp
+from src.config import Config
+
+
+def create_app(config=Config) -> Flask:
+    app = Flask(__name__)
+    app.config.from_object(config)
+
+    # Register blueprints
+    app.register_blueprint(api_bp, url_prefix='/')
+
+    # Request latency, sizes and error counts, served at /metrics
+    init_metrics(app)
+
+    return app
+
+
+if __name__ == '__main__':
+    app = create_app()
+    app.run(debug=app.config['DEBUG'])
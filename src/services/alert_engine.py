@@ -0,0 +1,139 @@
+"""Threshold alerts for every station and pollutant, evaluated in one NumPy pass.
+
+Each call to :meth:`AlertEngine.evaluate` takes a station-by-pollutant matrix
+of readings and compares it with the warning/severe threshold vectors from
+``POLLUTANT_SPECS``. Alerts are emitted only when a cell changes level:
+
+* Hysteresis: a level is held until the reading drops ``hysteresis`` (a
+  fraction) below the threshold that raised it, so a value hovering at the
+  threshold doesn't flap.
+* Cooldown: after an alert, the same cell won't emit a lower-or-equal level
+  for ``cooldown`` seconds. Escalations always fire. A held-back transition
+  is emitted on a later evaluation if the condition still holds.
+
+Message text is formatted on first access of :attr:`Alert.message`, so quiet
+cells and unread alerts cost nothing beyond the array comparisons.
+"""
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from src.utils.constants import POLLUTANT_SPECS, get_pollutant_spec
+
+LEVEL_NORMAL, LEVEL_WARNING, LEVEL_SEVERE = 0, 1, 2
+ALERT_STATUSES = ('NORMAL', 'WARNING', 'SEVERE ALERT')
+ALERT_COLORS = ('green', 'orange', 'red')
+
+DEFAULT_HYSTERESIS = 0.1
+DEFAULT_COOLDOWN_SECONDS = 15 * 60
+
+
+def alert_level(value: float, spec: dict) -> int:
+    """Level of a single reading against ``spec``'s thresholds (no hysteresis)."""
+    if value >= spec.get('severe_threshold', float('inf')):
+        return LEVEL_SEVERE
+    if value >= spec.get('warning_threshold', float('inf')):
+        return LEVEL_WARNING
+    return LEVEL_NORMAL
+
+
+def alert_message(pollutant: str, value: float, level: int, spec: dict) -> str:
+    unit = spec.get('unit', '')
+    if level == LEVEL_SEVERE:
+        return f"⚠️ {pollutant} level is {value:.1f} {unit} - SEVERE!\n{spec.get('health_effects','')}\nRecommended Action: Immediate reduction needed!"
+    if level == LEVEL_WARNING:
+        return f"⚡ {pollutant} level is {value:.1f} {unit} - HIGH!\n{spec.get('health_effects','')}\nRecommended Action: Consider reduction measures"
+    return f"✅ {pollutant} level is within acceptable range"
+
+
+class Alert(NamedTuple):
+    station: str
+    pollutant: str
+    level: int
+    previous_level: int
+    value: float
+    timestamp: float
+
+    @property
+    def status(self) -> str:
+        return ALERT_STATUSES[self.level]
+
+    @property
+    def color(self) -> str:
+        return ALERT_COLORS[self.level]
+
+    @property
+    def escalation(self) -> bool:
+        return self.level > self.previous_level
+
+    @property
+    def message(self) -> str:
+        return alert_message(self.pollutant, self.value, self.level, get_pollutant_spec(self.pollutant) or {})
+
+
+class AlertEngine:
+    """Tracks the alert level of every (station, pollutant) cell between evaluations."""
+
+    def __init__(self, stations: Iterable[str], pollutants: Optional[Sequence[str]] = None,
+                 hysteresis: float = DEFAULT_HYSTERESIS, cooldown: float = DEFAULT_COOLDOWN_SECONDS):
+        self.stations = list(stations)
+        self.pollutants = list(pollutants if pollutants is not None else POLLUTANT_SPECS)
+        self.station_index: Dict[str, int] = {station: row for row, station in enumerate(self.stations)}
+        specs = []
+        for pollutant in self.pollutants:
+            spec = get_pollutant_spec(pollutant)
+            if spec is None:
+                raise KeyError(f"Unknown pollutant {pollutant!r}")
+            specs.append(spec)
+        self.warning = np.array([spec.get('warning_threshold', np.inf) for spec in specs], dtype=np.float64)
+        self.severe = np.array([spec.get('severe_threshold', np.inf) for spec in specs], dtype=np.float64)
+        # Thresholds a reading must fall below before a held level is released.
+        self.warning_release = self.warning * (1.0 - hysteresis)
+        self.severe_release = self.severe * (1.0 - hysteresis)
+        self.cooldown = cooldown
+        shape = (len(self.stations), len(self.pollutants))
+        self.levels = np.zeros(shape, dtype=np.int8)
+        self.last_alert_at = np.full(shape, -np.inf)
+
+    def evaluate(self, readings, timestamp: Optional[float] = None) -> List[Alert]:
+        """Update every cell from ``readings`` and return the alerts to send.
+
+        ``readings`` is a (stations, pollutants) array in constructor order; NaN
+        marks a missing reading and leaves that cell's level unchanged.
+        """
+        values = np.asarray(readings, dtype=np.float64)
+        if values.shape != self.levels.shape:
+            raise ValueError(f"Expected readings of shape {self.levels.shape}, got {values.shape}")
+        now = time.time() if timestamp is None else timestamp
+
+        raised = (values >= self.warning).astype(np.int8) + (values >= self.severe)
+        held = (values >= self.warning_release).astype(np.int8) + (values >= self.severe_release)
+        # Rising follows the raw thresholds; falling stops at the highest level still held.
+        target = np.where(raised >= self.levels, raised, np.minimum(self.levels, held))
+        target = np.where(np.isnan(values), self.levels, target)
+
+        changed = target != self.levels
+        cooled = (now - self.last_alert_at) >= self.cooldown
+        emit = changed & (cooled | (target > self.levels))
+        rows, cols = np.nonzero(emit)
+        if not len(rows):
+            return []
+
+        previous = self.levels[rows, cols].tolist()
+        self.levels[rows, cols] = target[rows, cols]
+        self.last_alert_at[rows, cols] = now
+        return [
+            Alert(self.stations[row], self.pollutants[col], level, before, value, now)
+            for row, col, level, before, value in zip(
+                rows.tolist(), cols.tolist(), target[rows, cols].tolist(), previous, values[rows, cols].tolist())
+        ]
+
+    def active(self) -> List[Alert]:
+        """Cells currently above NORMAL, as alerts without a fresh reading (value is NaN)."""
+        rows, cols = np.nonzero(self.levels)
+        return [
+            Alert(self.stations[row], self.pollutants[col], level, level, float('nan'), float(at))
+            for row, col, level, at in zip(rows.tolist(), cols.tolist(), self.levels[rows, cols].tolist(),
+                                           self.last_alert_at[rows, cols].tolist())
+        ]
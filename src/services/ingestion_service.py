@@ -0,0 +1,239 @@
+"""Poll the upstream AQI feed for every city and score the readings in batches.
+
+All cities are fetched concurrently over one pooled keep-alive aiohttp
+session, with at most ``max_concurrency`` requests in flight. Each request is
+conditional on the ETag/Last-Modified of that city's previous response.
+Failed requests are retried with full-jitter exponential backoff. Readings go
+through the vectorized predictor ``batch_size`` at a time as soon as they
+arrive, and each scored batch is handed to ``sink``.
+
+    async def sink(batch):
+        store.ingest_aqi(...)
+
+    asyncio.run(IngestionService(sink).run(interval=300))
+"""
+import asyncio
+import inspect
+import logging
+import math
+import random
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import aiohttp
+import numpy as np
+
+from src.config import Config
+from src.utils.constants import INDIAN_CITIES, PREDICTOR_IDS, get_aqi_categories, predict_aqi_batch, resolve_pollutant
+
+logger = logging.getLogger(__name__)
+
+# Responses worth retrying; any other error status fails the city for this poll.
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+_POSITIONS = {pollutant_id: position for position, pollutant_id in enumerate(PREDICTOR_IDS)}
+
+# (city, timestamp, values in PREDICTOR_COLUMNS order)
+Reading = Tuple[str, Optional[str], List[float]]
+
+
+class FeedError(Exception):
+    """A city's readings could not be fetched, even after retrying."""
+
+
+class ScoredBatch(NamedTuple):
+    cities: List[str]
+    timestamps: List[Optional[str]]
+    # NaN where a station did not report the pollutant.
+    readings: np.ndarray
+    aqi: np.ndarray
+    categories: np.ndarray
+
+
+class PollStats(NamedTuple):
+    fetched: int
+    not_modified: int
+    failed: int
+    scored: int
+
+
+class _Validators:
+    __slots__ = ('etag', 'last_modified')
+
+    def __init__(self):
+        self.etag = None
+        self.last_modified = None
+
+    def headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+def parse_readings(city: str, payload) -> List[Reading]:
+    """Turn a feed response into reading rows.
+
+    ``payload`` is one ``{"timestamp": ..., "readings": {pollutant: value}}``
+    object or a list of them (several stations in one city). Pollutants may
+    use any spelling resolve_pollutant accepts; ones the predictor does not use
+    are ignored, and missing or invalid values are NaN (the predictor scores
+    them as 0).
+    """
+    entries = payload if isinstance(payload, list) else [payload]
+    rows = []
+    for entry in entries:
+        if not isinstance(entry, dict) or not isinstance(entry.get('readings'), dict):
+            raise ValueError(f"Malformed reading for {city!r}")
+        values = [math.nan] * len(PREDICTOR_IDS)
+        for name, value in entry['readings'].items():
+            position = _POSITIONS.get(resolve_pollutant(name))
+            if position is not None and isinstance(value, (int, float)) and 0 <= value < math.inf:
+                values[position] = float(value)
+        rows.append((entry.get('city', city), entry.get('timestamp'), values))
+    return rows
+
+
+def _retry_after(response: aiohttp.ClientResponse) -> float:
+    try:
+        return max(0.0, float(response.headers.get('Retry-After', 0)))
+    except ValueError:
+        return 0.0
+
+
+class IngestionService:
+    """Fetches readings for ``cities`` from the upstream feed and scores them.
+
+    ``sink`` receives each :class:`ScoredBatch`; it may be a plain function or
+    a coroutine function. Use the service as an async context manager (or call
+    :meth:`close`) so the pooled connections are released.
+    """
+
+    def __init__(self, sink: Callable[[ScoredBatch], object], base_url: Optional[str] = None,
+                 api_key: Optional[str] = None, cities: Optional[Iterable[str]] = None,
+                 max_concurrency: Optional[int] = None, timeout: Optional[float] = None,
+                 max_retries: int = 3, backoff_base: float = 0.5, backoff_cap: float = 30.0,
+                 batch_size: int = 500):
+        self.sink = sink
+        self.url = (base_url or Config.API_URL).rstrip('/') + '/readings'
+        self.api_key = api_key if api_key is not None else Config.API_KEY
+        self.cities = list(cities if cities is not None else INDIAN_CITIES)
+        self.max_concurrency = max_concurrency or Config.INGEST_CONCURRENCY
+        self.timeout = timeout or Config.API_TIMEOUT
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.batch_size = batch_size
+        self.validators: Dict[str, _Validators] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def start(self) -> None:
+        if self._session is None:
+            # One connector for every request: connections are kept alive and
+            # reused across cities and polls instead of a handshake per fetch.
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+            headers = {'Accept': 'application/json'}
+            if self.api_key:
+                headers['X-API-Key'] = self.api_key
+            self._session = aiohttp.ClientSession(
+                connector=connector, headers=headers, timeout=aiohttp.ClientTimeout(total=self.timeout))
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter delay before retry number ``attempt + 1``."""
+        return random.uniform(0.0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    async def fetch(self, city: str) -> Optional[List[Reading]]:
+        """New readings for ``city``, or None when the feed answers 304 Not Modified."""
+        validators = self.validators.setdefault(city, _Validators())
+        for attempt in range(self.max_retries + 1):
+            retry_after = 0.0
+            try:
+                async with self._slots:
+                    async with self._session.get(self.url, params={'city': city},
+                                                 headers=validators.headers()) as response:
+                        if response.status == 304:
+                            return None
+                        if response.status in RETRY_STATUSES:
+                            retry_after = _retry_after(response)
+                            error = f"HTTP {response.status}"
+                        elif response.status >= 400:
+                            raise FeedError(f"{city}: HTTP {response.status}")
+                        else:
+                            payload = await response.json(content_type=None)
+                            validators.etag = response.headers.get('ETag')
+                            validators.last_modified = response.headers.get('Last-Modified')
+                            return parse_readings(city, payload)
+            except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError) as exc:
+                error = repr(exc)
+            if attempt == self.max_retries:
+                raise FeedError(f"{city}: {error} after {attempt + 1} attempts")
+            # Sleep outside the semaphore so a backing-off city doesn't hold a slot.
+            await asyncio.sleep(min(self.backoff_cap, max(retry_after, self.backoff(attempt))))
+
+    async def _score(self, rows: List[Reading]) -> int:
+        cities, timestamps, values = zip(*rows)
+        readings = np.array(values, dtype=np.float64)
+        aqi = predict_aqi_batch(np.nan_to_num(readings))
+        result = self.sink(ScoredBatch(list(cities), list(timestamps), readings, aqi, get_aqi_categories(aqi)))
+        if inspect.isawaitable(result):
+            await result
+        return len(rows)
+
+    async def poll_once(self) -> PollStats:
+        """Fetch every city once and score whatever came back."""
+        await self.start()
+        fetched = not_modified = failed = scored = 0
+        pending: List[Reading] = []
+        tasks = [asyncio.ensure_future(self.fetch(city)) for city in self.cities]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    rows = await next_done
+                except (FeedError, aiohttp.ClientError, ValueError) as exc:
+                    failed += 1
+                    logger.warning("Skipping city this poll: %s", exc)
+                    continue
+                if rows is None:
+                    not_modified += 1
+                    continue
+                fetched += 1
+                pending.extend(rows)
+                while len(pending) >= self.batch_size:
+                    scored += await self._score(pending[:self.batch_size])
+                    del pending[:self.batch_size]
+            if pending:
+                scored += await self._score(pending)
+        finally:
+            for task in tasks:
+                task.cancel()
+        return PollStats(fetched, not_modified, failed, scored)
+
+    async def run(self, interval: float, stop: Optional[asyncio.Event] = None) -> None:
+        """Poll every ``interval`` seconds until ``stop`` is set (or forever)."""
+        stop = stop or asyncio.Event()
+        loop = asyncio.get_running_loop()
+        async with self:
+            while not stop.is_set():
+                started = loop.time()
+                stats = await self.poll_once()
+                logger.info("Polled %d cities: %d updated, %d unchanged, %d failed, %d readings scored",
+                            len(self.cities), stats.fetched, stats.not_modified, stats.failed, stats.scored)
+                try:
+                    await asyncio.wait_for(stop.wait(), max(0.0, interval - (loop.time() - started)))
+                except asyncio.TimeoutError:
+                    pass
@@ -0,0 +1 @@
+"""Persistent storage for historical readings."""
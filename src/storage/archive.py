@@ -0,0 +1,360 @@
+"""Memory-mapped columnar archive of hourly pollutant readings.
+
+Layout under the archive root::
+
+    index.json              time grid, dtype, the (city, pollutant) columns and their row counts
+    <city>/<pollutant>.f32  one little-endian float32 per hour, NaN when missing
+    segments/<length>.f32   blocks appended since the last checkpoint
+
+Every column covers the same hourly grid (``start`` plus ``length`` hours), so
+a time range is the same row range in every file and reading "Delhi PM₂.₅ for
+March" is a zero-copy ``np.memmap`` slice. Pollutants are stored under their
+canonical ids (``pm2_5``, ``no2``, ...). A column file may end before the
+grid does: an append leaves the columns it has no values for untouched, and
+readers see their later hours as NaN.
+
+An append writes its whole block to one segment file and fsyncs it, writes
+the block's columns past their committed ends, then publishes the new length
+by atomically replacing ``index.json``. So an append costs two fsyncs however
+many columns it holds. Column files are fsynced together every
+``checkpoint_every`` appends, and then the segments are deleted; a writer
+opened after a crash replays the segments the index still lists. Readers only
+look at the rows the index covers, so they never see a half-written append; a
+writer that crashes mid-append leaves a tail that the next write to that
+column truncates. The archive supports one writer at a time and any number of
+readers.
+"""
+import json
+import os
+import re
+from datetime import datetime
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from src.utils.constants import POLLUTANT_SPECS_BY_ID, resolve_pollutant
+
+INDEX_FILE = 'index.json'
+FORMAT_VERSION = 1
+DTYPE = np.dtype('<f4')
+STEP_SECONDS = 3600
+SEGMENT_DIR = 'segments'
+DEFAULT_CHECKPOINT_EVERY = 24
+
+
+def to_seconds(timestamp) -> int:
+    """Epoch seconds for ``timestamp``.
+
+    Accepts epoch seconds, a datetime (naive values are taken as UTC), a
+    numpy datetime64 or an ISO 8601 string, with or without a UTC offset.
+    """
+    if isinstance(timestamp, str):
+        # numpy warns on (and discards the meaning of) offsets such as 'Z' or '+05:30'.
+        try:
+            timestamp = datetime.fromisoformat(timestamp)
+        except ValueError:
+            pass
+    if isinstance(timestamp, datetime) and timestamp.tzinfo is not None:
+        return int(timestamp.timestamp())
+    if isinstance(timestamp, (int, float, np.integer, np.floating)):
+        return int(timestamp)
+    return int(np.datetime64(timestamp, 's').astype(np.int64))
+
+
+def to_hour(timestamp) -> int:
+    """Epoch seconds of ``timestamp`` floored to the hour."""
+    return to_seconds(timestamp) // STEP_SECONDS * STEP_SECONDS
+
+
+def _pollutant_id(pollutant: str) -> str:
+    pollutant_id = resolve_pollutant(pollutant)
+    if pollutant_id not in POLLUTANT_SPECS_BY_ID:
+        raise KeyError(f"Unknown pollutant {pollutant!r}")
+    return pollutant_id
+
+
+def _directory_name(city: str) -> str:
+    return re.sub(r'[^0-9A-Za-z._-]+', '_', city).strip('._') or '_'
+
+
+def _read_index(root: str) -> Optional[dict]:
+    path = os.path.join(root, INDEX_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as handle:
+        index = json.load(handle)
+    if index.get('version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported archive version {index.get('version')!r} in {path}")
+    return index
+
+
+class ReadingsArchive:
+    """Read-only view of an archive; column reads are memory-mapped.
+
+    The index is read once when the archive is opened. Call :meth:`refresh` to
+    pick up rows appended since.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._maps: Dict[Tuple[str, str], np.memmap] = {}
+        self.refresh()
+
+    @classmethod
+    def open(cls, root: str) -> Optional['ReadingsArchive']:
+        """The archive at ``root``, or None when nothing has been written there yet."""
+        if not os.path.exists(os.path.join(root, INDEX_FILE)):
+            return None
+        return cls(root)
+
+    def refresh(self) -> None:
+        index = _read_index(self.root)
+        if index is None:
+            raise FileNotFoundError(f"No archive index at {os.path.join(self.root, INDEX_FILE)}")
+        self.start = index['start']
+        self.length = index['length']
+        self._columns = index['columns']
+        # Rows written to each column file; indexes without counts pad every column.
+        self._column_rows = index.get('rows', {})
+        self._maps.clear()
+
+    @property
+    def end(self) -> int:
+        """Epoch second just past the last archived hour."""
+        return self.start + self.length * STEP_SECONDS
+
+    def cities(self) -> List[str]:
+        return sorted(self._columns)
+
+    def pollutants(self, city: str) -> List[str]:
+        return sorted(self._columns.get(city, {}))
+
+    def has(self, city: str, pollutant: str) -> bool:
+        pollutant_id = resolve_pollutant(pollutant)
+        return self.length > 0 and pollutant_id in self._columns.get(city, {})
+
+    def _row(self, timestamp) -> int:
+        # First row whose hour is at or after ``timestamp``.
+        return -(-(to_seconds(timestamp) - self.start) // STEP_SECONDS)
+
+    def rows(self, start=None, end=None) -> slice:
+        """Rows whose hour falls in ``[start, end)``, clipped to the archive."""
+        first = 0 if start is None else min(max(self._row(start), 0), self.length)
+        last = self.length if end is None else min(max(self._row(end), first), self.length)
+        return slice(first, last)
+
+    def timestamps(self, start=None, end=None) -> np.ndarray:
+        """datetime64[s] (UTC) for each row of ``[start, end)``."""
+        rows = self.rows(start, end)
+        hours = self.start + np.arange(rows.start, rows.stop, dtype=np.int64) * STEP_SECONDS
+        return hours.astype('datetime64[s]')
+
+    def column(self, city: str, pollutant: str, start=None, end=None) -> np.ndarray:
+        """Readings for ``[start, end)`` as a read-only, zero-copy memmap slice.
+
+        Ranges reaching past the rows written to the column file come back as a
+        read-only copy with NaN for the later hours.
+        """
+        pollutant_id = _pollutant_id(pollutant)
+        try:
+            relative = self._columns[city][pollutant_id]
+        except KeyError:
+            raise KeyError(f"No {pollutant_id} column for {city!r}") from None
+        rows = self.rows(start, end)
+        key = (city, pollutant_id)
+        mapped = self._maps.get(key)
+        if mapped is None:
+            written = min(self._column_rows.get(city, {}).get(pollutant_id, self.length), self.length)
+            if written:
+                mapped = np.memmap(os.path.join(self.root, relative), dtype=DTYPE, mode='r', shape=(written,))
+            else:
+                mapped = np.empty(0, dtype=DTYPE)
+            self._maps[key] = mapped
+        if rows.stop <= mapped.size:
+            return mapped[rows]
+        padded = np.full(rows.stop - rows.start, np.nan, dtype=DTYPE)
+        available = mapped[rows.start:rows.stop]
+        padded[:available.size] = available
+        padded.flags.writeable = False
+        return padded
+
+    def series(self, city: str, pollutant: str, start=None, end=None) -> Tuple[np.ndarray, np.ndarray]:
+        """``(timestamps, values)`` for one city and pollutant over ``[start, end)``."""
+        return self.timestamps(start, end), self.column(city, pollutant, start, end)
+
+    def summarize(self, pollutant: str, start=None, end=None, cities: Optional[Iterable[str]] = None,
+                  how: str = 'mean') -> Tuple[List[str], np.ndarray]:
+        """Per-city ``mean``/``max``/``min`` of ``pollutant`` over ``[start, end)``, ignoring gaps.
+
+        Cities without the column, or with no readings in the range, get NaN.
+        """
+        reducers = {'mean': np.nanmean, 'max': np.nanmax, 'min': np.nanmin}
+        if how not in reducers:
+            raise ValueError(f"how must be one of {', '.join(reducers)}")
+        reduce = reducers[how]
+        pollutant_id = _pollutant_id(pollutant)
+        names = list(cities) if cities is not None else self.cities()
+        values = np.full(len(names), np.nan)
+        for position, city in enumerate(names):
+            if pollutant_id in self._columns.get(city, {}):
+                column = self.column(city, pollutant_id, start, end)
+                if column.size and not np.isnan(column).all():
+                    values[position] = reduce(column)
+        return names, values
+
+
+class ArchiveWriter:
+    """Appends hourly blocks to the archive at ``root``, creating it on first use.
+
+    Column files are fsynced every ``checkpoint_every`` appends (each append is
+    durable before that through its segment), or when :meth:`checkpoint` is
+    called. Segments left by a writer that stopped before its checkpoint are
+    replayed when the next writer is opened.
+    """
+
+    def __init__(self, root: str, checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY):
+        self.root = root
+        self.checkpoint_every = checkpoint_every
+        os.makedirs(root, exist_ok=True)
+        self._index = _read_index(root)
+        self._unsynced = set()
+        if self._index is not None and self._index.get('pending'):
+            self._replay()
+
+    def append(self, start, columns: Mapping[Tuple[str, str], Iterable[float]]) -> int:
+        """Append hourly ``columns`` beginning at hour ``start``; returns the new length.
+
+        ``columns`` maps ``(city, pollutant)`` to equal-length sequences, one
+        value per hour. Hours between the current end and ``start`` are filled
+        with NaN, as are the new hours of columns not in this block and the
+        earlier hours of columns that are new. The archive is append-only:
+        ``start`` may not fall before the current end.
+        """
+        blocks = {}
+        for (city, pollutant), values in columns.items():
+            blocks[(city, _pollutant_id(pollutant))] = np.asarray(values, dtype=DTYPE).reshape(-1)
+        sizes = {block.size for block in blocks.values()}
+        if len(sizes) > 1:
+            raise ValueError("All columns in one append must have the same length")
+        size = sizes.pop() if sizes else 0
+
+        start = to_hour(start)
+        index = self._index or {'start': start, 'length': 0, 'columns': {}}
+        origin = index['start'] if index['length'] else start
+        end = origin + index['length'] * STEP_SECONDS
+        if start < end:
+            raise ValueError(f"Archive already holds hours up to {end}; appends must start at or after it")
+        length = (start - origin) // STEP_SECONDS + size
+        columns_index = {city: dict(entries) for city, entries in index['columns'].items()}
+        rows_index = self._rows_index(index)
+        pending = list(index.get('pending', []))
+        for city, pollutant_id in blocks:
+            if pollutant_id not in columns_index.get(city, {}):
+                columns_index.setdefault(city, {})[pollutant_id] = self._column_path(columns_index, city, pollutant_id)
+
+        if blocks and size:
+            written = [[city, pollutant_id, rows_index.get(city, {}).get(pollutant_id, 0)]
+                       for city, pollutant_id in blocks]
+            pending.append({'file': self._write_segment(length, blocks.values()), 'length': length,
+                            'columns': written})
+            for (city, pollutant_id, column_rows), block in zip(written, blocks.values()):
+                self._extend(self._path(columns_index, city, pollutant_id), column_rows, length, block)
+                rows_index.setdefault(city, {})[pollutant_id] = length
+
+        committed = {'version': FORMAT_VERSION, 'start': origin, 'length': length,
+                     'step': STEP_SECONDS, 'dtype': DTYPE.str, 'columns': columns_index,
+                     'rows': rows_index, 'pending': pending}
+        self._commit(committed)
+        self._index = committed
+        if len(pending) >= self.checkpoint_every:
+            self.checkpoint()
+        return length
+
+    def checkpoint(self) -> None:
+        """fsync the column files written since the last checkpoint and delete their segments."""
+        for path in sorted(self._unsynced):
+            with open(path, 'r+b') as handle:
+                os.fsync(handle.fileno())
+        self._unsynced.clear()
+        pending = self._index.get('pending') if self._index is not None else None
+        if not pending:
+            return
+        self._index = {**self._index, 'pending': []}
+        self._commit(self._index)
+        for entry in pending:
+            try:
+                os.remove(os.path.join(self.root, entry['file']))
+            except FileNotFoundError:
+                pass
+
+    def _replay(self) -> None:
+        # Rewrite the blocks of appends whose column files may not have reached the disk.
+        for entry in self._index['pending']:
+            columns = entry['columns']
+            data = np.fromfile(os.path.join(self.root, entry['file']), dtype=DTYPE).reshape(len(columns), -1)
+            for (city, pollutant_id, column_rows), block in zip(columns, data):
+                self._extend(self._path(self._index['columns'], city, pollutant_id), column_rows,
+                             entry['length'], block)
+        self.checkpoint()
+
+    @staticmethod
+    def _rows_index(index: dict) -> Dict[str, Dict[str, int]]:
+        if 'rows' in index:
+            return {city: dict(entries) for city, entries in index['rows'].items()}
+        # Written before row counts were kept, when every column was padded to the full length.
+        return {city: dict.fromkeys(entries, index['length']) for city, entries in index['columns'].items()}
+
+    def _path(self, columns_index: dict, city: str, pollutant_id: str) -> str:
+        path = os.path.join(self.root, columns_index[city][pollutant_id])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._unsynced.add(path)
+        return path
+
+    def _write_segment(self, length: int, blocks: Iterable[np.ndarray]) -> str:
+        relative = f"{SEGMENT_DIR}/{length:012d}.f32"
+        path = os.path.join(self.root, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as handle:
+            for block in blocks:
+                handle.write(block.tobytes())
+            handle.flush()
+            os.fsync(handle.fileno())
+        return relative
+
+    @staticmethod
+    def _column_path(columns_index: dict, city: str, pollutant_id: str) -> str:
+        existing = next(iter(columns_index.get(city, {}).values()), None)
+        if existing is not None:
+            return f"{os.path.dirname(existing)}/{pollutant_id}.f32"
+        # Distinct cities can sanitize to the same name ('A B', 'A_B'); keep their directories apart.
+        taken = {os.path.dirname(path) for entries in columns_index.values() for path in entries.values()}
+        directory, suffix = _directory_name(city), 1
+        while directory in taken:
+            suffix += 1
+            directory = f"{_directory_name(city)}-{suffix}"
+        return f"{directory}/{pollutant_id}.f32"
+
+    @staticmethod
+    def _extend(path: str, committed_rows: int, total_rows: int, block: np.ndarray) -> None:
+        with open(path, 'r+b' if os.path.exists(path) else 'w+b') as handle:
+            committed_bytes = committed_rows * DTYPE.itemsize
+            handle.seek(0, os.SEEK_END)
+            size = handle.tell()
+            if size > committed_bytes:
+                # Leftovers of an append that never committed its index.
+                handle.truncate(committed_bytes)
+            elif size < committed_bytes:
+                # Committed rows missing from disk; keep the later rows aligned to the grid.
+                handle.write(np.full((committed_bytes - size) // DTYPE.itemsize, np.nan, dtype=DTYPE).tobytes())
+            handle.seek(committed_bytes)
+            handle.write(np.full(total_rows - committed_rows - block.size, np.nan, dtype=DTYPE).tobytes())
+            handle.write(block.tobytes())
+
+    def _commit(self, index: dict) -> None:
+        path = os.path.join(self.root, INDEX_FILE)
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as handle:
+            json.dump(index, handle, sort_keys=True)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp, path)
@@ -0,0 +1,304 @@
+"""Incrementally maintained per-city AQI rollups at hourly, daily and monthly grain.
+
+Every bucket keeps count, sum, min, max and a histogram of AQI categories, so
+views such as "last 30 days per city" combine at most a few dozen buckets per
+city instead of rescanning and re-scoring raw readings.
+
+A new reading is folded into its hour, day and month bucket in O(1). A
+reading for a (city, timestamp) that was already recorded is a correction: its
+hour is rebuilt from the readings kept for that hour, then its day from the
+day's hour buckets and its month from the month's day buckets, so late data
+touches only the three buckets that contain it. Hour buckets (and the raw
+readings behind them) are kept for ``retention`` seconds behind the newest
+reading; readings older than that are counted in ``dropped`` and ignored,
+while day and month buckets are kept indefinitely.
+"""
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from src.storage.archive import STEP_SECONDS, ReadingsArchive, to_seconds
+from src.utils.constants import AQI_CATEGORIES, PREDICTOR_IDS, classify_aqi, predict_aqi_batch
+
+GRAINS = ('hour', 'day', 'month')
+DAY_SECONDS = 24 * STEP_SECONDS
+DEFAULT_RETENTION_SECONDS = 31 * DAY_SECONDS
+CATEGORY_COUNT = len(AQI_CATEGORIES)
+
+
+def _category(aqi: float) -> int:
+    # Above-range values count as the last band (Hazardous), as get_aqi_level does.
+    return min(int(classify_aqi(aqi)), CATEGORY_COUNT - 1)
+
+
+def _month_start(seconds: int) -> int:
+    return int(np.datetime64(seconds, 's').astype('datetime64[M]').astype('datetime64[s]').astype(np.int64))
+
+
+def _next_month(month_start: int) -> int:
+    month = np.datetime64(month_start, 's').astype('datetime64[M]') + 1
+    return int(month.astype('datetime64[s]').astype(np.int64))
+
+
+class Bucket:
+    """Count, sum, min, max and category histogram of the readings in one interval."""
+
+    __slots__ = ('count', 'total', 'minimum', 'maximum', 'categories')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.minimum = float('inf')
+        self.maximum = float('-inf')
+        self.categories = [0] * CATEGORY_COUNT
+
+    def add(self, aqi: float, category: int) -> None:
+        self.count += 1
+        self.total += aqi
+        if aqi < self.minimum:
+            self.minimum = aqi
+        if aqi > self.maximum:
+            self.maximum = aqi
+        self.categories[category] += 1
+
+    def merge(self, other: 'Bucket') -> None:
+        self.count += other.count
+        self.total += other.total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self.categories = [mine + theirs for mine, theirs in zip(self.categories, other.categories)]
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else float('nan')
+
+
+class HourBucket(Bucket):
+    """An hour bucket that also keeps its raw readings so corrections can rebuild it."""
+
+    __slots__ = ('readings',)
+
+    def __init__(self):
+        super().__init__()
+        self.readings: Dict[int, float] = {}
+
+    def rebuild(self) -> None:
+        Bucket.__init__(self)
+        for aqi in self.readings.values():
+            self.add(aqi, _category(aqi))
+
+
+class RollupSeries(NamedTuple):
+    starts: np.ndarray
+    count: np.ndarray
+    mean: np.ndarray
+    minimum: np.ndarray
+    maximum: np.ndarray
+    categories: np.ndarray
+
+
+class RollupSummary(NamedTuple):
+    cities: List[str]
+    count: np.ndarray
+    mean: np.ndarray
+    minimum: np.ndarray
+    maximum: np.ndarray
+    category_hours: np.ndarray
+
+
+class _CityRollups:
+    __slots__ = ('hour', 'day', 'month')
+
+    def __init__(self):
+        self.hour: Dict[int, HourBucket] = {}
+        self.day: Dict[int, Bucket] = {}
+        self.month: Dict[int, Bucket] = {}
+
+
+class AQIRollups:
+    """Per-city AQI rollups, updated one reading (or one scored batch) at a time.
+
+    ``sample_seconds`` is the interval each reading stands for; category
+    histograms are reported as hours spent in each category.
+    """
+
+    def __init__(self, retention: float = DEFAULT_RETENTION_SECONDS, sample_seconds: float = STEP_SECONDS):
+        self.retention = retention
+        self.sample_seconds = sample_seconds
+        self.dropped = 0
+        self.latest: Optional[int] = None
+        # End of the archive hours already rolled up by update_from_archive.
+        self.archive_end: Optional[int] = None
+        self._cities: Dict[str, _CityRollups] = {}
+        self._month_of_day: Dict[int, int] = {}
+        self._pruned_before = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_archive(cls, archive: ReadingsArchive, start=None, end=None, **kwargs) -> 'AQIRollups':
+        """Rollups of the archived hours in ``[start, end)``; see :meth:`update_from_archive`."""
+        rollups = cls(**kwargs)
+        rollups.update_from_archive(archive, start, end)
+        return rollups
+
+    def update_from_archive(self, archive: ReadingsArchive, start=None, end=None) -> int:
+        """Score archived hours with ``predict_aqi_batch`` and roll them up; returns the hours read.
+
+        Hours before the end of the last archive update are skipped, so calling
+        this after every append reads only the new hours. Predictor pollutants
+        a city has no column for count as 0, as they do for ``predict_aqi``;
+        hours with a gap in any recorded predictor are skipped.
+        """
+        if self.archive_end is not None:
+            start = self.archive_end if start is None else max(to_seconds(start), self.archive_end)
+        timestamps = archive.timestamps(start, end).astype(np.int64)
+        if timestamps.size:
+            for city in archive.cities():
+                recorded = [pid for pid in PREDICTOR_IDS if archive.has(city, pid)]
+                if not recorded:
+                    continue
+                matrix = np.zeros((timestamps.size, len(PREDICTOR_IDS)))
+                for col, pid in enumerate(PREDICTOR_IDS):
+                    if pid in recorded:
+                        matrix[:, col] = archive.column(city, pid, start, end)
+                self.add_many([city] * timestamps.size, timestamps, predict_aqi_batch(matrix))
+            self.archive_end = int(timestamps[-1]) + STEP_SECONDS
+        return int(timestamps.size)
+
+    @property
+    def end(self) -> Optional[int]:
+        """Epoch second just past the newest reading's hour, or None when empty."""
+        return None if self.latest is None else self.latest // STEP_SECONDS * STEP_SECONDS + STEP_SECONDS
+
+    def cities(self) -> List[str]:
+        return sorted(self._cities)
+
+    def add(self, city: str, timestamp, aqi: float) -> None:
+        """Record one reading; NaN and negative values are ignored."""
+        category = _category(aqi)
+        if category < 0:
+            return
+        with self._lock:
+            self._add(city, to_seconds(timestamp), float(aqi), category)
+
+    def add_many(self, cities: Sequence[str], timestamps: Iterable, aqi) -> None:
+        """Record many readings; categories are classified in one vectorized pass."""
+        values = np.asarray(aqi, dtype=np.float64)
+        categories = np.minimum(classify_aqi(values), CATEGORY_COUNT - 1)
+        with self._lock:
+            for city, timestamp, value, category in zip(cities, timestamps, values.tolist(), categories.tolist()):
+                if category >= 0:
+                    self._add(city, to_seconds(timestamp), value, category)
+
+    def record_batch(self, batch) -> None:
+        """Ingestion sink: roll up a :class:`~src.services.ingestion_service.ScoredBatch`.
+
+        Readings without an upstream timestamp are recorded at the time of the call.
+        """
+        now = to_seconds(np.datetime64('now', 's'))
+        timestamps = [now if stamp is None else stamp for stamp in batch.timestamps]
+        self.add_many(batch.cities, timestamps, batch.aqi)
+
+    def _add(self, city: str, seconds: int, aqi: float, category: int) -> None:
+        if self.latest is not None and seconds < self.latest - self.retention:
+            self.dropped += 1
+            return
+        rollups = self._cities.get(city)
+        if rollups is None:
+            rollups = self._cities[city] = _CityRollups()
+        hour_start = seconds // STEP_SECONDS * STEP_SECONDS
+        day_start = seconds // DAY_SECONDS * DAY_SECONDS
+        month_start = self._month_of_day.get(day_start)
+        if month_start is None:
+            month_start = self._month_of_day[day_start] = _month_start(day_start)
+
+        hour = rollups.hour.get(hour_start)
+        if hour is None:
+            hour = rollups.hour[hour_start] = HourBucket()
+        previous = hour.readings.get(seconds)
+        hour.readings[seconds] = aqi
+        if previous is None:
+            hour.add(aqi, category)
+            for buckets, start in ((rollups.day, day_start), (rollups.month, month_start)):
+                bucket = buckets.get(start)
+                if bucket is None:
+                    bucket = buckets[start] = Bucket()
+                bucket.add(aqi, category)
+        elif previous != aqi:
+            hour.rebuild()
+            rollups.day[day_start] = self._combine(rollups.hour, range(day_start, day_start + DAY_SECONDS, STEP_SECONDS))
+            rollups.month[month_start] = self._combine(
+                rollups.day, range(month_start, _next_month(month_start), DAY_SECONDS))
+
+        if self.latest is None or seconds > self.latest:
+            self.latest = seconds
+            self._prune()
+
+    @staticmethod
+    def _combine(buckets: Dict[int, Bucket], starts: Iterable[int]) -> Bucket:
+        combined = Bucket()
+        for start in starts:
+            bucket = buckets.get(start)
+            if bucket is not None:
+                combined.merge(bucket)
+        return combined
+
+    def _prune(self) -> None:
+        # Hours are dropped a day at a time so the sweep stays amortized O(1) per reading.
+        horizon = (self.latest - self.retention) // DAY_SECONDS * DAY_SECONDS
+        if self._pruned_before is not None and horizon <= self._pruned_before:
+            return
+        self._pruned_before = horizon
+        for rollups in self._cities.values():
+            for start in [start for start in rollups.hour if start < horizon]:
+                del rollups.hour[start]
+
+    def _buckets(self, city: str, grain: str) -> Dict[int, Bucket]:
+        if grain not in GRAINS:
+            raise ValueError(f"grain must be one of {', '.join(GRAINS)}")
+        rollups = self._cities.get(city)
+        return {} if rollups is None else getattr(rollups, grain)
+
+    def _in_range(self, city: str, grain: str, start, end) -> List[tuple]:
+        first = None if start is None else to_seconds(start)
+        last = None if end is None else to_seconds(end)
+        return sorted((bucket_start, bucket) for bucket_start, bucket in self._buckets(city, grain).items()
+                      if (first is None or bucket_start >= first) and (last is None or bucket_start < last))
+
+    def series(self, city: str, grain: str = 'day', start=None, end=None) -> RollupSeries:
+        """Buckets of ``city`` whose start falls in ``[start, end)``, oldest first."""
+        with self._lock:
+            buckets = self._in_range(city, grain, start, end)
+            return RollupSeries(
+                starts=np.array([bucket_start for bucket_start, _ in buckets], dtype=np.int64).astype('datetime64[s]'),
+                count=np.array([bucket.count for _, bucket in buckets], dtype=np.int64),
+                mean=np.array([bucket.mean for _, bucket in buckets], dtype=np.float64),
+                minimum=np.array([bucket.minimum for _, bucket in buckets], dtype=np.float64),
+                maximum=np.array([bucket.maximum for _, bucket in buckets], dtype=np.float64),
+                categories=np.array([bucket.categories for _, bucket in buckets], dtype=np.int64).reshape(-1, CATEGORY_COUNT),
+            )
+
+    def summarize(self, start=None, end=None, grain: str = 'day', cities: Optional[Iterable[str]] = None) -> RollupSummary:
+        """Per-city totals over the ``grain`` buckets starting in ``[start, end)``.
+
+        Cities with no readings in the range get a count of 0 and NaN statistics.
+        """
+        names = list(cities) if cities is not None else self.cities()
+        combined = []
+        with self._lock:
+            for city in names:
+                bucket = Bucket()
+                for _, part in self._in_range(city, grain, start, end):
+                    bucket.merge(part)
+                combined.append(bucket)
+        empty = [bucket.count == 0 for bucket in combined]
+        return RollupSummary(
+            cities=names,
+            count=np.array([bucket.count for bucket in combined], dtype=np.int64),
+            mean=np.array([bucket.mean for bucket in combined], dtype=np.float64),
+            minimum=np.where(empty, np.nan, [bucket.minimum for bucket in combined]),
+            maximum=np.where(empty, np.nan, [bucket.maximum for bucket in combined]),
+            category_hours=np.array([bucket.categories for bucket in combined], dtype=np.float64).reshape(-1, CATEGORY_COUNT)
+            * (self.sample_seconds / STEP_SECONDS),
+        )
@@ -0,0 +1,96 @@
+"""Shared hit/miss accounting for the in-process caches, and a TTL/LRU store."""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class CacheStats:
+    """Hit/miss counters for one named cache.
+
+    Counters are plain integer increments: cheap enough for hot paths, but only
+    approximate when several threads update them at once.
+    """
+
+    __slots__ = ('name', 'hits', 'misses')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+
+    def hit(self) -> None:
+        self.hits += 1
+
+    def miss(self) -> None:
+        self.misses += 1
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def snapshot(self) -> Dict[str, float]:
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hit_rate}
+
+    def reset(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+
+_CACHE_STATS: Dict[str, CacheStats] = {}
+
+
+def get_cache_stats(name: str) -> CacheStats:
+    """Return the CacheStats registered under ``name``, creating it on first use."""
+    stats = _CACHE_STATS.get(name)
+    if stats is None:
+        stats = _CACHE_STATS.setdefault(name, CacheStats(name))
+    return stats
+
+
+def all_cache_stats() -> Dict[str, Dict[str, float]]:
+    """Snapshot of every registered cache, keyed by name."""
+    return {name: stats.snapshot() for name, stats in sorted(_CACHE_STATS.items())}
+
+
+class TTLCache:
+    """Thread-safe in-process LRU of byte values with a per-entry TTL.
+
+    Holds at most ``max_entries`` values, evicting the least recently used
+    first; expired entries are dropped when they are next read. Its
+    ``get``/``set`` interface is the one shared cache backends implement, so it
+    also stands in for them in tests.
+    """
+
+    def __init__(self, max_entries: int = 1024, clock=time.monotonic):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
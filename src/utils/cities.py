@@ -0,0 +1,151 @@
+"""Array-backed city registry and all-city AQI computation.
+
+INDIAN_CITIES stays the human-edited source of truth; CITY_REGISTRY mirrors it
+as contiguous arrays so AQI for every city is one broadcast multiply, whether
+the table holds 25 cities or several thousand stations.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils.constants import INDIAN_CITIES, aqi_category_names, classify_aqi
+
+
+@dataclass(frozen=True)
+class StateAQITable:
+    """Per-state aggregates of a CityAQITable."""
+    states: np.ndarray
+    counts: np.ndarray
+    mean_aqi: np.ndarray
+    max_aqi: np.ndarray
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        return [
+            {'state': state, 'cities': count, 'mean_aqi': mean, 'max_aqi': peak}
+            for state, count, mean, peak in zip(self.states.tolist(), self.counts.tolist(), self.mean_aqi.tolist(), self.max_aqi.tolist())
+        ]
+
+
+@dataclass(frozen=True)
+class CityAQITable:
+    """AQI and category for a set of cities, as parallel arrays."""
+    names: np.ndarray
+    states: np.ndarray
+    state_codes: np.ndarray
+    state_names: np.ndarray
+    aqi: np.ndarray
+    category_index: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def categories(self) -> np.ndarray:
+        return aqi_category_names(self.category_index)
+
+    def take(self, order: np.ndarray) -> 'CityAQITable':
+        return CityAQITable(
+            names=self.names[order],
+            states=self.states[order],
+            state_codes=self.state_codes[order],
+            state_names=self.state_names,
+            aqi=self.aqi[order],
+            category_index=self.category_index[order],
+        )
+
+    def sorted(self, descending: bool = True) -> 'CityAQITable':
+        order = np.argsort(-self.aqi if descending else self.aqi, kind='stable')
+        return self.take(order)
+
+    def top(self, n: int) -> 'CityAQITable':
+        """The ``n`` worst cities, highest AQI first."""
+        if n < len(self):
+            # Partition first so only the n candidates get fully sorted.
+            candidates = np.argpartition(-self.aqi, n - 1)[:n]
+            return self.take(candidates).sorted()
+        return self.sorted()
+
+    def by_state(self) -> StateAQITable:
+        n_states = len(self.state_names)
+        counts = np.bincount(self.state_codes, minlength=n_states)
+        sums = np.bincount(self.state_codes, weights=self.aqi, minlength=n_states)
+        peaks = np.full(n_states, -np.inf)
+        np.maximum.at(peaks, self.state_codes, self.aqi)
+        present = counts > 0
+        return StateAQITable(
+            states=self.state_names[present],
+            counts=counts[present],
+            mean_aqi=sums[present] / counts[present],
+            max_aqi=peaks[present],
+        )
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        return [
+            {'city': name, 'state': state, 'aqi': aqi, 'category': category}
+            for name, state, aqi, category in zip(self.names.tolist(), self.states.tolist(), self.aqi.tolist(), self.categories.tolist())
+        ]
+
+
+class CityRegistry:
+    """Cities held as contiguous name/state/multiplier arrays."""
+
+    __slots__ = ('names', 'states', 'base_mult', 'state_codes', 'state_names', '_positions')
+
+    def __init__(self, names: Iterable[str], states: Iterable[str], base_mult: Iterable[float]):
+        self.names = np.asarray(list(names), dtype=object)
+        self.states = np.asarray(list(states), dtype=object)
+        self.base_mult = np.ascontiguousarray(list(base_mult), dtype=np.float64)
+        if not len(self.names) == len(self.states) == len(self.base_mult):
+            raise ValueError("names, states and base_mult must have the same length")
+        self.state_names, state_codes = np.unique(self.states.astype(str), return_inverse=True)
+        self.state_names = self.state_names.astype(object)
+        self.state_codes = state_codes.ravel()
+        self._positions = {name: position for position, name in enumerate(self.names.tolist())}
+
+    @classmethod
+    def from_mapping(cls, cities: Dict[str, Dict[str, Any]]) -> 'CityRegistry':
+        """Build from an INDIAN_CITIES-style ``{name: {'base_mult', 'state'}}`` mapping."""
+        return cls(
+            cities.keys(),
+            (factors.get('state', '') for factors in cities.values()),
+            (factors.get('base_mult', 1.0) for factors in cities.values()),
+        )
+
+    @classmethod
+    def from_records(cls, records: Iterable[Tuple[str, str, float]]) -> 'CityRegistry':
+        """Build from ``(name, state, base_mult)`` tuples, e.g. rows of a station table."""
+        records = list(records)
+        names, states, base_mult = zip(*records) if records else ((), (), ())
+        return cls(names, states, base_mult)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._positions
+
+    def index(self, name: str) -> int:
+        return self._positions[name]
+
+    def aqi_matrix(self, base_aqi) -> np.ndarray:
+        """AQI for every city from one or more base values: shape ``np.shape(base_aqi) + (n_cities,)``."""
+        return np.multiply.outer(np.asarray(base_aqi, dtype=np.float64), self.base_mult)
+
+    def compute_aqi(self, base_aqi: float, state: Optional[str] = None) -> CityAQITable:
+        """AQI and category for every city (optionally one state) from a single base AQI."""
+        aqi = self.base_mult * float(base_aqi)
+        table = CityAQITable(
+            names=self.names,
+            states=self.states,
+            state_codes=self.state_codes,
+            state_names=self.state_names,
+            aqi=aqi,
+            category_index=classify_aqi(aqi),
+        )
+        if state is not None:
+            table = table.take(np.flatnonzero(self.states == state))
+        return table
+
+
+CITY_REGISTRY = CityRegistry.from_mapping(INDIAN_CITIES)
@@ -15,9 +15,12 @@ SENSITIVE_GROUPS = [
 ]
 
 
+from bisect import bisect_left
 from dataclasses import dataclass
 from typing import List, Dict, Any
 
+import numpy as np
+
 
 @dataclass
 class AQILevel:
@@ -42,6 +45,48 @@ POLLUTANT_SPECS: Dict[str, Dict[str, Any]] = {
 }
 
 
+# Canonical pollutant ids for the display names used as POLLUTANT_SPECS keys.
+POLLUTANT_IDS: Dict[str, str] = {
+    'NO₂': 'no2', 'SO₂': 'so2', 'CO': 'co', 'O₃': 'o3', 'PM₁₀': 'pm10',
+    'PM₂.₅': 'pm2_5', 'NH₃': 'nh3', 'Pb': 'pb', 'CO₂': 'co2', 'CH₄': 'ch4',
+}
+POLLUTANT_SPECS_BY_ID: Dict[str, Dict[str, Any]] = {POLLUTANT_IDS[key]: spec for key, spec in POLLUTANT_SPECS.items()}
+
+_SUBSCRIPT_DIGITS = str.maketrans('₀₁₂₃₄₅₆₇₈₉', '0123456789')
+
+
+def normalize_pollutant_name(name: str) -> str:
+    """Fold subscripts to ASCII digits, lowercase and drop punctuation ('PM₂.₅' -> 'pm25')."""
+    return ''.join(c for c in name.translate(_SUBSCRIPT_DIGITS).lower() if c.isalnum())
+
+
+def _build_pollutant_aliases() -> Dict[str, str]:
+    aliases = {}
+    for key, pollutant_id in POLLUTANT_IDS.items():
+        ascii_name = key.translate(_SUBSCRIPT_DIGITS)
+        for spelling in (key, ascii_name, ascii_name.replace('.', '_'), pollutant_id, normalize_pollutant_name(key)):
+            for variant in (spelling, spelling.lower(), spelling.upper()):
+                aliases[variant] = pollutant_id
+    return aliases
+
+
+# Every accepted spelling (display name, ASCII, snake_case, case variants and the
+# normalized form) -> canonical id, built once so lookups are a dict hit.
+POLLUTANT_ALIASES: Dict[str, str] = _build_pollutant_aliases()
+
+
+def resolve_pollutant(name: str):
+    """Return the canonical pollutant id for ``name``, or None if it is not a known pollutant."""
+    pollutant_id = POLLUTANT_ALIASES.get(name)
+    if pollutant_id is None and isinstance(name, str):
+        pollutant_id = POLLUTANT_ALIASES.get(normalize_pollutant_name(name))
+    return pollutant_id
+
+
+def get_pollutant_spec(name: str):
+    """Return the POLLUTANT_SPECS entry for any accepted spelling of ``name``, or None."""
+    return POLLUTANT_SPECS_BY_ID.get(resolve_pollutant(name))
+
 # Simple city modifiers to simulate different urban baselines
 INDIAN_CITIES: Dict[str, Dict[str, Any]] = {
     # National and large metropolitan areas
@@ -102,17 +147,147 @@ def _build_aqi_levels():
 AQI_LEVELS = _build_aqi_levels()
 
 
+# Sorted upper bound of every AQI_ADVISORY_TABLE band. A value belongs to the
+# first band whose upper bound it does not exceed, so fractional readings that
+# fall between the integer bands (50.5, 100.3, ...) go to the band above.
+AQI_CATEGORIES = tuple(cat for _, _, cat, _ in AQI_ADVISORY_TABLE)
+AQI_BREAKPOINTS = tuple(float(high) for _, high, _, _ in AQI_ADVISORY_TABLE)
+AQI_BREAKPOINT_ARRAY = np.array(AQI_BREAKPOINTS)
+AQI_MIN = float(AQI_ADVISORY_TABLE[0][0])
+
+# Category index sentinels: negative/NaN input, and values above the table.
+AQI_INDEX_INVALID = -1
+AQI_INDEX_ABOVE_RANGE = len(AQI_ADVISORY_TABLE)
+
+UNKNOWN_AQI_LEVEL = AQILevel(category='Unknown', emoji='❓', description='Invalid AQI', recommendations=[])
+
+# Indexed by category index; above-range values map to Hazardous and the
+# trailing slot doubles as the AQI_INDEX_INVALID (-1) entry.
+_LEVELS_BY_INDEX = tuple(AQI_LEVELS[cat] for cat in AQI_CATEGORIES) + (AQI_LEVELS['Hazardous'], UNKNOWN_AQI_LEVEL)
+_LEVEL_ARRAY = np.empty(len(_LEVELS_BY_INDEX), dtype=object)
+_LEVEL_ARRAY[:] = _LEVELS_BY_INDEX
+_LEVEL_CATEGORY_ARRAY = np.array([level.category for level in _LEVELS_BY_INDEX], dtype=object)
+
+
+def aqi_category_index(aqi: float) -> int:
+    """Return the AQI_ADVISORY_TABLE row index for ``aqi`` in O(log k).
+
+    Returns AQI_INDEX_INVALID for negative or NaN values and
+    AQI_INDEX_ABOVE_RANGE for values above the last band.
+    """
+    if not aqi >= AQI_MIN:
+        return AQI_INDEX_INVALID
+    return bisect_left(AQI_BREAKPOINTS, aqi)
+
+
+def classify_aqi(values) -> np.ndarray:
+    """Vectorized :func:`aqi_category_index` over an array of AQI values."""
+    values = np.asarray(values, dtype=np.float64)
+    indices = np.searchsorted(AQI_BREAKPOINT_ARRAY, values, side='left')
+    return np.where(values >= AQI_MIN, indices, AQI_INDEX_INVALID)
+
+
+def get_aqi_levels(values) -> np.ndarray:
+    """Map an array of AQI values to the shared AQILevel objects (object array)."""
+    return _LEVEL_ARRAY[classify_aqi(values)]
+
+
+def aqi_category_names(indices) -> np.ndarray:
+    """Category names for category indices from :func:`classify_aqi`."""
+    return _LEVEL_CATEGORY_ARRAY[indices]
+
+
+def get_aqi_categories(values) -> np.ndarray:
+    """Category names of :func:`get_aqi_levels` without touching the AQILevel objects."""
+    return aqi_category_names(classify_aqi(values))
+
+
 def get_aqi_level(aqi: float) -> AQILevel:
     """Return an AQILevel dataclass for a numeric AQI value."""
     try:
         aqi_val = float(aqi)
     except Exception:
-        return AQILevel(category='Unknown', emoji='❓', description='Invalid AQI', recommendations=[])
-    for low, high, cat, desc in AQI_ADVISORY_TABLE:
-        if low <= aqi_val <= high:
-            return AQI_LEVELS.get(cat, AQILevel(category=cat, emoji='', description=desc, recommendations=[]))
-    # If above table, return Hazardous
-    return AQI_LEVELS.get('Hazardous', AQILevel(category='Hazardous', emoji='⚫️', description='Hazardous', recommendations=[]))
+        return UNKNOWN_AQI_LEVEL
+    # Values above the table map to Hazardous
+    return _LEVELS_BY_INDEX[aqi_category_index(aqi_val)]
+
+
+# Column order and weights of the heuristic predictor below.
+PREDICTOR_COLUMNS = ('NO2', 'SO2', 'CO', 'O3', 'PM10', 'NH3')
+PREDICTOR_WEIGHTS = (0.8, 0.6, 0.2, 0.5, 1.2, 0.1)
+PREDICTOR_IDS = tuple(POLLUTANT_ALIASES[column] for column in PREDICTOR_COLUMNS)
+
+
+def _coerce_float(value) -> float:
+    try:
+        return float(value)
+    except Exception:
+        return 0.0
+
+
+_coerce_float_array = np.frompyfunc(_coerce_float, 1, 1)
+
+
+def _as_predictor_matrix(data) -> np.ndarray:
+    """Coerce an (N, 6) array-like or a DataFrame into a float64 matrix."""
+    if hasattr(data, 'columns'):
+        # Columns may use any accepted pollutant spelling ('NO₂', 'no2', 'PM10', ...).
+        columns_by_id = {resolve_pollutant(column): column for column in data.columns}
+        missing = [c for c, pid in zip(PREDICTOR_COLUMNS, PREDICTOR_IDS) if pid not in columns_by_id]
+        if missing:
+            raise ValueError(f"Missing predictor columns: {', '.join(missing)}")
+        data = data[[columns_by_id[pid] for pid in PREDICTOR_IDS]].to_numpy()
+    matrix = np.asarray(data)
+    if matrix.ndim != 2 or matrix.shape[1] != len(PREDICTOR_COLUMNS):
+        raise ValueError(f"Expected an (N, {len(PREDICTOR_COLUMNS)}) array, got shape {matrix.shape}")
+    if matrix.dtype.kind in 'biuf':
+        return matrix.astype(np.float64, copy=False)
+    # Mixed/object input: per-element float() with invalid entries scored as 0,
+    # exactly like the scalar predictor always did.
+    return _coerce_float_array(matrix).astype(np.float64)
+
+
+def _round_1dp(values: np.ndarray) -> np.ndarray:
+    """Round to one decimal, matching Python's ``round(x, 1)`` bit for bit."""
+    rounded = np.round(values, 1)
+    # np.round scales by 10 first, which can land on the other side of a tie
+    # than Python's correctly rounded result; settle those few by hand.
+    scaled = values * 10.0
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_tie.any():
+        rounded[near_tie] = [round(v, 1) for v in values[near_tie].tolist()]
+    return rounded
+
+
+def _heuristic_aqi(columns):
+    """Weighted sum of ``columns`` normalized to 0-500 and rounded to one decimal.
+
+    ``columns`` holds one float, or one array of readings, per
+    ``PREDICTOR_COLUMNS`` entry; missing trailing pollutants count as 0. Both
+    predictors go through here, so they share the weights, the summation
+    order and the rounding.
+    """
+    total = 0.0
+    for value, weight in zip(columns, PREDICTOR_WEIGHTS):
+        total += value * weight
+    # Normalize to AQI-like 0-500 range using a heuristic divisor
+    aqi = total / 2.0
+    if isinstance(aqi, np.ndarray):
+        return _round_1dp(np.clip(aqi, 0.0, 500.0))
+    return round(min(max(aqi, 0.0), 500.0), 1)
+
+
+def predict_aqi_batch(data) -> np.ndarray:
+    """Vectorized :func:`predict_aqi` over many readings at once.
+
+    ``data`` is an (N, 6) array-like in ``PREDICTOR_COLUMNS`` order or a pandas
+    DataFrame with those columns (under any spelling resolve_pollutant
+    accepts). Returns an N-length float64 array of AQI values clipped to
+    0-500 and rounded to one decimal.
+    """
+    # Column by column (not ``matrix @ weights``) so the summation order, and
+    # therefore every rounding step, matches the scalar predictor.
+    return _heuristic_aqi(_as_predictor_matrix(data).T)
 
 
 def predict_aqi(input_vector: List[float]) -> float:
@@ -120,28 +295,12 @@ def predict_aqi(input_vector: List[float]) -> float:
 
     Input order expected: [NO2, SO2, CO, O3, PM10, NH3]
     """
-    weights = [0.8, 0.6, 0.2, 0.5, 1.2, 0.1]
-    total = 0.0
-    for v, w in zip(input_vector, weights):
-        try:
-            total += float(v) * w
-        except Exception:
-            total += 0.0
-    # Normalize to AQI-like 0-500 range using a heuristic divisor
-    aqi_val = total / 2.0
-    if aqi_val < 0:
-        aqi_val = 0.0
-    if aqi_val > 500:
-        aqi_val = 500.0
-    return round(aqi_val, 1)
+    # Scalar fast path: building a one-row array costs ~20x the arithmetic.
+    return _heuristic_aqi(map(_coerce_float, input_vector))
 
 
 def generate_daily_trend(base: float, hours: int = 24):
     """Generate a simple synthetic daily trend (list of floats)."""
-    import math
-    trend = []
-    for h in range(hours):
-        # simple sinusoidal daily pattern + noise
-        value = base * (1 + 0.2 * math.sin(2 * math.pi * h / 24))
-        trend.append(max(0.0, value))
-    return trend
+    from src.utils.trends import generate_trends
+    # simple sinusoidal daily pattern
+    return generate_trends(base, hours, profile='sinusoidal').tolist()
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from src.services.alert_engine import (
+    LEVEL_NORMAL,
+    LEVEL_SEVERE,
+    LEVEL_WARNING,
+    AlertEngine,
+    alert_level,
+)
+from src.utils.constants import POLLUTANT_SPECS
+
+PM25 = POLLUTANT_SPECS['PM₂.₅']
+
+
+def _engine(**kwargs):
+    kwargs.setdefault('cooldown', 0)
+    return AlertEngine(['Delhi', 'Mumbai'], pollutants=['PM₂.₅', 'NO₂'], **kwargs)
+
+
+def _readings(delhi_pm25, mumbai_pm25=0.0):
+    return np.array([[delhi_pm25, 0.0], [mumbai_pm25, 0.0]])
+
+
+def test_alerts_fire_only_on_transitions():
+    engine = _engine()
+    warning, severe = PM25['warning_threshold'], PM25['severe_threshold']
+    alerts = engine.evaluate(_readings(warning + 1), timestamp=0)
+    assert [(a.station, a.pollutant, a.level, a.previous_level) for a in alerts] == [
+        ('Delhi', 'PM₂.₅', LEVEL_WARNING, LEVEL_NORMAL)]
+    assert engine.evaluate(_readings(warning + 2), timestamp=1) == []
+    escalated = engine.evaluate(_readings(severe, severe), timestamp=2)
+    assert [(a.station, a.level) for a in escalated] == [('Delhi', LEVEL_SEVERE), ('Mumbai', LEVEL_SEVERE)]
+    assert all(a.escalation for a in escalated)
+
+
+def test_hysteresis_holds_level_until_reading_drops_below_release():
+    engine = _engine(hysteresis=0.1)
+    warning = PM25['warning_threshold']
+    engine.evaluate(_readings(warning), timestamp=0)
+    assert engine.evaluate(_readings(warning * 0.95), timestamp=1) == []
+    cleared = engine.evaluate(_readings(warning * 0.85), timestamp=2)
+    assert [(a.level, a.previous_level) for a in cleared] == [(LEVEL_NORMAL, LEVEL_WARNING)]
+    assert not cleared[0].escalation
+
+
+def test_cooldown_defers_downgrades_but_not_escalations():
+    engine = _engine(cooldown=600)
+    warning, severe = PM25['warning_threshold'], PM25['severe_threshold']
+    engine.evaluate(_readings(warning), timestamp=0)
+    assert [a.level for a in engine.evaluate(_readings(severe), timestamp=10)] == [LEVEL_SEVERE]
+    # Recovery inside the cooldown is held back, then reported once it expires.
+    assert engine.evaluate(_readings(0), timestamp=20) == []
+    assert engine.levels[0, 0] == LEVEL_SEVERE
+    later = engine.evaluate(_readings(0), timestamp=610)
+    assert [(a.level, a.previous_level) for a in later] == [(LEVEL_NORMAL, LEVEL_SEVERE)]
+
+
+def test_missing_readings_keep_the_current_level():
+    engine = _engine()
+    engine.evaluate(_readings(PM25['severe_threshold']), timestamp=0)
+    assert engine.evaluate(_readings(np.nan), timestamp=1) == []
+    assert [(a.station, a.level) for a in engine.active()] == [('Delhi', LEVEL_SEVERE)]
+
+
+def test_messages_match_single_reading_checks():
+    engine = _engine()
+    value = PM25['severe_threshold'] + 3
+    alert, = engine.evaluate(_readings(value), timestamp=0)
+    assert alert.status == 'SEVERE ALERT' and alert.color == 'red'
+    assert alert.message.startswith(f"⚠️ PM₂.₅ level is {value:.1f}")
+    assert alert_level(value, PM25) == alert.level
+
+
+def test_default_engine_covers_every_pollutant_and_checks_shape():
+    engine = AlertEngine([f'Station {i}' for i in range(100)])
+    assert engine.levels.shape == (100, len(POLLUTANT_SPECS))
+    assert engine.evaluate(np.zeros((100, len(POLLUTANT_SPECS)))) == []
+    with pytest.raises(ValueError):
+        engine.evaluate(np.zeros((3, 3)))
+    with pytest.raises(KeyError):
+        AlertEngine(['Delhi'], pollutants=['Unobtainium'])
@@ -0,0 +1,112 @@
+import pytest
+
+pytest.importorskip("streamlit")
+pytest.importorskip("plotly")
+
+from src import app  # noqa: E402
+from src.utils.cache import get_cache_stats  # noqa: E402
+from src.utils.constants import predict_aqi  # noqa: E402
+
+
+def test_cached_prediction_counts_hits_and_misses():
+    app.cached_predict_aqi.clear()
+    stats = get_cache_stats("prediction")
+    stats.reset()
+    vector = (40.0, 20.0, 0.5, 30.0, 60.0, 10.0)
+    assert app.cached_predict_aqi(vector) == predict_aqi(list(vector))
+    assert app.cached_predict_aqi(vector) == predict_aqi(list(vector))
+    app.cached_predict_aqi((1.0,) * 6)
+    assert (stats.hits, stats.misses) == (1, 2)
+
+
+def test_cached_city_comparison_reuses_figure():
+    app.cached_city_comparison.clear()
+    stats = get_cache_stats("city_comparison")
+    stats.reset()
+    first = app.cached_city_comparison(80.0)
+    second = app.cached_city_comparison(80.0)
+    assert second.layout.title.text == first.layout.title.text
+    assert (stats.hits, stats.misses) == (1, 1)
+
+
+def test_cached_trend_chart_refreshes_when_hours_are_appended(monkeypatch):
+    monkeypatch.setattr(app, 'load_archive', lambda path: None)
+    app.cached_trend_chart.clear()
+    stats = get_cache_stats("trend_chart")
+    stats.reset()
+    app.cached_trend_chart('PM₁₀', 80.0, 'Delhi', 1_700_003_600)
+    app.cached_trend_chart('PM₁₀', 80.0, 'Delhi', 1_700_003_600)
+    app.cached_trend_chart('PM₁₀', 80.0, 'Delhi', 1_700_007_200)
+    assert (stats.hits, stats.misses) == (1, 2)
+
+
+def test_archive_feeds_trend_and_recorded_comparison(tmp_path):
+    from src.storage.archive import ArchiveWriter, ReadingsArchive
+
+    ArchiveWriter(str(tmp_path)).append(1_700_000_000, {
+        ('Delhi', 'PM₂.₅'): range(48),
+        ('Pune', 'PM₂.₅'): [10.0] * 48,
+    })
+    archive = ReadingsArchive(str(tmp_path))
+
+    times, values = app.recent_history(archive, 'Delhi', 'PM2.5')
+    assert len(times) == 24 and values.tolist() == list(range(24, 48))
+    assert app.recent_history(archive, 'Mumbai', 'PM2.5') is None
+    assert app.recent_history(None, 'Delhi', 'PM2.5') is None
+
+    trend = app.create_trend_chart('PM₂.₅', 80.0, app.find_spec('PM₂.₅'), seed=1, history=(times, values))
+    assert [trace.name for trace in trend.data] == ['PM₂.₅ Recorded', 'PM₂.₅ Trend']
+
+    comparison = app.create_recorded_comparison(archive, 'PM₂.₅')
+    assert list(comparison.data[0].x) == ['Delhi', 'Pune']
+    assert list(comparison.data[0].y) == [35.5, 10.0]
+
+
+def test_rollup_views_read_daily_buckets():
+    from src.storage.rollups import DAY_SECONDS, AQIRollups
+
+    rollups = AQIRollups()
+    for day in range(35):
+        rollups.add('Delhi', 1_700_000_000 + day * DAY_SECONDS, 150.0)
+        rollups.add('Pune', 1_700_000_000 + day * DAY_SECONDS, 40.0 + day % 2)
+    comparison = app.create_rollup_comparison(rollups)
+    assert list(comparison.data[0].x) == ['Delhi', 'Pune']
+    assert list(comparison.data[0].y) == [150.0, 40.5]
+    trend = app.create_rollup_trend(rollups, 'Pune')
+    assert [trace.name for trace in trend.data][-1] == 'Daily mean'
+    assert len(trend.data[-1].y) == 30
+
+
+def test_trend_chart_prefers_the_model_forecast():
+    pytest.importorskip("sklearn")
+    from src.models.forecaster import Forecaster
+
+    forecaster = Forecaster()
+    forecaster.update('Delhi', 'PM10', 1_700_000_000, [80.0 + hour % 24 for hour in range(24 * 4)])
+    forecast = app.model_forecast(forecaster, 'Delhi', 'PM₁₀')
+    assert len(forecast[1]) == 24
+    assert app.model_forecast(forecaster, 'Pune', 'PM₁₀') is None
+    assert app.model_forecast(None, 'Delhi', 'PM₁₀') is None
+
+    chart = app.create_trend_chart('PM₁₀', 80.0, app.find_spec('PM₁₀'), forecast=forecast)
+    assert [trace.name for trace in chart.data] == ['PM₁₀ Forecast']
+
+
+def test_results_survive_changing_the_recorded_pollutant(tmp_path, monkeypatch):
+    from streamlit.testing.v1 import AppTest
+
+    from src.config import Config
+    from src.storage.archive import ArchiveWriter
+
+    ArchiveWriter(str(tmp_path)).append(1_700_000_000, {('Delhi', 'PM₂.₅'): [50.0] * 24, ('Delhi', 'NO₂'): [20.0] * 24})
+    monkeypatch.setattr(Config, 'ARCHIVE_PATH', str(tmp_path))
+    monkeypatch.setattr(Config, 'MODEL_REGISTRY_PATH', str(tmp_path / 'models'))
+    app.load_archive.clear()
+
+    script = AppTest.from_file(app.__file__, default_timeout=60).run()
+    script.button[0].click().run()
+    selector = next(box for box in script.selectbox if box.label == 'Recorded pollutant')
+    assert selector.value == 'PM₂.₅'
+    selector.select('NO₂').run()
+    assert not script.exception
+    assert any(box.label == 'Recorded pollutant' and box.value == 'NO₂' for box in script.selectbox)
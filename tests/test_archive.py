@@ -0,0 +1,111 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from src.storage import archive as archive_module
+from src.storage.archive import INDEX_FILE, SEGMENT_DIR, ArchiveWriter, ReadingsArchive, to_hour
+
+START = to_hour('2024-03-01T00:00:00')
+
+
+def test_append_and_zero_copy_slice(tmp_path):
+    writer = ArchiveWriter(str(tmp_path))
+    hours = 24 * 31
+    assert writer.append(START, {('Delhi', 'PM₂.₅'): np.arange(hours), ('Delhi', 'NO2'): np.ones(hours)}) == hours
+
+    archive = ReadingsArchive(str(tmp_path))
+    assert archive.cities() == ['Delhi'] and archive.pollutants('Delhi') == ['no2', 'pm2_5']
+    march_2nd = archive.column('Delhi', 'pm2.5', '2024-03-02', '2024-03-03')
+    assert march_2nd.tolist() == list(range(24, 48))
+    assert isinstance(march_2nd.base, np.memmap) and not march_2nd.flags.writeable
+    times, values = archive.series('Delhi', 'PM2.5', '2024-03-31T22:00:00')
+    assert times.tolist()[0].isoformat() == '2024-03-31T22:00:00' and values.tolist() == [742, 743]
+
+
+def test_appends_pad_gaps_and_new_columns(tmp_path):
+    writer = ArchiveWriter(str(tmp_path))
+    writer.append(START, {('Delhi', 'PM10'): [1, 2]})
+    # Two missing hours, then a block that also introduces Pune.
+    assert writer.append(START + 4 * 3600, {('Pune', 'PM10'): [5, 6]}) == 6
+
+    archive = ReadingsArchive(str(tmp_path))
+    assert np.isnan(archive.column('Delhi', 'PM10')[2:]).all()
+    assert archive.column('Delhi', 'PM10')[:2].tolist() == [1, 2]
+    pune = archive.column('Pune', 'PM10')
+    assert np.isnan(pune[:4]).all() and pune[4:].tolist() == [5, 6]
+    names, means = archive.summarize('PM10', cities=['Delhi', 'Pune', 'Patna'])
+    assert names == ['Delhi', 'Pune', 'Patna']
+    assert means[:2].tolist() == [1.5, 5.5] and np.isnan(means[2])
+
+    with pytest.raises(ValueError):
+        writer.append(START + 3600, {('Delhi', 'PM10'): [9]})
+    with pytest.raises(ValueError):
+        writer.append(START + 6 * 3600, {('Delhi', 'PM10'): [1], ('Pune', 'PM10'): [1, 2]})
+    with pytest.raises(KeyError):
+        writer.append(START + 6 * 3600, {('Delhi', 'Radon'): [1]})
+
+
+def test_uncommitted_tail_is_invisible_and_discarded(tmp_path):
+    writer = ArchiveWriter(str(tmp_path))
+    writer.append(START, {('Delhi', 'CO'): [1, 2, 3]})
+    with open(os.path.join(tmp_path, INDEX_FILE)) as handle:
+        column_path = os.path.join(tmp_path, json.load(handle)['columns']['Delhi']['co'])
+    # Simulate a crash after writing data but before the index was replaced.
+    with open(column_path, 'ab') as handle:
+        handle.write(np.array([99, 99], dtype='<f4').tobytes())
+
+    archive = ReadingsArchive(str(tmp_path))
+    assert archive.column('Delhi', 'CO').tolist() == [1, 2, 3]
+
+    ArchiveWriter(str(tmp_path)).append(START + 3 * 3600, {('Delhi', 'CO'): [4]})
+    archive.refresh()
+    assert archive.column('Delhi', 'CO').tolist() == [1, 2, 3, 4]
+    assert os.path.getsize(column_path) == 4 * 4
+
+
+def test_append_syncs_one_segment_and_leaves_other_columns_alone(tmp_path, monkeypatch):
+    synced = []
+    real_fsync = os.fsync
+    monkeypatch.setattr(archive_module.os, 'fsync', lambda fd: synced.append(fd) or real_fsync(fd))
+    writer = ArchiveWriter(str(tmp_path))
+    # 50 columns in one append: one segment fsync and one index fsync.
+    writer.append(START, {(f'City {number}', 'PM10'): [1.0, 2.0] for number in range(50)})
+    writer.append(START + 2 * 3600, {('City 0', 'PM10'): [3.0], ('City 1', 'PM10'): [4.0]})
+    assert len(synced) == 2 * 2
+    assert len(os.listdir(tmp_path / SEGMENT_DIR)) == 2
+    # The checkpoint syncs each written column file once, then the index.
+    writer.checkpoint()
+    assert len(synced) == 2 * 2 + 50 + 1
+    assert os.listdir(tmp_path / SEGMENT_DIR) == []
+    archive = ReadingsArchive(str(tmp_path))
+    assert archive.column('City 0', 'PM10').tolist() == [1.0, 2.0, 3.0]
+    untouched = archive.column('City 7', 'PM10')
+    assert untouched[:2].tolist() == [1.0, 2.0] and np.isnan(untouched[2]) and not untouched.flags.writeable
+    assert os.path.getsize(tmp_path / 'City_7' / 'pm10.f32') == 2 * 4
+
+
+def test_new_writer_replays_appends_that_were_not_checkpointed(tmp_path):
+    writer = ArchiveWriter(str(tmp_path))
+    writer.append(START, {('Delhi', 'CO'): [1, 2, 3], ('Pune', 'CO'): [5, 6, 7]})
+    writer.append(START + 3 * 3600, {('Delhi', 'CO'): [4]})
+    assert len(os.listdir(tmp_path / SEGMENT_DIR)) == 2
+    # Simulate column writes lost in a crash: the index and segments were synced, the columns weren't.
+    for city in ('Delhi', 'Pune'):
+        os.truncate(tmp_path / city / 'co.f32', 0)
+
+    ArchiveWriter(str(tmp_path))
+    archive = ReadingsArchive(str(tmp_path))
+    assert archive.column('Delhi', 'CO').tolist() == [1, 2, 3, 4]
+    assert archive.column('Pune', 'CO')[:3].tolist() == [5, 6, 7]
+    assert os.listdir(tmp_path / SEGMENT_DIR) == []
+
+
+def test_open_missing_archive_and_colliding_city_names(tmp_path):
+    assert ReadingsArchive.open(str(tmp_path / 'missing')) is None
+    writer = ArchiveWriter(str(tmp_path))
+    writer.append(START, {('New Delhi', 'O3'): [1], ('New_Delhi', 'O3'): [2]})
+    archive = ReadingsArchive.open(str(tmp_path))
+    assert archive.column('New Delhi', 'O3').tolist() == [1]
+    assert archive.column('New_Delhi', 'O3').tolist() == [2]
@@ -0,0 +1,69 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from src.backfill import Checkpoint, run_backfill
+from src.utils.constants import PREDICTOR_COLUMNS, get_aqi_level, predict_aqi
+
+
+def _archive(tmp_path, rows=5000):
+    rng = np.random.default_rng(11)
+    frame = pd.DataFrame(np.round(rng.uniform(0, 400, size=(rows, 6)), 2), columns=PREDICTOR_COLUMNS)
+    frame.insert(0, 'city', 'Delhi')
+    path = tmp_path / 'readings.csv'
+    frame.to_csv(path, index=False)
+    return frame, str(path)
+
+
+def test_backfill_scores_every_row_in_order(tmp_path):
+    frame, source = _archive(tmp_path)
+    output = str(tmp_path / 'scored.csv')
+    assert run_backfill(source, output, chunk_size=700, workers=2, log=io.StringIO()) == len(frame)
+    scored = pd.read_csv(output)
+    sample = frame.iloc[::97]
+    assert scored['aqi'].iloc[::97].tolist() == [predict_aqi(row) for row in sample[list(PREDICTOR_COLUMNS)].values.tolist()]
+    assert scored['category'].iloc[::97].tolist() == [get_aqi_level(v).category for v in scored['aqi'].iloc[::97]]
+
+
+def test_backfill_resumes_after_interruption(tmp_path):
+    frame, source = _archive(tmp_path)
+    full = str(tmp_path / 'full.csv')
+    run_backfill(source, full, chunk_size=1000, workers=2, log=io.StringIO())
+    with open(full, 'rb') as handle:
+        expected = handle.read()
+
+    # Pretend a run stopped after two chunks, midway through writing the third.
+    partial = str(tmp_path / 'partial.csv')
+    prefix = b''.join(expected.splitlines(keepends=True)[:2001])
+    with open(partial, 'wb') as handle:
+        handle.write(prefix + b'Delhi,1.0,2.')
+    checkpoint = Checkpoint(partial)
+    checkpoint.state = {'chunks': 2, 'rows': 2000, 'bytes': len(prefix)}
+    checkpoint.save(source, 1000)
+
+    log = io.StringIO()
+    assert run_backfill(source, partial, chunk_size=1000, workers=2, resume=True, log=log) == 3000
+    with open(partial, 'rb') as handle:
+        assert handle.read() == expected
+    assert 'rows/s' in log.getvalue()
+
+
+def test_resume_without_output_starts_over(tmp_path):
+    frame, source = _archive(tmp_path, rows=300)
+    output = str(tmp_path / 'scored.csv')
+    checkpoint = Checkpoint(output)
+    checkpoint.state = {'chunks': 2, 'rows': 200, 'bytes': 1234}
+    checkpoint.save(source, 100)
+    assert run_backfill(source, output, chunk_size=100, workers=1, resume=True, log=io.StringIO()) == len(frame)
+    assert len(pd.read_csv(output)) == len(frame)
+
+
+def test_backfill_with_model_coefficients(tmp_path):
+    frame, source = _archive(tmp_path, rows=50)
+    output = str(tmp_path / 'scored.csv')
+    coefficients = {'pm10': 0.5, 'no2': 0.3}
+    run_backfill(source, output, chunk_size=20, workers=1, coefficients=coefficients, log=io.StringIO())
+    scored = pd.read_csv(output)
+    expected = np.clip(0.5 * frame['PM10'] + 0.3 * frame['NO2'], 0, 500)
+    assert np.allclose(scored['aqi'], expected)
@@ -0,0 +1,113 @@
+import json
+
+import pytest
+from flask import Flask
+
+from src.api import routes
+from src.api.routes import api_bp
+from src.api.validators import validate_prediction_request
+from src.utils.constants import predict_aqi
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.register_blueprint(api_bp)
+    return app.test_client()
+
+
+def test_predict_aqi_single(client):
+    response = client.post('/predict-aqi', json={'parameters': [40, 20, 0.5, 30, 60, 10]})
+    assert response.status_code == 200
+    assert response.json == {'predicted_aqi': predict_aqi([40, 20, 0.5, 30, 60, 10])}
+    assert client.post('/predict-aqi', json={'parameters': 'x'}).status_code == 400
+
+
+def test_predict_aqi_batch_preserves_order_and_errors(client):
+    records = [
+        {'parameters': [40, 20, 0.5, 30, 60, 10]},
+        {'parameters': {'PM10': 300, 'NO2': 80}},
+        {'parameters': [1, 'bad']},
+        {'nothing': True},
+        {'parameters': [400, 200, 5, 300, 600, 100]},
+    ]
+    response = client.post('/predict-aqi/batch', json=records)
+    assert response.status_code == 200
+    body = response.json
+    assert body['count'] == 5 and body['errors'] == 2
+    results = body['results']
+    assert results[0] == {'predicted_aqi': predict_aqi([40, 20, 0.5, 30, 60, 10])}
+    assert results[1] == {'predicted_aqi': predict_aqi([80, 0, 0, 0, 300, 0])}
+    assert 'error' in results[2] and 'error' in results[3]
+    assert results[4] == {'predicted_aqi': predict_aqi([400, 200, 5, 300, 600, 100])}
+
+
+def test_advisory_batch_accepts_ndjson(client):
+    lines = [json.dumps({'aqi': 120, 'group': 'Children'}), '{not json', json.dumps({'aqi': 30}), json.dumps({'aqi': 900})]
+    response = client.post('/advisory/batch', data='\n'.join(lines), content_type='application/x-ndjson')
+    assert response.status_code == 200
+    results = response.json['results']
+    assert results[0]['aqi_category'] == 'Unhealthy for Sensitive Groups'
+    assert results[0]['advice'].endswith('Children should consider limiting outdoor exertion, wearing masks, and staying indoors if possible.')
+    assert results[1]['error'].startswith('Invalid JSON') and results[1]['field'] is None
+    assert results[2] == {'aqi_category': 'Good', 'advice': 'Air quality is considered satisfactory, and air pollution poses little or no risk.', 'group': 'General'}
+    assert results[3] == {'error': 'AQI must be between 0 and 500.', 'field': 'aqi'}
+
+
+def test_batch_errors_name_the_failing_field(client):
+    records = [{'aqi': 10, 'group': ['Children']}, {'aqi': True}, 'nope', {'group': 'Elderly'}]
+    results = client.post('/advisory/batch', json=records).json['results']
+    assert [result['field'] for result in results] == ['group', 'aqi', None, 'aqi']
+    assert results[0]['error'].startswith('Group must be one of the following: Children, Elderly')
+
+
+def test_batch_rejects_non_array_body(client):
+    response = client.post('/advisory/batch', json={'aqi': 30})
+    assert response.status_code == 400
+
+
+def test_batch_streams_ndjson_when_accepted(client):
+    lines = [json.dumps({'parameters': [i, i, 0.1, i, i, i]}) for i in range(2500)] + ['oops']
+    response = client.post(
+        '/predict-aqi/batch',
+        data='\n'.join(lines),
+        content_type='application/x-ndjson',
+        headers={'Accept': 'application/x-ndjson'},
+    )
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    results = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert len(results) == 2501
+    assert results[1234] == {'predicted_aqi': predict_aqi([1234, 1234, 0.1, 1234, 1234, 1234])}
+    assert 'error' in results[-1]
+
+
+def test_ndjson_stream_reports_oversized_batch(client, monkeypatch):
+    monkeypatch.setattr('src.api.routes.MAX_BATCH_RECORDS', 3)
+    lines = [json.dumps({'aqi': 10})] * 5
+    response = client.post(
+        '/advisory/batch',
+        data='\n'.join(lines),
+        content_type='application/x-ndjson',
+        headers={'Accept': 'application/x-ndjson'},
+    )
+    results = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert len(results) == 4
+    assert 'max_records' in results[-1]
+
+
+def test_scoring_error_mid_stream_does_not_repeat_the_chunk(monkeypatch):
+    monkeypatch.setattr(routes, 'BATCH_CHUNK_SIZE', 2)
+    calls = []
+
+    def score(rows):
+        calls.append(len(rows))
+        if len(calls) == 2:
+            raise ValueError('scoring failed')
+        return [{'predicted_aqi': 0.0}] * len(rows)
+
+    results = []
+    with pytest.raises(ValueError, match='scoring failed'):
+        for result in routes._iter_results([({'parameters': [1, 2, 3]}, None)] * 5, validate_prediction_request, score):
+            results.append(result)
+    assert calls == [2, 2] and len(results) == 2
@@ -0,0 +1,44 @@
+import dataclasses
+
+import numpy as np
+import pytest
+
+from src.utils.cities import CITY_REGISTRY, CityRegistry
+from src.utils.constants import INDIAN_CITIES, get_aqi_level
+
+
+def test_registry_mirrors_indian_cities():
+    assert len(CITY_REGISTRY) == len(INDIAN_CITIES)
+    assert CITY_REGISTRY.base_mult.flags['C_CONTIGUOUS']
+    assert CITY_REGISTRY.base_mult[CITY_REGISTRY.index('Delhi')] == INDIAN_CITIES['Delhi']['base_mult']
+
+
+def test_compute_aqi_matches_per_city_loop():
+    table = CITY_REGISTRY.compute_aqi(120.0)
+    for name, aqi, category in zip(table.names, table.aqi, table.categories):
+        expected = 120.0 * INDIAN_CITIES[name]['base_mult']
+        assert aqi == pytest.approx(expected)
+        assert category == get_aqi_level(expected).category
+    assert CITY_REGISTRY.aqi_matrix([100.0, 200.0]).shape == (2, len(INDIAN_CITIES))
+
+
+def test_categories_come_from_the_precomputed_index():
+    table = CITY_REGISTRY.compute_aqi(120.0).top(5)
+    assert table.categories.tolist() == [get_aqi_level(aqi).category for aqi in table.aqi.tolist()]
+    relabelled = dataclasses.replace(table, category_index=np.zeros(len(table), dtype=np.int64))
+    assert relabelled.categories.tolist() == ['Good'] * len(table)
+
+
+def test_top_sorted_and_state_aggregates():
+    registry = CityRegistry.from_records([('A', 'X', 1.0), ('B', 'Y', 2.0), ('C', 'X', 3.0), ('D', 'Y', 0.5)])
+    table = registry.compute_aqi(50.0)
+    assert table.top(2).names.tolist() == ['C', 'B']
+    assert table.sorted(descending=False).names.tolist() == ['D', 'A', 'B', 'C']
+    states = table.by_state()
+    assert states.to_records() == [
+        {'state': 'X', 'cities': 2, 'mean_aqi': 100.0, 'max_aqi': 150.0},
+        {'state': 'Y', 'cities': 2, 'mean_aqi': 62.5, 'max_aqi': 100.0},
+    ]
+    only_x = registry.compute_aqi(50.0, state='X')
+    assert only_x.names.tolist() == ['A', 'C']
+    assert np.array_equal(only_x.by_state().counts, [2])
@@ -0,0 +1,124 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+
+from src.models.forecaster import Forecaster, _forward_fill, _hour_features  # noqa: E402
+from src.storage.archive import ArchiveWriter, ReadingsArchive, to_hour  # noqa: E402
+
+START = to_hour('2024-03-01T00:00:00')
+HOUR = 3600
+
+
+def _daily_cycle(base, days, noise=0.0, seed=0):
+    hours = np.arange(24 * days)
+    values = base * (1 + 0.3 * np.sin(2 * np.pi * (hours % 24) / 24))
+    return values + np.random.default_rng(seed).normal(0, noise, hours.size)
+
+
+def _trained(days=30):
+    forecaster = Forecaster()
+    for city, base in (('Delhi', 150.0), ('Pune', 60.0)):
+        forecaster.update(city, 'PM10', START, _daily_cycle(base, days, noise=2.0))
+        forecaster.update(city, 'NO₂', START, _daily_cycle(base / 3, days, noise=1.0))
+    return forecaster
+
+
+def test_batch_forecast_matches_each_model_and_follows_the_daily_cycle():
+    forecaster = _trained()
+    forecast = forecaster.forecast(hours=24)
+    assert forecast.keys == [('Delhi', 'pm10'), ('Delhi', 'no2'), ('Pune', 'pm10'), ('Pune', 'no2')]
+    assert forecast.values.shape == (4, 24)
+    assert str(forecast.start[0]) == '2024-03-31T00:00:00'
+
+    # The first hour of the stacked forecast equals each model's own predict().
+    for row, model in enumerate(forecaster.models):
+        features = np.hstack((_forward_fill(forecaster.history[row:row + 1])[:, forecaster.window - forecaster.lags],
+                              _hour_features(forecaster.last_hour[row:row + 1] + HOUR)))
+        assert forecast.values[row, 0] == pytest.approx(model.predict(features)[0] * forecaster.scales[row])
+
+    times, delhi = forecast.series('Delhi', 'pm10')
+    expected = _daily_cycle(150.0, 1)
+    assert times[0] == np.datetime64('2024-03-31T00:00:00')
+    assert np.abs(delhi - expected).mean() < 0.1 * 150
+
+
+def test_updates_are_incremental_and_skip_replayed_hours():
+    forecaster = Forecaster(min_samples=8)
+    assert forecaster.update('Delhi', 'PM10', START, np.full(30, 100.0)) == 30 - 24
+    assert forecaster.ready() == []
+    before = forecaster.models[0].coef_.copy()
+    # Replayed hours are ignored; two new hours extend the series.
+    assert forecaster.update('Delhi', 'PM10', START + 28 * HOUR, [100.0, 100.0, 101.0, 99.0]) == 2
+    assert not np.array_equal(forecaster.models[0].coef_, before)
+    # A gap leaves NaN lags, so rows that need the missing hour are not fitted.
+    assert forecaster.update('Delhi', 'PM10', START + 40 * HOUR, [100.0]) == 0
+    assert forecaster.last_hour[0] == START + 40 * HOUR
+    assert forecaster.ready() == [('Delhi', 'pm10')]
+
+
+def test_record_batch_averages_stations_and_fits_each_series_once(monkeypatch):
+    hours = 30
+    far_future = to_hour('2090-01-01T00:00:00')
+
+    class Batch:
+        cities = ['Delhi'] * (2 * hours + 1)
+        timestamps = [START + hour * HOUR for hour in range(hours)] * 2 + [far_future]
+        # Two stations report PM10 every hour; nothing else is reported.
+        readings = np.full((2 * hours + 1, 6), np.nan)
+        readings[:hours, 4], readings[hours:, 4] = 90.0, 110.0
+
+    forecaster = Forecaster()
+    update = forecaster.update
+    calls = []
+    monkeypatch.setattr(forecaster, 'update', lambda *args: calls.append(args[:3]) or update(*args))
+    forecaster.record_batch(Batch())
+    # One call for the 30 consecutive hours and one for the far-off hour.
+    assert calls == [('Delhi', 'pm10', START), ('Delhi', 'pm10', far_future)]
+    assert forecaster.keys == [('Delhi', 'pm10')]
+    assert forecaster.samples[0] == hours - 24
+    assert forecaster.last_hour[0] == far_future
+    assert forecaster.history[0, -1] * forecaster.scales[0] == pytest.approx(110.0)
+    assert np.isnan(forecaster.history[0, :-1]).all()
+
+
+def test_forecast_is_nan_for_untrained_series_and_cache_tracks_updates():
+    forecaster = _trained(days=3)
+    first = forecaster.forecast([('Delhi', 'PM10'), ('Goa', 'PM10')], hours=6)
+    assert not np.isnan(first.values[0]).any() and np.isnan(first.values[1]).all()
+    forecaster.update('Delhi', 'PM10', START + 72 * HOUR, [400.0])
+    second = forecaster.forecast([('Delhi', 'PM10')], hours=6)
+    assert second.start[0] == first.start[0] + np.timedelta64(HOUR, 's')
+    assert second.values[0, 0] != first.values[0, 1]
+
+
+def test_from_archive_trains_each_recorded_column(tmp_path):
+    ArchiveWriter(str(tmp_path)).append(START, {
+        ('Delhi', 'PM10'): _daily_cycle(150.0, 5),
+        ('Delhi', 'PM2.5'): _daily_cycle(90.0, 5),
+    })
+    forecaster = Forecaster.from_archive(ReadingsArchive(str(tmp_path)))
+    # PM2.5 is not a predictor pollutant, so only PM10 is trained by default.
+    assert forecaster.ready() == [('Delhi', 'pm10')]
+    assert forecaster.samples.tolist() == [24 * 4]
+
+
+def test_forecast_on_an_empty_forecaster_is_nan():
+    forecast = Forecaster().forecast([('Delhi', 'PM2.5')], hours=3)
+    assert forecast.keys == [('Delhi', 'pm2_5')]
+    assert forecast.values.shape == (1, 3) and np.isnan(forecast.values).all()
+    assert np.isnat(forecast.start[0])
+    assert Forecaster().forecast().values.shape == (0, 24)
+
+
+def test_update_from_archive_fits_only_appended_hours(tmp_path):
+    writer = ArchiveWriter(str(tmp_path))
+    writer.append(START, {('Delhi', 'PM10'): _daily_cycle(150.0, 3)})
+    forecaster = Forecaster()
+    assert forecaster.update_from_archive(ReadingsArchive(str(tmp_path))) == 24 * 2
+    writer.append(START + 24 * 3 * HOUR, {('Delhi', 'PM10'): _daily_cycle(150.0, 1)})
+    archive = ReadingsArchive(str(tmp_path))
+    assert forecaster.update_from_archive(archive) == 24
+    assert forecaster.update_from_archive(archive) == 0
+    assert forecaster.last_hour[0] == archive.end - HOUR
+    assert forecaster.samples.tolist() == [24 * 3]
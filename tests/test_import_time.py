@@ -0,0 +1,56 @@
+"""Cold-start import budgets for the Flask API and the Streamlit app.
+
+Runs ``python -X importtime`` in a fresh interpreter and fails if a module
+pulls in libraries it should only load on demand, or takes longer than the
+budget to import.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import time budget in microseconds. Generous enough for a slow CI
+# box; flask + numpy alone take roughly 150 ms on a laptop.
+IMPORT_BUDGET_US = int(os.getenv("IMPORT_BUDGET_US", 1_500_000))
+
+# Libraries each entry point must not import at startup: the API never needs
+# the dashboard stack, and the dashboard loads charts/pandas only when drawing.
+FORBIDDEN_MODULES = {
+    "src.api.routes": ("streamlit", "plotly", "pandas", "sklearn"),
+    "src.app": ("plotly.express", "pandas", "sklearn"),
+}
+REQUIRED_PACKAGES = {
+    "src.api.routes": ("flask",),
+    "src.app": ("streamlit", "plotly"),
+}
+
+
+def _importtime(module):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            timings[name.strip()] = int(cumulative)
+    return timings
+
+
+@pytest.mark.parametrize("module", sorted(FORBIDDEN_MODULES))
+def test_cold_start_within_budget(module):
+    for package in REQUIRED_PACKAGES[module]:
+        pytest.importorskip(package)
+    timings = _importtime(module)
+    leaked = [name for name in FORBIDDEN_MODULES[module] if name in timings]
+    assert not leaked, f"{module} imports {', '.join(leaked)} at startup"
+    assert timings[module] <= IMPORT_BUDGET_US, f"{module} took {timings[module] / 1000:.0f} ms to import"
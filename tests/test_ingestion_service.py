@@ -0,0 +1,133 @@
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip('aiohttp')
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.services.ingestion_service import IngestionService, parse_readings
+from src.utils.constants import INDIAN_CITIES, predict_aqi
+
+READINGS = {'NO₂': 30, 'SO2': 10, 'CO': 1.2, 'O3': 40, 'PM10': 120, 'NH3': 15, 'PM2.5': 60}
+ROW = [30.0, 10.0, 1.2, 40.0, 120.0, 15.0]
+
+
+class StubFeed:
+    """Upstream feed stand-in that records how it was called."""
+
+    def __init__(self, delay=0.0, failures=None):
+        self.delay = delay
+        self.failures = dict(failures or {})
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = []
+        self.peers = set()
+
+    async def handle(self, request):
+        city = request.query['city']
+        self.requests.append((city, request.headers.get('If-None-Match'), request.headers.get('If-Modified-Since')))
+        self.peers.add(request.transport.get_extra_info('peername'))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        if self.failures.get(city):
+            self.failures[city] -= 1
+            return web.Response(status=503)
+        etag = f'"{city}-1"'
+        if request.headers.get('If-None-Match') == etag:
+            return web.Response(status=304)
+        return web.json_response({'timestamp': '2024-01-01T00:00:00Z', 'readings': READINGS},
+                                 headers={'ETag': etag, 'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT'})
+
+
+async def with_feed(feed, scenario):
+    app = web.Application()
+    app.router.add_get('/readings', feed.handle)
+    server = TestServer(app)
+    await server.start_server()
+    try:
+        return await scenario(str(server.make_url('')))
+    finally:
+        await server.close()
+
+
+def test_parse_readings_resolves_names_and_ignores_others():
+    rows = parse_readings('Delhi', [{'timestamp': 't', 'readings': READINGS},
+                                    {'city': 'Delhi-2', 'readings': {'PM10': 'bad', 'pm10': -1}}])
+    assert rows[0] == ('Delhi', 't', ROW)
+    assert rows[1][:2] == ('Delhi-2', None) and np.isnan(rows[1][2]).all()
+    with pytest.raises(ValueError):
+        parse_readings('Delhi', {'no': 'readings'})
+
+
+def test_poll_fetches_concurrently_and_scores_in_batches():
+    feed = StubFeed(delay=0.05)
+    batches = []
+
+    async def scenario(url):
+        async with IngestionService(batches.append, base_url=url, max_concurrency=10, batch_size=10) as service:
+            started = time.monotonic()
+            stats = await service.poll_once()
+            return stats, time.monotonic() - started
+
+    stats, elapsed = asyncio.run(with_feed(feed, scenario))
+    assert stats.fetched == len(INDIAN_CITIES) and stats.failed == 0
+    assert stats.scored == len(INDIAN_CITIES)
+    assert feed.max_in_flight == 10
+    # 25 cities at 50 ms each would take over a second one after another.
+    assert elapsed < 0.6
+    # Keep-alive: no more connections than concurrent requests.
+    assert len(feed.peers) <= 10
+    assert [len(batch.cities) for batch in batches] == [10, 10, 5]
+    assert sorted(city for batch in batches for city in batch.cities) == sorted(INDIAN_CITIES)
+    batch = batches[0]
+    assert batch.readings.shape == (10, 6)
+    assert batch.aqi.tolist() == [predict_aqi(ROW)] * 10
+    assert batch.categories[0] == 'Moderate'
+
+
+def test_second_poll_is_conditional():
+    feed = StubFeed()
+    batches = []
+
+    async def scenario(url):
+        async with IngestionService(batches.append, base_url=url, cities=['Delhi', 'Pune']) as service:
+            return await service.poll_once(), await service.poll_once()
+
+    first, second = asyncio.run(with_feed(feed, scenario))
+    assert first.fetched == 2 and second.not_modified == 2 and second.scored == 0
+    assert len(batches) == 1
+    assert sorted(feed.requests[2:]) == [('Delhi', '"Delhi-1"', 'Mon, 01 Jan 2024 00:00:00 GMT'),
+                                         ('Pune', '"Pune-1"', 'Mon, 01 Jan 2024 00:00:00 GMT')]
+
+
+def test_retries_transient_errors_then_gives_up():
+    feed = StubFeed(failures={'Delhi': 2, 'Pune': 10})
+    scored = []
+
+    async def sink(batch):
+        scored.extend(batch.cities)
+
+    async def scenario(url):
+        async with IngestionService(sink, base_url=url, cities=['Delhi', 'Pune', 'Patna'],
+                                    max_retries=3, backoff_base=0.001) as service:
+            return await service.poll_once()
+
+    stats = asyncio.run(with_feed(feed, scenario))
+    assert stats.fetched == 2 and stats.failed == 1
+    assert sorted(scored) == ['Delhi', 'Patna']
+    attempts = [city for city, _, _ in feed.requests]
+    assert attempts.count('Delhi') == 3 and attempts.count('Pune') == 4
+
+
+def test_backoff_is_jittered_and_capped():
+    service = IngestionService(print, base_url='http://unused', backoff_base=1.0, backoff_cap=5.0)
+    delays = [service.backoff(attempt) for attempt in range(10) for _ in range(20)]
+    assert all(0.0 <= delay <= 5.0 for delay in delays)
+    assert len(set(delays)) > 1
@@ -0,0 +1,137 @@
+import re
+
+import pytest
+from flask import Flask
+
+from src.api import routes
+from src.api.metrics import Histogram, MetricsRegistry, init_metrics, span
+from src.api.response_cache import ResponseCache
+from src.api.routes import api_bp
+from src.config import Config
+from src.server import create_app
+from src.utils.cache import TTLCache
+
+
+@pytest.fixture(autouse=True)
+def fresh_response_cache(monkeypatch):
+    # Cached responses skip the prediction and advisory spans.
+    monkeypatch.setattr(routes, 'response_cache', ResponseCache(TTLCache(), ttl=60))
+
+
+def make_app(sample_rate=1.0):
+    app = Flask(__name__)
+    app.register_blueprint(api_bp)
+    registry = init_metrics(app, sample_rate=sample_rate)
+    return app, registry
+
+
+def post(client, path, **kwargs):
+    # Closing the response, as a WSGI server does, ends the in-flight request.
+    response = client.post(path, **kwargs)
+    response.close()
+    return response
+
+
+def sample_value(text, line_prefix):
+    for line in text.splitlines():
+        if line.startswith(line_prefix + ' '):
+            return float(line.rsplit(' ', 1)[1])
+    raise AssertionError(f"{line_prefix} not found")
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram((1, 10))
+    for value in (0.5, 1, 5, 50):
+        histogram.observe(value)
+    bounds, total, count = histogram.cumulative()
+    assert bounds == [(1, 2), (10, 3), (float('inf'), 4)]
+    assert total == 56.5 and count == 4
+
+
+def test_requests_latency_and_spans_are_exported():
+    app, registry = make_app()
+    client = app.test_client()
+    post(client, '/predict-aqi', json={'parameters': [40, 20, 0.5, 30, 60, 10]})
+    post(client, '/advisory', json={'aqi': 120, 'group': 'Children'})
+    post(client, '/advisory', json={'aqi': 'bad'})
+    post(client, '/advisory/batch', json=[{'aqi': 10}, {'aqi': 300}])
+
+    response = client.get('/metrics')
+    response.close()
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    text = response.get_data(as_text=True)
+
+    assert sample_value(text, 'http_requests_total{method="POST",route="/advisory",status="200"}') == 1
+    assert sample_value(text, 'http_request_errors_total{method="POST",route="/advisory",status="400"}') == 1
+    assert sample_value(text, 'http_request_duration_seconds_count{method="POST",route="/advisory"}') == 2
+    assert sample_value(text, 'http_request_duration_seconds_bucket{method="POST",route="/predict-aqi",le="+Inf"}') == 1
+    assert sample_value(text, 'http_response_size_bytes_count{method="POST",route="/predict-aqi"}') == 1
+    assert sample_value(text, 'app_span_duration_seconds_count{span="validation"}') == 4
+    assert sample_value(text, 'app_span_duration_seconds_count{span="prediction"}') == 1
+    assert sample_value(text, 'app_span_duration_seconds_count{span="advisory"}') == 2
+    # /metrics itself is in flight while it renders.
+    assert sample_value(text, 'http_requests_in_flight') == 1
+    assert registry.in_flight == 0
+    assert re.search(r'^# TYPE http_request_duration_seconds histogram$', text, re.M)
+
+
+def test_unmatched_paths_share_one_label():
+    app, _ = make_app()
+    client = app.test_client()
+    client.get('/nope/1')
+    client.get('/nope/2')
+    text = client.get('/metrics').get_data(as_text=True)
+    assert sample_value(text, 'http_requests_total{method="GET",route="<unmatched>",status="404"}') == 2
+
+
+def test_sampling_keeps_counts_exact_and_skips_histograms():
+    app, registry = make_app(sample_rate=0.0)
+    client = app.test_client()
+    for _ in range(5):
+        post(client, '/predict-aqi', json={'parameters': [1, 2, 3]})
+    assert registry.requests[('POST', '/predict-aqi', '200')] == 5
+    assert registry.latency == {} and registry.spans == {}
+    text = client.get('/metrics').get_data(as_text=True)
+    assert sample_value(text, 'metrics_sample_rate') == 0.0
+
+
+def test_create_app_applies_the_configured_sample_rate(monkeypatch):
+    monkeypatch.setattr(Config, 'METRICS_SAMPLE_RATE', 0.25)
+    app = create_app()
+    assert app.extensions['metrics'].sample_rate == 0.25
+    text = app.test_client().get('/metrics').get_data(as_text=True)
+    assert sample_value(text, 'metrics_sample_rate') == 0.25
+
+
+def test_unhandled_exception_is_counted_as_500():
+    app, registry = make_app()
+
+    @app.route('/boom')
+    def boom():
+        raise RuntimeError('boom')
+
+    response = app.test_client().get('/boom')
+    response.close()
+    assert response.status_code == 500
+    assert registry.errors[('GET', '/boom', '500')] == 1
+    assert registry.in_flight == 0
+
+
+def test_streamed_batch_stays_in_flight_until_closed():
+    app, registry = make_app()
+    response = app.test_client().post('/predict-aqi/batch', json=[{'parameters': [1]}] * 3,
+                                      headers={'Accept': 'application/x-ndjson'})
+    assert registry.in_flight == 1
+    assert len(response.get_data(as_text=True).splitlines()) == 3
+    response.close()
+    assert registry.in_flight == 0
+    assert registry.spans['prediction'].count == 1
+    assert ('POST', '/predict-aqi/batch') not in registry.response_size
+
+
+def test_span_outside_a_request_is_a_noop():
+    with span('validation'):
+        pass
+    with pytest.raises(ValueError):
+        MetricsRegistry(sample_rate=2)
@@ -9,6 +9,7 @@ def test_get_aqi_category_and_advice():
     assert get_aqi_category_and_advice(400) == ("Hazardous", "Health warnings of emergency conditions. The entire population is more likely to be affected.")
     assert get_aqi_category_and_advice(600) == ("Unknown", "AQI value out of range. Please check the input.")
 
+
 def test_get_custom_advisory():
     from src.models.advisory_model import get_custom_advisory
 
@@ -31,4 +32,84 @@ def test_get_custom_advisory():
         "aqi_category": "Moderate",
         "advice": "Air quality is acceptable; however, there may be a risk for some people, particularly those who are unusually sensitive to air pollution.",
         "group": "Pregnant women"
-    }
\ No newline at end of file
+    }
+
+
+def test_get_aqi_categories_and_advice_bulk():
+    from src.models.advisory_model import get_aqi_categories_and_advice, get_aqi_category_and_advice
+
+    values = [0, 50.5, 100.3, 150.9, 250, 500, 600, -3]
+    categories, advice = get_aqi_categories_and_advice(values)
+    assert list(zip(categories, advice)) == [get_aqi_category_and_advice(v) for v in values]
+    assert categories[1] == "Moderate"
+    assert categories[6] == categories[7] == "Unknown"
+
+
+def test_custom_advisory_is_shared_and_counted():
+    import copy
+    import json
+    import pickle
+
+    import pytest
+
+    from src.models.advisory_model import ADVISORY_CACHE_STATS, ADVISORY_TABLE, get_custom_advisory
+    from src.services.advisory_service import generate_health_advisory
+
+    ADVISORY_CACHE_STATS.reset()
+    first = get_custom_advisory(120, "Children")
+    assert get_custom_advisory(149.5, "Children") is first
+    assert generate_health_advisory(130, "Children") is first
+    assert ADVISORY_TABLE[("Unhealthy for Sensitive Groups", "Children")] is first
+    with pytest.raises(TypeError):
+        first["advice"] = "changed"
+    assert json.loads(json.dumps(first)) == first
+    restored = pickle.loads(pickle.dumps(first))
+    assert restored == first and type(restored) is type(first)
+    assert copy.deepcopy(first) == first and copy.copy(first) == first
+
+    athletes = get_custom_advisory(250, "Athletes")
+    assert athletes["group"] == "Athletes" and "Athletes" not in athletes["advice"]
+    assert (ADVISORY_CACHE_STATS.hits, ADVISORY_CACHE_STATS.misses) == (3, 1)
+
+
+def test_aqi_model_accepts_pollutant_aliases():
+    import pytest
+
+    from src.models.aqi_model import AQIModel
+
+    model = AQIModel({'pm10': 0.5, 'pm2_5': 0.7, 'no2': 0.3, 'o3': 0.2})
+    expected = model.predict_aqi({'pm10': 100, 'pm2_5': 50, 'no2': 30, 'o3': 40})
+    assert model.predict_aqi({'PM₁₀': 100, 'PM2.5': 50, 'NO₂': 30, 'O3': 40}) == expected
+    with pytest.raises(ValueError):
+        model.predict_aqi({'PM₁₀': 100})
+
+
+def test_compiled_aqi_model_matches_aqi_model():
+    import numpy as np
+    import pytest
+
+    from src.models.aqi_model import AQIModel
+
+    coefficients = {'pm10': 0.5, 'pm2_5': 0.7, 'no2': 0.3, 'o3': 0.2}
+    model = AQIModel(coefficients)
+    compiled = model.compile()
+    assert not hasattr(compiled, '__dict__')
+    records = [{'pm10': 100, 'pm2_5': 50, 'no2': 30, 'o3': 40}, {'pm10': 900, 'pm2_5': 300, 'no2': 80, 'o3': 60}, {'pm10': 0, 'pm2_5': 0, 'no2': 0, 'o3': 0}]
+    expected = [model.predict_aqi(r) for r in records]
+    assert compiled.predict_aqi(records[0]) == expected[0]
+    assert compiled.predict_many(records).tolist() == pytest.approx(expected)
+    matrix = np.array([[r[c] for c in compiled.columns] for r in records])
+    assert compiled.predict_many(matrix).tolist() == pytest.approx(expected)
+    assert compiled.predict_aqi({'PM₁₀': 100, 'PM2.5': 50, 'NO₂': 30, 'O3': 40}) == expected[0]
+    with pytest.raises(ValueError):
+        compiled.predict_many([{'pm10': 1}])
+    with pytest.raises(ValueError):
+        compiled.predict_many(np.ones((3, 5)))
+    with pytest.raises(ValueError):
+        compiled.predict_many(np.ones(4))
+    assert compiled.predict_many([]).shape == (0,)
+    import pandas as pd
+    frame = pd.DataFrame(records).rename(columns={'pm2_5': 'PM2.5', 'no2': 'NO₂'})
+    assert compiled.predict_many(frame).tolist() == pytest.approx(expected)
+    with pytest.raises(ValueError):
+        compiled.predict_many(frame.drop(columns=['o3']))
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from src.models.naqi_model import NAQI_BREAKPOINTS, NAQIEngine, naqi_category
+
+
+def _brute_force_sub_index(history, pollutant, hour):
+    window, concentrations = NAQI_BREAKPOINTS[pollutant]
+    values = [history[h][pollutant] for h in range(hour - window + 1, hour + 1) if h in history and pollutant in history[h]]
+    if len(values) < np.ceil(window * 2 / 3):
+        return None
+    return float(np.interp(np.mean(values), concentrations, [0, 50, 100, 200, 300, 400, 500]))
+
+
+def test_naqi_category_band_edges():
+    assert [naqi_category(v) for v in (0, 50, 50.5, 100, 200, 301, 400, 401, 500)] == [
+        'Good', 'Good', 'Satisfactory', 'Satisfactory', 'Moderate', 'Very Poor', 'Very Poor', 'Severe', 'Severe'
+    ]
+
+
+def test_engine_matches_full_rescan_with_gaps():
+    rng = np.random.default_rng(3)
+    engine = NAQIEngine()
+    history = {}
+    start = 1_700_000_000 // 3600
+    for hour in range(start, start + 24 * 10):
+        if rng.random() < 0.1:
+            continue  # missing hour
+        readings = {'PM₂.₅': rng.uniform(10, 300), 'PM10': rng.uniform(20, 500), 'NO2': rng.uniform(5, 200), 'CO': rng.uniform(0.1, 20), 'O₃': rng.uniform(5, 300)}
+        if rng.random() < 0.2:
+            del readings['NO2']
+        history[hour] = {'pm2_5': readings['PM₂.₅'], 'pm10': readings['PM10'], 'co': readings['CO'], 'o3': readings['O₃']}
+        if 'NO2' in readings:
+            history[hour]['no2'] = readings['NO2']
+        result = engine.update('Delhi', hour * 3600, readings)
+        expected = {p: _brute_force_sub_index(history, p, hour) for p in ('pm2_5', 'pm10', 'no2', 'co', 'o3')}
+        expected = {p: v for p, v in expected.items() if v is not None}
+        assert result.sub_indices == pytest.approx(expected)
+        if result.aqi is not None:
+            assert result.aqi == round(max(expected.values()))
+            assert result.dominant == max(expected, key=expected.get)
+
+
+def test_engine_requires_coverage_and_time_order():
+    engine = NAQIEngine()
+    for hour in range(15):
+        result = engine.update('Pune', hour * 3600, {'PM10': 80, 'NO2': 30, 'SO2': 20})
+        assert result.aqi is None
+    result = engine.update('Pune', 15 * 3600, {'PM10': 80, 'NO2': 30, 'SO2': 20})
+    assert result.aqi == 80 and result.category == 'Satisfactory' and result.dominant == 'pm10'
+    with pytest.raises(ValueError):
+        engine.update('Pune', 3 * 3600, {'PM10': 80})
+    engine.update('Pune', 100 * 3600, {'PM10': 80})
+    assert engine.sub_indices('Pune') == {}
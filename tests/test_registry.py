@@ -0,0 +1,108 @@
+import os
+
+import numpy as np
+import pytest
+
+from src.models.aqi_model import AQIModel, CompiledAQIModel
+from src.models.registry import CURRENT_FILE, ModelRegistry
+from src.storage.archive import to_hour
+
+COEFFICIENTS = {'pm10': 0.5, 'pm2_5': 0.7, 'no2': 0.3, 'o3': 0.2}
+PARAMETERS = {'PM10': 100, 'PM2.5': 50, 'NO₂': 30, 'O3': 40}
+START = to_hour('2024-03-01T00:00:00')
+
+
+def test_linear_models_load_lazily_as_read_only_memory_maps(tmp_path):
+    publisher = ModelRegistry(str(tmp_path))
+    version = publisher.publish({'aqi/Delhi': AQIModel(COEFFICIENTS),
+                                 'aqi/Pune': AQIModel({**COEFFICIENTS, 'pm10': 0.4}).compile()})
+    assert version == 'v0001'
+
+    registry = ModelRegistry(str(tmp_path))
+    assert registry.names() == ['aqi/Delhi', 'aqi/Pune'] and registry._active.loaded == {}
+    delhi = registry.get('aqi/Delhi')
+    assert list(registry._active.loaded) == ['aqi/Delhi']
+    assert isinstance(delhi, CompiledAQIModel) and isinstance(delhi.weights, np.memmap)
+    assert not delhi.weights.flags.writeable
+    assert delhi.predict_aqi(PARAMETERS) == AQIModel(COEFFICIENTS).predict_aqi(PARAMETERS)
+    assert registry.get('aqi/Delhi') is delhi
+    assert registry.get('aqi/Goa', None) is None
+    with pytest.raises(KeyError):
+        registry.get('aqi/Goa')
+
+
+def test_publishing_switches_running_readers_and_activate_rolls_back(tmp_path):
+    publisher = ModelRegistry(str(tmp_path))
+    reader = ModelRegistry(str(tmp_path))
+    assert reader.current_version() is None and reader.get('aqi/Delhi', None) is None
+
+    publisher.publish({'aqi/Delhi': AQIModel(COEFFICIENTS)})
+    first = reader.get('aqi/Delhi')
+    publisher.publish({'aqi/Delhi': AQIModel({key: 2 * value for key, value in COEFFICIENTS.items()})})
+    assert reader.current_version() == 'v0002'
+    second = reader.get('aqi/Delhi')
+    assert second.predict_aqi(PARAMETERS) == 2 * first.predict_aqi(PARAMETERS)
+    # Models handed out before the switch keep working off the old version's files.
+    assert first.predict_aqi(PARAMETERS) == AQIModel(COEFFICIENTS).predict_aqi(PARAMETERS)
+
+    publisher.activate('v0001')
+    assert reader.get('aqi/Delhi').predict_aqi(PARAMETERS) == first.predict_aqi(PARAMETERS)
+    assert publisher.versions() == ['v0001', 'v0002']
+    with pytest.raises(KeyError):
+        publisher.activate('v0009')
+    staged = publisher.publish({'aqi/Delhi': AQIModel(COEFFICIENTS)}, activate=False)
+    assert staged == 'v0003' and reader.current_version() == 'v0001'
+    assert open(os.path.join(str(tmp_path), CURRENT_FILE)).read().strip() == 'v0001'
+
+
+def test_publish_clears_staging_left_by_a_crashed_publish(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    os.makedirs(os.path.join(str(tmp_path), 'versions', '.v0001.tmp', '0'))
+    assert registry.publish({'aqi/Delhi': AQIModel(COEFFICIENTS)}) == 'v0001'
+    assert os.listdir(os.path.join(str(tmp_path), 'versions')) == ['v0001']
+
+
+def test_get_never_pairs_a_new_manifest_with_old_models(tmp_path):
+    publisher = ModelRegistry(str(tmp_path))
+    publisher.publish({'aqi/Delhi': AQIModel(COEFFICIENTS)})
+    reader = ModelRegistry(str(tmp_path))
+    first = reader.get('aqi/Delhi')
+    before = reader._active
+    publisher.publish({'aqi/Delhi': AQIModel({**COEFFICIENTS, 'pm10': 0.1}), 'aqi/Pune': AQIModel(COEFFICIENTS)})
+    # The switch replaces version, manifest and loaded models together.
+    assert reader.get('aqi/Pune') is not None and reader.get('aqi/Delhi') is not first
+    assert before.version == 'v0001' and list(before.loaded) == ['aqi/Delhi'] and before.loaded['aqi/Delhi'] is first
+
+
+def test_forecaster_round_trip_loads_estimators_per_city_on_update(tmp_path):
+    pytest.importorskip('sklearn')
+    from src.models.forecaster import Forecaster
+
+    hours = np.arange(24 * 5)
+    forecaster = Forecaster()
+    for city, base in (('Delhi', 150.0), ('Pune', 60.0)):
+        forecaster.update(city, 'PM10', START, base * (1 + 0.3 * np.sin(2 * np.pi * (hours % 24) / 24)))
+    expected = forecaster.forecast()
+    ModelRegistry(str(tmp_path)).publish({'forecaster': forecaster})
+
+    restored = ModelRegistry(str(tmp_path)).get('forecaster')
+    assert isinstance(restored.history, np.memmap)
+    forecast = restored.forecast()
+    assert forecast.keys == expected.keys
+    np.testing.assert_allclose(forecast.values, expected.values)
+    assert restored.models == [None, None]
+
+    # Updating Delhi loads only Delhi's estimator and leaves the mapped files untouched.
+    assert restored.update('Delhi', 'PM10', START + hours.size * 3600, [150.0]) == 1
+    assert restored.models[0] is not None and restored.models[1] is None
+    assert restored.history.flags.writeable
+    again = ModelRegistry(str(tmp_path)).get('forecaster')
+    np.testing.assert_allclose(again.forecast().values, expected.values)
+
+
+def test_other_estimators_are_saved_with_joblib(tmp_path):
+    sklearn = pytest.importorskip('sklearn.linear_model')
+    model = sklearn.LinearRegression().fit(np.arange(20.0).reshape(10, 2), np.arange(10.0))
+    ModelRegistry(str(tmp_path)).publish({'linear-regression': model})
+    loaded = ModelRegistry(str(tmp_path)).get('linear-regression')
+    np.testing.assert_allclose(loaded.predict([[2.0, 3.0]]), model.predict([[2.0, 3.0]]))
@@ -0,0 +1,118 @@
+import logging
+import sys
+
+import pytest
+from flask import Flask
+
+from src.api import routes
+from src.api.response_cache import RedisCacheBackend, ResponseCache, cache_key
+from src.config import Config
+from src.utils.cache import TTLCache
+from src.utils.constants import predict_aqi
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ResponseCache(TTLCache(max_entries=8), ttl=60)
+    cache.stats.reset()
+    monkeypatch.setattr(routes, 'response_cache', cache)
+    return cache
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.register_blueprint(routes.api_bp)
+    return app.test_client()
+
+
+def test_repeated_requests_are_served_from_cache(cache, client):
+    first = client.post('/predict-aqi', json={'parameters': [40, 20, 0.5, 30, 60, 10]})
+    # Same readings, different spelling: list with floats and a pollutant-keyed object.
+    second = client.post('/predict-aqi', json={'parameters': [40.0, 20.0, 0.5, 30.0, 60.0, 10.0]})
+    third = client.post('/predict-aqi', json={'parameters': {'NH3': 10, 'PM10': 60, 'O3': 30, 'CO': 0.5,
+                                                             'SO2': 20, 'NO2': 40}})
+    assert first.json == {'predicted_aqi': predict_aqi([40, 20, 0.5, 30, 60, 10])}
+    assert first.data == second.data == third.data
+    assert cache.stats.misses == 1 and cache.stats.hits == 2
+
+    advisory = client.post('/advisory', json={'aqi': 120, 'group': 'Children'})
+    again = client.post('/advisory', json={'group': 'Children', 'aqi': 120.0})
+    assert advisory.json['aqi_category'] == 'Unhealthy for Sensitive Groups'
+    assert advisory.data == again.data
+    assert cache.stats.misses == 2 and cache.stats.hits == 3
+
+
+def test_matching_if_none_match_returns_304(cache, client):
+    first = client.post('/advisory', json={'aqi': 42})
+    etag = first.headers['ETag']
+    assert etag
+    unchanged = client.post('/advisory', json={'aqi': 42}, headers={'If-None-Match': etag})
+    assert unchanged.status_code == 304 and unchanged.data == b''
+    assert unchanged.headers['ETag'] == etag
+    changed = client.post('/advisory', json={'aqi': 420}, headers={'If-None-Match': etag})
+    assert changed.status_code == 200 and changed.headers['ETag'] != etag
+
+
+def test_invalid_requests_are_not_cached(cache, client):
+    assert client.post('/advisory', json={'aqi': 'bad'}).status_code == 400
+    assert len(cache.backend) == 0
+
+
+def test_failing_backend_degrades_to_a_miss(monkeypatch, client):
+    class Broken:
+        def get(self, key):
+            raise ConnectionError('down')
+
+        def set(self, key, value, ttl):
+            raise ConnectionError('down')
+
+    monkeypatch.setattr(routes, 'response_cache', ResponseCache(Broken(), ttl=60))
+    response = client.post('/advisory', json={'aqi': 42})
+    assert response.status_code == 200 and response.json['aqi_category'] == 'Good'
+
+
+def test_workers_share_entries_through_the_backend(monkeypatch, client):
+    shared = TTLCache()
+    monkeypatch.setattr(routes, 'response_cache', ResponseCache(shared, ttl=60))
+    first = client.post('/advisory', json={'aqi': 250})
+    other_worker = ResponseCache(shared, ttl=60)
+    monkeypatch.setattr(routes, 'response_cache', other_worker)
+    hits = other_worker.stats.hits
+    assert client.post('/advisory', json={'aqi': 250}).data == first.data
+    assert other_worker.stats.hits == hits + 1
+
+
+def test_ttl_cache_expires_and_evicts_least_recently_used():
+    now = [0.0]
+    store = TTLCache(max_entries=2, clock=lambda: now[0])
+    store.set('a', b'1', ttl=10)
+    store.set('b', b'2', ttl=10)
+    assert store.get('a') == b'1'
+    store.set('c', b'3', ttl=10)
+    assert store.get('b') is None and store.get('a') == b'1'
+    now[0] = 10.0
+    assert store.get('a') is None and len(store) == 1
+
+
+def test_redis_backend_prefixes_keys_and_sets_ttl():
+    class FakeRedis(dict):
+        def set(self, key, value, px):
+            self[key] = (value, px)
+
+    client = FakeRedis()
+    backend = RedisCacheBackend(client)
+    backend.set('k', b'v', 1.5)
+    assert client == {'aqi:response:k': (b'v', 1500)}
+    assert cache_key('advisory', [1.0, None]) == cache_key('advisory', [1.0, None])
+    assert cache_key('advisory', [1.0, None]) != cache_key('predict-aqi', [1.0, None])
+
+
+def test_redis_url_without_redis_falls_back_on_first_use(monkeypatch, caplog):
+    monkeypatch.setattr(Config, 'RESPONSE_CACHE_URL', 'redis://localhost:6379/0')
+    monkeypatch.setitem(sys.modules, 'redis', None)
+    cache = ResponseCache(ttl=60)
+    with caplog.at_level(logging.WARNING, logger='src.api.response_cache'):
+        assert isinstance(cache.backend, TTLCache)
+    assert 'requires redis' in caplog.text
+    assert cache.backend is cache.backend
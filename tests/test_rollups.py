@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+
+from src.storage.archive import ArchiveWriter, ReadingsArchive, to_hour
+from src.storage.rollups import DAY_SECONDS, AQIRollups
+from src.utils.constants import AQI_CATEGORIES, PREDICTOR_IDS, predict_aqi
+
+START = to_hour('2024-03-01T00:00:00')
+HOUR = 3600
+
+
+def _totals(rollups, city, grain):
+    series = rollups.series(city, grain)
+    return series.count.tolist(), series.mean.round(3).tolist(), series.minimum.tolist(), series.maximum.tolist()
+
+
+def test_readings_fold_into_every_grain():
+    rollups = AQIRollups()
+    # Two days of hourly readings spanning the end of February.
+    first = to_hour('2024-02-29T00:00:00')
+    values = np.arange(48, dtype=float) * 5
+    rollups.add_many(['Delhi'] * 48, [first + hour * HOUR for hour in range(48)], values)
+
+    hours = rollups.series('Delhi', 'hour')
+    assert hours.count.tolist() == [1] * 48 and hours.mean.tolist() == values.tolist()
+    assert _totals(rollups, 'Delhi', 'day') == ([24, 24], [57.5, 177.5], [0.0, 120.0], [115.0, 235.0])
+    months = rollups.series('Delhi', 'month')
+    assert [str(start) for start in months.starts] == ['2024-02-01T00:00:00', '2024-03-01T00:00:00']
+    assert months.count.tolist() == [24, 24]
+    # 0-50 Good, 51-100 Moderate, ... each 5-point step is one hour.
+    assert months.categories[0].tolist()[:3] == [11, 10, 3]
+    assert months.categories.sum() == 48
+
+
+def test_late_correction_rebuilds_only_its_buckets():
+    rollups = AQIRollups()
+    rollups.add_many(['Delhi'] * 72, [START + hour * HOUR for hour in range(72)], [100.0] * 72)
+    before = rollups.series('Delhi', 'day')
+    # A corrected reading for the middle day lowers its minimum, which a running update can't undo.
+    rollups.add('Delhi', START + 30 * HOUR, 20.0)
+    after = rollups.series('Delhi', 'day')
+    assert after.count.tolist() == [24, 24, 24]
+    assert after.minimum.tolist() == [100.0, 20.0, 100.0]
+    assert after.mean[1] == pytest.approx((23 * 100 + 20) / 24)
+    assert after.mean[[0, 2]].tolist() == before.mean[[0, 2]].tolist()
+    assert rollups.series('Delhi', 'month').minimum.tolist() == [20.0]
+    # Restoring the value restores the original rollups.
+    rollups.add('Delhi', START + 30 * HOUR, 100.0)
+    assert _totals(rollups, 'Delhi', 'month') == ([72], [100.0], [100.0], [100.0])
+
+
+def test_retention_prunes_hours_and_drops_too_late_readings():
+    rollups = AQIRollups(retention=2 * DAY_SECONDS)
+    rollups.add_many(['Pune'] * 24 * 5, [START + hour * HOUR for hour in range(24 * 5)], [40.0] * 24 * 5)
+    assert rollups.series('Pune', 'hour').count.size <= 3 * 24
+    assert rollups.series('Pune', 'day').count.tolist() == [24] * 5
+    rollups.add('Pune', START, 400.0)
+    assert rollups.dropped == 1
+    assert rollups.series('Pune', 'month').maximum.tolist() == [40.0]
+    rollups.add('Pune', START, float('nan'))
+    assert rollups.dropped == 1
+
+
+def test_summarize_combines_buckets_per_city():
+    rollups = AQIRollups()
+    for day in range(40):
+        rollups.add('Delhi', START + day * DAY_SECONDS, 200.0 + day)
+        rollups.add('Pune', START + day * DAY_SECONDS, 30.0)
+    summary = rollups.summarize(start=rollups.end - 30 * DAY_SECONDS, cities=['Delhi', 'Pune', 'Goa'])
+    assert summary.count.tolist() == [30, 30, 0]
+    assert summary.mean[:2].tolist() == [224.5, 30.0] and np.isnan(summary.mean[2])
+    assert summary.maximum[0] == 239.0 and np.isnan(summary.minimum[2])
+    assert summary.category_hours.shape == (3, len(AQI_CATEGORIES))
+    assert summary.category_hours[1, 0] == 30
+    with pytest.raises(ValueError):
+        rollups.series('Delhi', 'week')
+
+
+def test_from_archive_scores_hours_with_the_predictor(tmp_path):
+    hours = 48
+    ArchiveWriter(str(tmp_path)).append(START, {
+        ('Delhi', PREDICTOR_IDS[0]): np.full(hours, 80.0),
+        ('Delhi', PREDICTOR_IDS[4]): np.r_[np.full(hours - 1, 150.0), np.nan],
+        ('Pune', 'PM2.5'): np.ones(hours),
+    })
+    rollups = AQIRollups.from_archive(ReadingsArchive(str(tmp_path)))
+    assert rollups.cities() == ['Delhi']
+    expected = predict_aqi([80.0, 0, 0, 0, 150.0, 0])
+    assert _totals(rollups, 'Delhi', 'day') == ([24, 23], [expected] * 2, [expected] * 2, [expected] * 2)
+
+
+def test_update_from_archive_reads_only_appended_hours(tmp_path):
+    writer = ArchiveWriter(str(tmp_path))
+    writer.append(START, {('Delhi', 'PM10'): np.full(48, 100.0)})
+    rollups = AQIRollups.from_archive(ReadingsArchive(str(tmp_path)))
+    writer.append(START + 48 * HOUR, {('Delhi', 'PM10'): np.full(24, 200.0)})
+    archive = ReadingsArchive(str(tmp_path))
+    assert rollups.update_from_archive(archive) == 24
+    assert rollups.update_from_archive(archive) == 0
+    full = AQIRollups.from_archive(archive)
+    assert _totals(rollups, 'Delhi', 'day') == _totals(full, 'Delhi', 'day')
+
+
+def test_record_batch_parses_timestamp_offsets(recwarn):
+    class Batch:
+        cities = ['Delhi', 'Delhi']
+        timestamps = ['2024-03-01T05:30:00+05:30', '2024-03-01T01:00:00Z']
+        aqi = np.array([80.0, 120.0])
+
+    rollups = AQIRollups()
+    rollups.record_batch(Batch())
+    hours = rollups.series('Delhi', 'hour')
+    assert [str(start) for start in hours.starts] == ['2024-03-01T00:00:00', '2024-03-01T01:00:00']
+    assert not [warning for warning in recwarn if 'timezone' in str(warning.message)]
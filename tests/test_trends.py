@@ -0,0 +1,29 @@
+import math
+
+import numpy as np
+import pytest
+
+from src.utils.constants import generate_daily_trend
+from src.utils.trends import diurnal_factors, generate_trends
+
+
+def test_generate_daily_trend_matches_sine_profile():
+    expected = [max(0.0, 80.0 * (1 + 0.2 * math.sin(2 * math.pi * h / 24))) for h in range(30)]
+    assert generate_daily_trend(80.0, hours=30) == pytest.approx(expected, rel=1e-12)
+
+
+def test_rush_hour_factors_wrap_around_midnight():
+    factors = diurnal_factors('rush_hour', start_hour=22, hours=12)
+    assert factors.tolist() == [0.9] * 8 + [1.2] * 4
+    with pytest.raises(ValueError):
+        diurnal_factors('weekly')
+
+
+def test_generate_trends_for_many_cities_and_pollutants():
+    base = np.array([[40.0, 60.0, 0.5], [80.0, 120.0, 1.0]])
+    trends = generate_trends(base, start_hour=5, noise=0.08, seed=7)
+    assert trends.shape == (2, 3, 24)
+    assert np.array_equal(trends, generate_trends(base, start_hour=5, noise=0.08, seed=7))
+    assert (trends >= 0).all()
+    noiseless = generate_trends(base, start_hour=5)
+    assert np.allclose(noiseless[1], 2 * noiseless[0])
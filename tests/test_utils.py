@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.constants import PREDICTOR_COLUMNS, predict_aqi, predict_aqi_batch
+
+
+def _reference_predict_aqi(input_vector):
+    # The original per-element loop, kept here as the oracle for the batch path.
+    weights = [0.8, 0.6, 0.2, 0.5, 1.2, 0.1]
+    total = 0.0
+    for v, w in zip(input_vector, weights):
+        try:
+            total += float(v) * w
+        except Exception:
+            total += 0.0
+    aqi_val = total / 2.0
+    if aqi_val < 0:
+        aqi_val = 0.0
+    if aqi_val > 500:
+        aqi_val = 500.0
+    return round(aqi_val, 1)
+
+
+def test_predict_aqi_batch_matches_scalar():
+    rng = np.random.default_rng(0)
+    matrix = np.round(rng.uniform(-50, 600, size=(20000, 6)), rng.integers(0, 4))
+    expected = [_reference_predict_aqi(row) for row in matrix.tolist()]
+    assert predict_aqi_batch(matrix).tolist() == expected
+    assert [predict_aqi(row) for row in matrix[:500].tolist()] == expected[:500]
+
+
+def test_scalar_predict_aqi_handles_mixed_and_short_input_like_the_batch():
+    rows = [[40, '20', None, 'bad', 60.5, 10], [1e6] * 6, [-100] * 6, [40, 20]]
+    padded = [row + [0] * (6 - len(row)) for row in rows]
+    assert [predict_aqi(row) for row in rows] == predict_aqi_batch(np.array(padded, dtype=object)).tolist()
+    assert predict_aqi([40, 20, 0.5, 30, 60, 10, 999]) == predict_aqi([40, 20, 0.5, 30, 60, 10])
+
+
+def test_predict_aqi_batch_accepts_dataframe():
+    frame = pd.DataFrame([[40, 20, 0.5, 30, 60, 10], [400, 200, 5, 300, 600, 100]], columns=PREDICTOR_COLUMNS)
+    assert predict_aqi_batch(frame[list(reversed(PREDICTOR_COLUMNS))]).tolist() == [
+        _reference_predict_aqi(row) for row in frame.values.tolist()
+    ]
+    with pytest.raises(ValueError):
+        predict_aqi_batch(frame.drop(columns=['NH3']))
+
+
+def test_predict_aqi_invalid_and_short_inputs():
+    assert predict_aqi(['40', None, 'abc', 30, 60, 10]) == _reference_predict_aqi(['40', None, 'abc', 30, 60, 10])
+    assert predict_aqi([40, 20]) == _reference_predict_aqi([40, 20])
+    assert predict_aqi([40, 20, 0.5, 30, 60, 10, 999]) == _reference_predict_aqi([40, 20, 0.5, 30, 60, 10, 999])
+    assert predict_aqi_batch(np.empty((0, 6))).shape == (0,)
+
+
+def test_get_aqi_level_covers_continuous_values():
+    from src.utils.constants import AQI_LEVELS, UNKNOWN_AQI_LEVEL, get_aqi_level
+
+    assert get_aqi_level(50) is AQI_LEVELS['Good']
+    assert get_aqi_level(50.5) is AQI_LEVELS['Moderate']
+    assert get_aqi_level(100.3) is AQI_LEVELS['Unhealthy for Sensitive Groups']
+    assert get_aqi_level(300.01) is AQI_LEVELS['Hazardous']
+    assert get_aqi_level(750) is AQI_LEVELS['Hazardous']
+    assert get_aqi_level(-1) is UNKNOWN_AQI_LEVEL
+    assert get_aqi_level('n/a') is UNKNOWN_AQI_LEVEL
+
+
+def test_bulk_classification_matches_scalar():
+    from src.utils.constants import aqi_category_index, classify_aqi, get_aqi_level, get_aqi_levels
+
+    values = np.concatenate([np.linspace(-5, 520, 4001), [np.nan, 0, 50, 51, 100, 150, 200, 300, 500]])
+    assert classify_aqi(values).tolist() == [aqi_category_index(v) for v in values.tolist()]
+    assert all(a is get_aqi_level(v) for a, v in zip(get_aqi_levels(values), values.tolist()))
+
+
+def test_resolve_pollutant_accepts_every_spelling():
+    from src.utils.constants import POLLUTANT_SPECS, get_pollutant_spec, resolve_pollutant
+
+    for spelling in ('NO₂', 'NO2', 'no2', 'No2'):
+        assert resolve_pollutant(spelling) == 'no2'
+    for spelling in ('PM₂.₅', 'PM2.5', 'pm2_5', 'PM2_5', 'pm 2.5', 'pm25'):
+        assert resolve_pollutant(spelling) == 'pm2_5'
+    assert resolve_pollutant('PM₁₀') == resolve_pollutant('pm10') == 'pm10'
+    assert resolve_pollutant('benzene') is None
+    assert get_pollutant_spec('o3') is POLLUTANT_SPECS['O₃']
+    assert get_pollutant_spec('unobtainium') is None
+
+
+def test_predict_aqi_batch_resolves_column_aliases():
+    frame = pd.DataFrame([[40, 20, 0.5, 30, 60, 10]], columns=['NO₂', 'so2', 'CO', 'O3', 'PM₁₀', 'nh3'])
+    assert predict_aqi_batch(frame).tolist() == [predict_aqi([40, 20, 0.5, 30, 60, 10])]